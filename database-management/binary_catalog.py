@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Binary catalog export of exercises.db
+=====================================
+A versioned, read-only binary copy of what the app loads at startup
+(equipment, exercises and videos; ExerciseDatabaseManager fetchAlls all
+three). It is written next to the database and memory-mapped by readers.
+Records are fixed width and decoded in place, so nothing is parsed or
+copied until a field is read.
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header         HEADER: magic, format version, SCHEMA_VERSION of the
+                   source build, SHA-256 of the source database, counts
+    section table  (offset, length) as u64 pairs, in SECTIONS order
+    string_offsets u32[n_strings + 1]: start of each string in string_data
+    string_data    UTF-8, strings sorted (codes compare like the text) and
+                   NUL-separated, so the whole table decodes with one split
+    equipment      EQUIPMENT_RECORD per item, by equipment_id
+    exercises      EXERCISE_RECORD per exercise, by exercise_id
+    videos         VIDEO_RECORD per video, by exercise_id
+    muscle_index   MUSCLE_ENTRY per primary muscle: (muscle, start, count)
+                   into muscle_order
+    muscle_order   u32 exercise indexes grouped by primary muscle, each group
+                   canonical_rating descending then display_name (MCV order)
+    equipment_offsets   u32[n_equipment + 1] into equipment_exercises
+    equipment_exercises u32 indexes of the exercises that use each item
+    exercise_video u32 video index per exercise
+
+A NULL string or optional reference is stored as one past the end of its
+table (n_strings, n_equipment, n_videos), so bulk readers can index a
+list with a trailing None. Readers reject any other magic or format
+version. source_sha256 tells whether a catalog still matches its
+database: readers check is_current() and re-export (or fall back to
+SQLite) when it doesn't.
+
+Usage:
+    python binary_catalog.py                                  # export next to TrainSwift/Resources/exercises.db
+    python binary_catalog.py --db /tmp/synthetic/exercises.db # another build
+    python binary_catalog.py --benchmark --runs 20            # cold start vs the SQLite fetchAll path
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import sqlite3
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ingest import register_sql_functions
+
+
+MAGIC = b"TRAINCAT"
+FORMAT_VERSION = 1
+
+SECTIONS = [
+    "string_offsets", "string_data", "equipment", "exercises", "videos",
+    "muscle_index", "muscle_order", "equipment_offsets", "equipment_exercises", "exercise_video",
+]
+
+# magic, format_version, schema_version, source_sha256,
+# n_strings, n_equipment, n_exercises, n_videos, n_muscles
+HEADER = struct.Struct("<8sII32sIIIII")
+SECTION_ENTRY = struct.Struct("<QQ")
+# equipment_id, category, name, image_filename (string codes)
+EQUIPMENT_RECORD = struct.Struct("<IIII")
+# exercise_id, canonical_name, display_name (codes); equipment_1, equipment_2
+# (equipment indexes, n_equipment for no second item); complexity (0 = All),
+# canonical_rating, is_in_programme; primary_muscle, secondary_muscle,
+# instructions, progression_id, regression_id (codes)
+EXERCISE_RECORD = struct.Struct("<IIIIIBBBxIIIII")
+# id, exercise index, supplier_id, filename, bunny_guid
+VIDEO_RECORD = struct.Struct("<IIIII")
+MUSCLE_ENTRY = struct.Struct("<III")
+U32 = struct.Struct("<I")
+
+COMPLEXITY_CODES = {"All": 0, "1": 1, "2": 2}
+COMPLEXITY_NAMES = {code: name for name, code in COMPLEXITY_CODES.items()}
+
+# Same columns and order as the SQLite tables/views, so rows compare directly
+EQUIPMENT_SQL = "SELECT equipment_id, category, name, image_filename FROM equipment ORDER BY equipment_id"
+EXERCISES_SQL = """
+    SELECT exercise_id, canonical_name, display_name, equipment_id_1, equipment_id_2,
+           complexity_level, canonical_rating, primary_muscle, secondary_muscle,
+           instructions, is_in_programme, progression_id, regression_id
+    FROM exercises ORDER BY exercise_id
+"""
+VIDEOS_SQL = "SELECT id, exercise_id, supplier_id, filename, bunny_guid FROM exercise_videos ORDER BY exercise_id"
+
+
+class EquipmentRow(NamedTuple):
+    equipment_id: str
+    category: str
+    name: str
+    image_filename: Optional[str]
+
+
+class ExerciseRow(NamedTuple):
+    exercise_id: str
+    canonical_name: str
+    display_name: str
+    equipment_id_1: str
+    equipment_id_2: Optional[str]
+    complexity_level: str
+    canonical_rating: int
+    primary_muscle: str
+    secondary_muscle: Optional[str]
+    instructions: Optional[str]
+    is_in_programme: int
+    progression_id: Optional[str]
+    regression_id: Optional[str]
+
+
+class VideoRow(NamedTuple):
+    id: int
+    exercise_id: str
+    supplier_id: Optional[str]
+    filename: str
+    bunny_guid: str
+
+
+def catalog_path(db_path: str) -> str:
+    """exercises.db -> exercises.catalog"""
+    return os.path.splitext(db_path)[0] + ".catalog"
+
+
+def file_sha256(path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+# ============================================
+# EXPORT
+# ============================================
+
+def _aligned(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 8)
+
+
+def encode_catalog(conn: sqlite3.Connection, schema_version: int, source_sha256: bytes) -> bytes:
+    """The catalog file's bytes for an open database"""
+    equipment = [EquipmentRow(*row) for row in conn.execute(EQUIPMENT_SQL)]
+    exercises = [ExerciseRow(*row) for row in conn.execute(EXERCISES_SQL)]
+    videos = [VideoRow(*row) for row in conn.execute(VIDEOS_SQL)]
+
+    strings = set()
+    for row in equipment:
+        strings.update((row.equipment_id, row.category, row.name, row.image_filename))
+    for row in exercises:
+        strings.update((row.exercise_id, row.canonical_name, row.display_name, row.primary_muscle,
+                        row.secondary_muscle, row.instructions, row.progression_id, row.regression_id))
+    for row in videos:
+        strings.update((row.supplier_id, row.filename, row.bunny_guid))
+    strings.discard(None)
+    ordered = sorted(strings)
+    codes = {value: code for code, value in enumerate(ordered)}
+    codes[None] = len(ordered)
+    code = codes.__getitem__
+
+    encoded = [value.encode("utf-8") for value in ordered]
+    if any(b"\0" in data for data in encoded):
+        raise ValueError("catalog strings cannot contain NUL")
+    string_offsets, position = [0], 0
+    for data in encoded:
+        position += len(data) + 1
+        string_offsets.append(position)
+
+    equipment_index = {row.equipment_id: i for i, row in enumerate(equipment)}
+    exercise_index = {row.exercise_id: i for i, row in enumerate(exercises)}
+
+    muscle_groups: Dict[str, List[int]] = {}
+    for i in sorted(range(len(exercises)), key=lambda i: (-exercises[i].canonical_rating, exercises[i].display_name)):
+        muscle_groups.setdefault(exercises[i].primary_muscle, []).append(i)
+    muscle_index, muscle_order = [], []
+    for muscle in sorted(muscle_groups):
+        muscle_index.append(MUSCLE_ENTRY.pack(codes[muscle], len(muscle_order), len(muscle_groups[muscle])))
+        muscle_order.extend(muscle_groups[muscle])
+
+    users: List[List[int]] = [[] for _ in equipment]
+    for i, row in enumerate(exercises):
+        users[equipment_index[row.equipment_id_1]].append(i)
+        if row.equipment_id_2 is not None:
+            users[equipment_index[row.equipment_id_2]].append(i)
+    equipment_offsets, equipment_exercises = [0], []
+    for indexes in users:
+        equipment_exercises.extend(indexes)
+        equipment_offsets.append(len(equipment_exercises))
+
+    exercise_video = [len(videos)] * len(exercises)
+    for i, row in enumerate(videos):
+        exercise_video[exercise_index[row.exercise_id]] = i
+
+    u32s = lambda values: struct.pack(f"<{len(values)}I", *values)
+    sections = {
+        "string_offsets": u32s(string_offsets),
+        "string_data": b"\0".join(encoded),
+        "equipment": b"".join(
+            EQUIPMENT_RECORD.pack(code(r.equipment_id), code(r.category), code(r.name), code(r.image_filename))
+            for r in equipment),
+        "exercises": b"".join(
+            EXERCISE_RECORD.pack(
+                code(r.exercise_id), code(r.canonical_name), code(r.display_name),
+                equipment_index[r.equipment_id_1],
+                len(equipment) if r.equipment_id_2 is None else equipment_index[r.equipment_id_2],
+                COMPLEXITY_CODES[r.complexity_level], r.canonical_rating, r.is_in_programme,
+                code(r.primary_muscle), code(r.secondary_muscle), code(r.instructions),
+                code(r.progression_id), code(r.regression_id))
+            for r in exercises),
+        "videos": b"".join(
+            VIDEO_RECORD.pack(r.id, exercise_index[r.exercise_id], code(r.supplier_id),
+                              code(r.filename), code(r.bunny_guid))
+            for r in videos),
+        "muscle_index": b"".join(muscle_index),
+        "muscle_order": u32s(muscle_order),
+        "equipment_offsets": u32s(equipment_offsets),
+        "equipment_exercises": u32s(equipment_exercises),
+        "exercise_video": u32s(exercise_video),
+    }
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, schema_version, source_sha256,
+                         len(ordered), len(equipment), len(exercises), len(videos), len(muscle_index))
+    position = len(_aligned(header + b"\0" * SECTION_ENTRY.size * len(SECTIONS)))
+    table, body = [], []
+    for name in SECTIONS:
+        data = _aligned(sections[name])
+        table.append(SECTION_ENTRY.pack(position, len(sections[name])))
+        body.append(data)
+        position += len(data)
+    return _aligned(header + b"".join(table)) + b"".join(body)
+
+
+def export_catalog(db_path: str, out_path: Optional[str] = None) -> str:
+    """
+    Write the catalog for a finished database (atomically, next to it by
+    default) and check it reads back identical to the database. Returns
+    the path written.
+    """
+    out_path = out_path or catalog_path(db_path)
+    source_sha256 = file_sha256(db_path)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    register_sql_functions(conn)
+    try:
+        manifest = dict(conn.execute("SELECT key, value FROM build_manifest"))
+        data = encode_catalog(conn, int(manifest["schema_version"]), source_sha256)
+    finally:
+        conn.close()
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".exercises.", suffix=".catalog.tmp", dir=os.path.dirname(out_path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        mismatched = catalog_mismatches(db_path, tmp_path)
+        if mismatched:
+            raise ValueError(f"binary catalog differs from the database: {', '.join(mismatched)}")
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return out_path
+
+
+# ============================================
+# READER
+# ============================================
+
+class BinaryCatalog:
+    """
+    Memory-mapped reader. Single records are decoded on access with
+    struct.unpack_from straight from the mapping; only the strings a
+    caller reads are copied out. The all_* readers decode the string
+    table once and walk a whole section with iter_unpack instead.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+        (magic, version, self.schema_version, self.source_sha256, self.n_strings,
+         self.n_equipment, self.n_exercises, self.n_videos, self.n_muscles) = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a version {FORMAT_VERSION} exercise catalog")
+        self._sections = {
+            name: SECTION_ENTRY.unpack_from(self._buf, HEADER.size + i * SECTION_ENTRY.size)
+            for i, name in enumerate(SECTIONS)
+        }
+        self._offsets = {name: offset for name, (offset, _) in self._sections.items()}
+        self._strings: Optional[List[Optional[str]]] = None
+
+    def close(self):
+        self._strings = None
+        self._buf.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _u32(self, section: str, i: int) -> int:
+        return U32.unpack_from(self._buf, self._offsets[section] + 4 * i)[0]
+
+    def string(self, code: int) -> Optional[str]:
+        if code == self.n_strings:
+            return None
+        start, end = struct.unpack_from("<II", self._buf, self._offsets["string_offsets"] + 4 * code)
+        base = self._offsets["string_data"]
+        return str(self._buf[base + start:base + end - 1], "utf-8")
+
+    def string_code(self, value: str) -> Optional[int]:
+        """Code of a string (binary search over the sorted table), None if absent"""
+        code = bisect_left(range(self.n_strings), value, key=self.string)
+        return code if code < self.n_strings and self.string(code) == value else None
+
+    def equipment(self, i: int) -> EquipmentRow:
+        codes = EQUIPMENT_RECORD.unpack_from(self._buf, self._offsets["equipment"] + i * EQUIPMENT_RECORD.size)
+        return EquipmentRow(*map(self.string, codes))
+
+    def exercise(self, i: int) -> ExerciseRow:
+        (exercise_id, canonical_name, display_name, equipment_1, equipment_2, complexity, rating,
+         in_programme, primary, secondary, instructions, progression, regression) = EXERCISE_RECORD.unpack_from(
+            self._buf, self._offsets["exercises"] + i * EXERCISE_RECORD.size)
+        equipment_id = lambda index: None if index == self.n_equipment else self.string(
+            U32.unpack_from(self._buf, self._offsets["equipment"] + index * EQUIPMENT_RECORD.size)[0])
+        return ExerciseRow(
+            self.string(exercise_id), self.string(canonical_name), self.string(display_name),
+            equipment_id(equipment_1), equipment_id(equipment_2), COMPLEXITY_NAMES[complexity], rating,
+            self.string(primary), self.string(secondary), self.string(instructions), in_programme,
+            self.string(progression), self.string(regression))
+
+    def video(self, i: int) -> VideoRow:
+        video_id, exercise, supplier, filename, guid = VIDEO_RECORD.unpack_from(
+            self._buf, self._offsets["videos"] + i * VIDEO_RECORD.size)
+        exercise_id = U32.unpack_from(self._buf, self._offsets["exercises"] + exercise * EXERCISE_RECORD.size)[0]
+        return VideoRow(video_id, self.string(exercise_id), self.string(supplier),
+                        self.string(filename), self.string(guid))
+
+    # --- Bulk readers ---
+
+    def _string_list(self) -> List[Optional[str]]:
+        """Every string, decoded once, plus a trailing None for the NULL code"""
+        if self._strings is None:
+            offset, length = self._sections["string_data"]
+            self._strings = str(self._buf[offset:offset + length], "utf-8").split("\0") if self.n_strings else []
+            self._strings.append(None)
+        return self._strings
+
+    def _records(self, section: str, record: struct.Struct):
+        offset, length = self._sections[section]
+        return record.iter_unpack(self._buf[offset:offset + length])
+
+    def all_equipment(self) -> List[EquipmentRow]:
+        strings = self._string_list()
+        return [EquipmentRow(strings[a], strings[b], strings[c], strings[d])
+                for a, b, c, d in self._records("equipment", EQUIPMENT_RECORD)]
+
+    def all_exercises(self) -> List[ExerciseRow]:
+        strings = self._string_list()
+        equipment_ids = [strings[codes[0]] for codes in self._records("equipment", EQUIPMENT_RECORD)] + [None]
+        complexity_names = [COMPLEXITY_NAMES[code] for code in range(len(COMPLEXITY_NAMES))]
+        return [
+            ExerciseRow(strings[exercise_id], strings[canonical_name], strings[display_name],
+                        equipment_ids[equipment_1], equipment_ids[equipment_2],
+                        complexity_names[complexity], rating, strings[primary], strings[secondary],
+                        strings[instructions], in_programme, strings[progression], strings[regression])
+            for (exercise_id, canonical_name, display_name, equipment_1, equipment_2, complexity, rating,
+                 in_programme, primary, secondary, instructions, progression, regression)
+            in self._records("exercises", EXERCISE_RECORD)
+        ]
+
+    def all_videos(self) -> List[VideoRow]:
+        strings = self._string_list()
+        exercise_ids = [strings[codes[0]] for codes in self._records("exercises", EXERCISE_RECORD)]
+        return [VideoRow(video_id, exercise_ids[exercise], strings[supplier], strings[filename], strings[guid])
+                for video_id, exercise, supplier, filename, guid in self._records("videos", VIDEO_RECORD)]
+
+    # --- Precomputed indexes ---
+
+    def find_exercise(self, exercise_id: str) -> Optional[int]:
+        """Index of an exercise (records are in exercise_id order), None if absent"""
+        code = self.string_code(exercise_id)
+        if code is None:
+            return None
+        key = lambda i: U32.unpack_from(self._buf, self._offsets["exercises"] + i * EXERCISE_RECORD.size)[0]
+        i = bisect_left(range(self.n_exercises), code, key=key)
+        return i if i < self.n_exercises and key(i) == code else None
+
+    def exercises_for_muscle(self, muscle: str) -> List[int]:
+        """Exercise indexes with this primary muscle, in MCV order"""
+        code = self.string_code(muscle)
+        for i in range(self.n_muscles):
+            muscle_code, start, count = MUSCLE_ENTRY.unpack_from(
+                self._buf, self._offsets["muscle_index"] + i * MUSCLE_ENTRY.size)
+            if muscle_code == code:
+                base = self._offsets["muscle_order"] + 4 * start
+                return list(struct.unpack_from(f"<{count}I", self._buf, base))
+        return []
+
+    def exercises_using(self, equipment_index: int) -> List[int]:
+        """Exercise indexes that use an equipment item (as either slot)"""
+        start, end = struct.unpack_from("<II", self._buf, self._offsets["equipment_offsets"] + 4 * equipment_index)
+        return list(struct.unpack_from(f"<{end - start}I", self._buf, self._offsets["equipment_exercises"] + 4 * start))
+
+    def video_for(self, exercise_index: int) -> Optional[int]:
+        index = self._u32("exercise_video", exercise_index)
+        return None if index == self.n_videos else index
+
+
+def is_current(db_path: str, path: Optional[str] = None) -> bool:
+    """
+    True if the catalog (next to db_path by default) exists, is this format
+    version and was exported from db_path as it is now (source_sha256)
+    """
+    path = path or catalog_path(db_path)
+    try:
+        with BinaryCatalog(path) as catalog:
+            return catalog.source_sha256 == file_sha256(db_path)
+    except (OSError, ValueError, struct.error):
+        return False  # missing, empty, truncated or another format
+
+
+def catalog_mismatches(db_path: str, path: str) -> List[str]:
+    """Tables whose rows differ between the database and a catalog file"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    register_sql_functions(conn)
+    try:
+        with BinaryCatalog(path) as catalog:
+            pairs = [
+                ("equipment", EQUIPMENT_SQL, catalog.all_equipment()),
+                ("exercises", EXERCISES_SQL, catalog.all_exercises()),
+                ("exercise_videos", VIDEOS_SQL, catalog.all_videos()),
+            ]
+            return [name for name, sql, rows in pairs
+                    if [tuple(row) for row in conn.execute(sql)] != [tuple(row) for row in rows]]
+    finally:
+        conn.close()
+
+
+# ============================================
+# COLD-START BENCHMARK
+# ============================================
+
+def cold_load(mode: str, db_path: str, muscle: str) -> float:
+    """
+    One load in this (fresh) process, in ms. 'full' reads every equipment,
+    exercise and video row (the app's startup fetchAll); 'muscle' reads one
+    muscle's exercises in MCV order (the first lookup a programme needs).
+    """
+    start = time.perf_counter()
+    if mode.startswith("catalog"):
+        catalog = BinaryCatalog(catalog_path(db_path))
+        if mode == "catalog_full":
+            catalog.all_equipment(), catalog.all_exercises(), catalog.all_videos()
+        else:
+            [catalog.exercise(i) for i in catalog.exercises_for_muscle(muscle)]
+        catalog.close()
+    else:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        register_sql_functions(conn)
+        if mode == "sqlite_full":
+            for sql in (EQUIPMENT_SQL, EXERCISES_SQL, VIDEOS_SQL):
+                conn.execute(sql).fetchall()
+        else:
+            conn.execute("SELECT * FROM exercises WHERE primary_muscle = ? "
+                         "ORDER BY canonical_rating DESC, display_name", (muscle,)).fetchall()
+        conn.close()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(db_path: str, runs: int, muscle: str = "Chest"):
+    """Median cold-start time over fresh processes (OS page cache warm)"""
+    print(f"Catalog: {os.path.getsize(catalog_path(db_path))} bytes, database: {os.path.getsize(db_path)} bytes")
+    print(f"{'Workload':<10} {'SQLite':>10} {'Catalog':>10} {'Speed-up':>9}")
+    for workload in ("full", "muscle"):
+        medians = []
+        for mode in (f"sqlite_{workload}", f"catalog_{workload}"):
+            samples = [
+                float(subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--cold-run", mode, "--db", db_path,
+                     "--muscle", muscle],
+                    check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+                ).stdout)
+                for _ in range(runs)
+            ]
+            medians.append(statistics.median(samples))
+        print(f"{workload:<10} {medians[0]:>8.2f}ms {medians[1]:>8.2f}ms {medians[0] / medians[1]:>8.1f}x")
+
+
+def default_db_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "..", "TrainSwift", "Resources", "exercises.db")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or benchmark the binary exercise catalog")
+    parser.add_argument('--db', default=default_db_path(), help='Database to export (catalog goes next to it)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time cold-start loads (fresh process each) against the SQLite path')
+    parser.add_argument('--runs', type=int, default=20, help='Fresh processes per measurement (default 20)')
+    parser.add_argument('--muscle', default='Chest', help="Muscle for the single-lookup workload (default Chest)")
+    parser.add_argument('--cold-run', choices=['sqlite_full', 'sqlite_muscle', 'catalog_full', 'catalog_muscle'],
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: {args.db} not found!")
+        sys.exit(1)
+
+    if args.cold_run:
+        print(cold_load(args.cold_run, args.db, args.muscle))
+        return
+    if args.benchmark:
+        if not is_current(args.db):
+            print(f"Exporting {catalog_path(args.db)} (missing or older than the database)")
+            export_catalog(args.db)
+        run_benchmark(args.db, args.runs, args.muscle)
+        return
+
+    path = export_catalog(args.db)
+    print(f"Wrote {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Builder benchmark
+=================
+Runs create_database_prod.py against the real CSVs and against synthetic
+catalogs (synthetic_catalog.py) at chosen sizes, and records wall time and
+peak memory per build phase (create_database_prod.PhaseTimer).
+
+Every build is a fresh process writing to a temp directory, so the peak RSS
+is that build's own and the committed exercises.db is never touched. Each
+phase reports its median over the repeats, after one untimed warm-up build.
+Back-to-back runs on one machine still vary by 10-15%, hence the default
+--threshold of 20%. Results are written as JSON. Given
+a stored result as --baseline, the run is compared phase by phase, and it
+exits with status 1 when the total time or peak memory of any dataset
+regressed by more than --threshold.
+
+Usage:
+    python build_benchmark.py --out build_benchmark.json                  # real + 10k synthetic, 3 timed builds each
+    python build_benchmark.py --synthetic 10000 100000 --repeats 5 --out after.json
+    python build_benchmark.py --out after.json --baseline before.json     # compare against a stored run
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from ingest import read_rows
+from synthetic_catalog import synthetic_catalog
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILDER = os.path.join(SCRIPT_DIR, "create_database_prod.py")
+
+# A total within this of the baseline is timer noise, never a regression
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def run_build(source_dir: str, work_dir: str, extra_args: List[str]) -> dict:
+    """One builder run in a fresh process; returns its PhaseTimer summary"""
+    timings_path = os.path.join(work_dir, "timings.json")
+    result = subprocess.run(
+        [sys.executable, BUILDER, "--source-dir", source_dir, "--output", os.path.join(work_dir, "exercises.db"),
+         "--timings-json", timings_path, *extra_args],
+        cwd=SCRIPT_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"build of {source_dir} failed:\n{result.stdout[-2000:]}{result.stderr[-2000:]}")
+    with open(timings_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def benchmark_dataset(source_dir: str, repeats: int, extra_args: List[str]) -> dict:
+    """Median per phase over repeats full builds of one set of CSVs, after one warm-up"""
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="build-benchmark-") as work_dir:
+        # Untimed warm-up, so the first timed build doesn't pay for cold
+        # page cache and .pyc compilation
+        for i in range(repeats + 1):
+            summary = run_build(source_dir, work_dir, extra_args)
+            if i:
+                runs.append(summary)
+            os.remove(os.path.join(work_dir, "exercises.db"))
+
+    samples: Dict[str, List[float]] = {}
+    for run in runs:
+        for phase in run["phases"]:
+            samples.setdefault(phase["phase"], []).append(phase["seconds"])
+    return {
+        "source_rows": {
+            name: sum(1 for _ in read_rows(os.path.join(source_dir, name)))
+            for name in ("equipment_prod.csv", "exercise_database_prod.csv")
+        },
+        "repeats": repeats,
+        "total_seconds": statistics.median(run["total_seconds"] for run in runs),
+        "peak_rss_bytes": max(run["peak_rss_bytes"] or 0 for run in runs) or None,
+        "phases": {name: statistics.median(seconds) for name, seconds in samples.items()},
+    }
+
+
+def run_benchmark(synthetic_sizes: List[int], repeats: int, seed: int, extra_args: List[str]) -> dict:
+    """Benchmark the real CSVs and each synthetic size; returns the JSON-ready results"""
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "builder_args": extra_args,
+        "datasets": {},
+    }
+
+    print(f"Building real catalog x{repeats}...")
+    results["datasets"]["real"] = benchmark_dataset(SCRIPT_DIR, repeats, extra_args)
+
+    n_equipment = sum(1 for _ in read_rows(os.path.join(SCRIPT_DIR, "equipment_prod.csv")))
+    for size in synthetic_sizes:
+        with tempfile.TemporaryDirectory(prefix="synthetic-") as source_dir:
+            synthetic_catalog(SCRIPT_DIR, source_dir, size, n_equipment, seed)
+            print(f"Building synthetic {size} exercises x{repeats}...")
+            results["datasets"][f"synthetic_{size}"] = benchmark_dataset(source_dir, repeats, extra_args)
+    return results
+
+
+def print_results(results: dict, baseline: Optional[dict] = None, threshold: float = 0.20) -> List[str]:
+    """Per-dataset phase table, with deltas against baseline; returns the regressions found"""
+    regressions = []
+    for dataset, current in results["datasets"].items():
+        before = (baseline or {}).get("datasets", {}).get(dataset)
+        print(f"\n{dataset}: {current['source_rows']['exercise_database_prod.csv']} exercises, "
+              f"median of {current['repeats']} builds")
+        header = f"  {'Phase':<34} {'Time':>10}"
+        print(header + (f" {'Baseline':>10} {'Change':>8}" if before else ""))
+
+        rows = list(current["phases"].items()) + [("total", current["total_seconds"])]
+        for name, seconds in rows:
+            line = f"  {name:<34} {seconds * 1000:>7.1f} ms"
+            if before:
+                old = before["total_seconds"] if name == "total" else before["phases"].get(name)
+                if old is None:
+                    line += f" {'-':>10} {'new':>8}"
+                else:
+                    change = (seconds - old) / old if old else 0.0
+                    line += f" {old * 1000:>7.1f} ms {change:>+8.1%}"
+                    if name == "total" and change > threshold and seconds - old > MIN_REGRESSION_SECONDS:
+                        regressions.append(f"{dataset}: total time {change:+.1%}")
+            print(line)
+
+        rss = current["peak_rss_bytes"]
+        line = f"  {'peak RSS':<34} {rss / 1e6 if rss else 0:>7.1f} MB"
+        old_rss = before.get("peak_rss_bytes") if before else None
+        if rss and old_rss:
+            change = (rss - old_rss) / old_rss
+            line += f" {old_rss / 1e6:>7.1f} MB {change:>+8.1%}"
+            if change > threshold:
+                regressions.append(f"{dataset}: peak RSS {change:+.1%}")
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time create_database_prod.py per phase on real and synthetic CSVs")
+    parser.add_argument('--synthetic', type=int, nargs='*', default=[10000],
+                        help='Synthetic catalog sizes in exercises (default: 10000; none to skip)')
+    parser.add_argument('--repeats', type=int, default=3, help='Builds per dataset (default 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic catalog seed (default 0)')
+    parser.add_argument('--out', required=True, help='JSON file to write the results to')
+    parser.add_argument('--baseline', help='Stored results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.20,
+                        help='Regression threshold for total time and peak RSS, as a fraction (default 0.20)')
+    parser.add_argument('--builder-args', default='',
+                        help='Extra create_database_prod.py flags, e.g. "--profile compact"')
+    args = parser.parse_args()
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+
+    baseline = None
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"Error: {args.baseline} not found!")
+            sys.exit(1)
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    try:
+        results = run_benchmark(args.synthetic, args.repeats, args.seed, args.builder_args.split())
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    regressions = print_results(results, baseline, args.threshold)
+    print(f"\nResults written to {args.out}")
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Compact schema profile for exercises.db
+=======================================
+create_database_prod.py --profile compact rewrites a standard build with
+integer keys:
+
+- every exercise and equipment item gets an INTEGER PRIMARY KEY (a rowid
+  alias), and references between tables use those keys
+- muscles, canonical names, complexity levels and injury types are
+  integer-coded through small lookup tables
+- contraindications are a WITHOUT ROWID table keyed by
+  (canonical_id, injury_type_id), and instructions and videos are keyed by
+  exercise_key, so neither needs a separate key index
+
+The text IDs stay in the compact tables (EX001 is still what the app and
+the CSVs call an exercise), and views named like the standard tables
+(equipment, exercise_core, exercises, exercise_contraindications,
+exercise_videos) decode every key, so existing readers run unchanged. The
+build fails if any view's rows differ from the standard build they were
+converted from.
+
+Derived tables (derived_tables.py) and the search index are text-keyed
+and are dropped: a compact database has no exercise_masks, injury_bits,
+progression_closure, exercise_alternatives, facet_values or
+exercises_fts. Nearly all of the size saving comes from dropping them;
+compare() reports the base-table storage change separately.
+
+Usage (measure size and query latency against a standard build):
+    python compact_profile.py STANDARD.db COMPACT.db
+    python compact_profile.py STANDARD.db COMPACT.db --iterations 500
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from derived_tables import DERIVED_TABLES
+from ingest import register_sql_functions
+from query_audit import run_queries, sample_parameters, time_query
+
+
+COMPACT_TABLE_DDL = [
+    # Lookup tables for the integer-coded text columns
+    """
+    CREATE TABLE muscles (
+        muscle_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE canonical_names (
+        canonical_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE injury_types (
+        injury_type_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """,
+    # 0 = 'All', so complexity <= max_complexity selects what a user may do
+    """
+    CREATE TABLE complexity_levels (
+        complexity INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE compact_equipment (
+        equipment_key INTEGER PRIMARY KEY,
+        equipment_id TEXT NOT NULL UNIQUE,
+        category TEXT NOT NULL,
+        name TEXT NOT NULL,
+        image_filename TEXT
+    )
+    """,
+    # progression_id / regression_id stay text: they are comma-separated
+    # exercise_id lists that only the builder and the simulator read
+    """
+    CREATE TABLE compact_exercises (
+        exercise_key INTEGER PRIMARY KEY,
+        exercise_id TEXT NOT NULL UNIQUE,
+        canonical_id INTEGER NOT NULL REFERENCES canonical_names(canonical_id),
+        display_name TEXT NOT NULL,
+        equipment_key_1 INTEGER NOT NULL REFERENCES compact_equipment(equipment_key),
+        equipment_key_2 INTEGER REFERENCES compact_equipment(equipment_key),
+        complexity INTEGER NOT NULL REFERENCES complexity_levels(complexity),
+        canonical_rating INTEGER NOT NULL CHECK(canonical_rating BETWEEN 0 AND 100),
+        primary_muscle_id INTEGER NOT NULL REFERENCES muscles(muscle_id),
+        secondary_muscle_id INTEGER REFERENCES muscles(muscle_id),
+        is_in_programme INTEGER NOT NULL,
+        progression_id TEXT,
+        regression_id TEXT
+    )
+    """,
+    """
+    CREATE TABLE compact_instructions (
+        exercise_key INTEGER PRIMARY KEY REFERENCES compact_exercises(exercise_key),
+        instructions TEXT NOT NULL
+    )
+    """,
+    # The natural key is the primary key; id is kept for DBExerciseContraindication
+    """
+    CREATE TABLE compact_contraindications (
+        canonical_id INTEGER NOT NULL REFERENCES canonical_names(canonical_id),
+        injury_type_id INTEGER NOT NULL REFERENCES injury_types(injury_type_id),
+        id INTEGER NOT NULL,
+        PRIMARY KEY (canonical_id, injury_type_id)
+    ) WITHOUT ROWID
+    """,
+    # One video per exercise, so exercise_key is the key; id is kept for DBExerciseVideo
+    """
+    CREATE TABLE compact_videos (
+        exercise_key INTEGER PRIMARY KEY REFERENCES compact_exercises(exercise_key),
+        id INTEGER NOT NULL,
+        supplier_id TEXT,
+        filename TEXT NOT NULL,
+        bunny_guid TEXT NOT NULL
+    )
+    """,
+]
+
+# Filled from the standard tables. Keys follow the standard rowid order, so
+# a scan of a view returns rows in the same order as the standard table
+COMPACT_LOAD_SQL = [
+    """
+    INSERT INTO muscles (name)
+    SELECT primary_muscle FROM exercise_core
+    UNION SELECT secondary_muscle FROM exercise_core WHERE secondary_muscle IS NOT NULL
+    ORDER BY 1
+    """,
+    # Contraindications name canonical movements that no exercise uses yet
+    """
+    INSERT INTO canonical_names (name)
+    SELECT canonical_name FROM exercise_core
+    UNION SELECT canonical_name FROM exercise_contraindications
+    ORDER BY 1
+    """,
+    "INSERT INTO injury_types (name) SELECT DISTINCT injury_type FROM exercise_contraindications ORDER BY 1",
+    "INSERT INTO complexity_levels (complexity, name) VALUES (0, 'All'), (1, '1'), (2, '2')",
+    """
+    INSERT INTO compact_equipment (equipment_id, category, name, image_filename)
+    SELECT equipment_id, category, name, image_filename FROM equipment ORDER BY rowid
+    """,
+    """
+    INSERT INTO compact_exercises (exercise_id, canonical_id, display_name, equipment_key_1, equipment_key_2,
+                                   complexity, canonical_rating, primary_muscle_id, secondary_muscle_id,
+                                   is_in_programme, progression_id, regression_id)
+    SELECT c.exercise_id, cn.canonical_id, c.display_name, e1.equipment_key, e2.equipment_key,
+           cl.complexity, c.canonical_rating, pm.muscle_id, sm.muscle_id,
+           c.is_in_programme, c.progression_id, c.regression_id
+    FROM exercise_core c
+    JOIN canonical_names cn ON cn.name = c.canonical_name
+    JOIN compact_equipment e1 ON e1.equipment_id = c.equipment_id_1
+    LEFT JOIN compact_equipment e2 ON e2.equipment_id = c.equipment_id_2
+    JOIN complexity_levels cl ON cl.name = c.complexity_level
+    JOIN muscles pm ON pm.name = c.primary_muscle
+    LEFT JOIN muscles sm ON sm.name = c.secondary_muscle
+    ORDER BY c.rowid
+    """,
+    """
+    INSERT INTO compact_instructions (exercise_key, instructions)
+    SELECT x.exercise_key, i.instructions
+    FROM exercise_instructions i JOIN compact_exercises x ON x.exercise_id = i.exercise_id
+    """,
+    """
+    INSERT INTO compact_contraindications (canonical_id, injury_type_id, id)
+    SELECT cn.canonical_id, it.injury_type_id, c.id
+    FROM exercise_contraindications c
+    JOIN canonical_names cn ON cn.name = c.canonical_name
+    JOIN injury_types it ON it.name = c.injury_type
+    """,
+    """
+    INSERT INTO compact_videos (exercise_key, id, supplier_id, filename, bunny_guid)
+    SELECT x.exercise_key, v.id, v.supplier_id, v.filename, v.bunny_guid
+    FROM exercise_videos v JOIN compact_exercises x ON x.exercise_id = v.exercise_id
+    """,
+]
+
+# The standard profile's filter indexes, on the integer columns
+COMPACT_INDEX_DDL = [
+    "CREATE INDEX idx_compact_equipment_category ON compact_equipment(category)",
+    "CREATE INDEX idx_compact_exercises_canonical ON compact_exercises(canonical_id)",
+    "CREATE INDEX idx_compact_exercises_equip1 ON compact_exercises(equipment_key_1)",
+    "CREATE INDEX idx_compact_exercises_equip2 ON compact_exercises(equipment_key_2)",
+    "CREATE INDEX idx_compact_exercises_complexity ON compact_exercises(complexity)",
+    "CREATE INDEX idx_compact_exercises_muscle ON compact_exercises(primary_muscle_id)",
+    "CREATE INDEX idx_compact_exercises_programme ON compact_exercises(is_in_programme)",
+    "CREATE INDEX idx_compact_exercises_rating ON compact_exercises(canonical_rating)",
+    "CREATE INDEX idx_compact_contraindications_injury ON compact_contraindications(injury_type_id)",
+    "CREATE INDEX idx_compact_videos_bunny_guid ON compact_videos(bunny_guid)",
+]
+
+# Exercise columns in the standard exercise_core order, decoded
+EXERCISE_COLUMNS = """
+    x.exercise_id, cn.name AS canonical_name, x.display_name, e1.equipment_id AS equipment_id_1,
+    e2.equipment_id AS equipment_id_2, cl.name AS complexity_level, x.canonical_rating,
+    pm.name AS primary_muscle, sm.name AS secondary_muscle{instructions}, x.is_in_programme,
+    x.progression_id, x.regression_id
+"""
+
+# Every reference resolves (the keys come from these tables), so LEFT JOIN
+# returns the same rows as JOIN. It lets SQLite drop the joins a query
+# does not read from, and a filter on a decoded column turns its LEFT JOIN
+# back into an inner join the planner can drive from
+EXERCISE_JOINS = """
+    FROM compact_exercises x
+    LEFT JOIN canonical_names cn ON cn.canonical_id = x.canonical_id
+    LEFT JOIN compact_equipment e1 ON e1.equipment_key = x.equipment_key_1
+    LEFT JOIN compact_equipment e2 ON e2.equipment_key = x.equipment_key_2
+    LEFT JOIN complexity_levels cl ON cl.complexity = x.complexity
+    LEFT JOIN muscles pm ON pm.muscle_id = x.primary_muscle_id
+    LEFT JOIN muscles sm ON sm.muscle_id = x.secondary_muscle_id
+"""
+
+
+def compact_view_ddl(compress_instructions: bool = False) -> List[str]:
+    """Compatibility views with the standard tables' names, columns and column order"""
+    instructions = "inflate(i.instructions)" if compress_instructions else "i.instructions"
+    return [
+        """
+        CREATE VIEW equipment AS
+        SELECT equipment_id, category, name, image_filename FROM compact_equipment
+        """,
+        f"CREATE VIEW exercise_core AS SELECT {EXERCISE_COLUMNS.format(instructions='')} {EXERCISE_JOINS}",
+        f"""
+        CREATE VIEW exercises AS
+        SELECT {EXERCISE_COLUMNS.format(instructions=f', {instructions} AS instructions')} {EXERCISE_JOINS}
+        LEFT JOIN compact_instructions i ON i.exercise_key = x.exercise_key
+        """,
+        """
+        CREATE VIEW exercise_contraindications AS
+        SELECT c.id, cn.name AS canonical_name, it.name AS injury_type
+        FROM compact_contraindications c
+        JOIN canonical_names cn ON cn.canonical_id = c.canonical_id
+        JOIN injury_types it ON it.injury_type_id = c.injury_type_id
+        """,
+        """
+        CREATE VIEW exercise_videos AS
+        SELECT v.id, x.exercise_id, v.supplier_id, v.filename, v.bunny_guid
+        FROM compact_videos v
+        LEFT JOIN compact_exercises x ON x.exercise_key = v.exercise_key
+        """,
+    ]
+
+
+# Standard-profile objects the compact tables replace, dependents first
+REPLACED_OBJECTS = (
+    [("TABLE", "exercises_fts"), ("VIEW", "exercises_fts_content")]
+    + [("TABLE", table) for table in DERIVED_TABLES]
+    + [("VIEW", "exercises"), ("TABLE", "exercise_videos"), ("TABLE", "exercise_contraindications"),
+       ("TABLE", "exercise_instructions"), ("TABLE", "exercise_core"), ("TABLE", "equipment")]
+)
+
+# Names readers use, in both profiles
+COMPATIBILITY_VIEWS = ["equipment", "exercise_core", "exercises", "exercise_contraindications", "exercise_videos"]
+
+
+def compact_ddl(compress_instructions: bool = False) -> List[str]:
+    """Every compact-profile DDL statement, for the schema fingerprint"""
+    return COMPACT_TABLE_DDL + compact_view_ddl(compress_instructions) + COMPACT_INDEX_DDL
+
+
+def _sorted_rows(cursor, table: str) -> List[tuple]:
+    return sorted(cursor.execute(f"SELECT * FROM {table}").fetchall(), key=repr)
+
+
+def apply_compact_profile(cursor, compress_instructions: bool = False) -> List[str]:
+    """
+    Convert a standard build (in the cursor's open transaction) to the
+    compact profile. Returns the compatibility views whose rows differ from
+    the standard tables they replace; empty means the conversion is exact.
+    """
+    before = {name: _sorted_rows(cursor, name) for name in COMPATIBILITY_VIEWS}
+
+    for ddl in COMPACT_TABLE_DDL:
+        cursor.execute(ddl)
+    for sql in COMPACT_LOAD_SQL:
+        cursor.execute(sql)
+
+    for kind, name in REPLACED_OBJECTS:
+        cursor.execute(f"DROP {kind} IF EXISTS {name}")
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name IN ('exercise_contraindications', 'exercise_videos')")
+
+    for ddl in compact_view_ddl(compress_instructions) + COMPACT_INDEX_DDL:
+        cursor.execute(ddl)
+
+    return [name for name in COMPATIBILITY_VIEWS if _sorted_rows(cursor, name) != before[name]]
+
+
+# ============================================
+# MEASUREMENT
+# ============================================
+
+# The same lookups written natively for each profile: text keys against
+# the standard tables, integer keys against the compact ones
+NATIVE_QUERIES: List[Tuple[str, str, str, Callable[[Dict], Sequence]]] = [
+    ("muscle_pool",
+     "SELECT exercise_id FROM exercise_core WHERE primary_muscle = ? AND is_in_programme = 1",
+     "SELECT exercise_key FROM compact_exercises WHERE primary_muscle_id = ? AND is_in_programme = 1",
+     lambda k: [k["muscle"]]),
+    ("canonical_group",
+     "SELECT exercise_id FROM exercise_core WHERE canonical_name = ?",
+     "SELECT exercise_key FROM compact_exercises WHERE canonical_id = ?",
+     lambda k: [k["canonical"]]),
+    ("equipment_join",
+     "SELECT ex.exercise_id, eq.name FROM exercise_core ex "
+     "JOIN equipment eq ON eq.equipment_id = ex.equipment_id_1 WHERE ex.is_in_programme = 1",
+     "SELECT ex.exercise_key, eq.name FROM compact_exercises ex "
+     "JOIN compact_equipment eq ON eq.equipment_key = ex.equipment_key_1 WHERE ex.is_in_programme = 1",
+     lambda k: []),
+    ("contraindicated_canonicals",
+     "SELECT DISTINCT canonical_name FROM exercise_contraindications WHERE injury_type IN (?, ?)",
+     "SELECT DISTINCT canonical_id FROM compact_contraindications WHERE injury_type_id IN (?, ?)",
+     lambda k: k["injuries"]),
+]
+
+
+def native_parameters(conn: sqlite3.Connection, params: Dict, compact: bool) -> Dict:
+    """sample_parameters values as each profile's native keys"""
+    if not compact:
+        return {"muscle": params["muscle"], "canonical": params["canonical"], "injuries": params["injuries"][:2]}
+
+    def key(sql, value):
+        return conn.execute(sql, (value,)).fetchone()[0]
+
+    return {
+        "muscle": key("SELECT muscle_id FROM muscles WHERE name = ?", params["muscle"]),
+        "canonical": key("SELECT canonical_id FROM canonical_names WHERE name = ?", params["canonical"]),
+        "injuries": [key("SELECT injury_type_id FROM injury_types WHERE name = ?", injury)
+                     for injury in params["injuries"][:2]],
+    }
+
+
+def storage_bytes(conn: sqlite3.Connection) -> Tuple[int, int, int]:
+    """
+    (base table bytes, base index bytes, derived bytes) from dbstat, or
+    zeros if SQLite was built without it. Derived covers the derived tables,
+    their indexes and the search index, which only the standard profile has.
+    """
+    derived = ", ".join(f"'{table}'" for table in DERIVED_TABLES)
+    try:
+        rows = conn.execute(f"""
+            SELECT CASE WHEN s.tbl_name IN ({derived}) OR s.tbl_name LIKE 'exercises_fts%' THEN 2
+                        WHEN s.type = 'index' THEN 1 ELSE 0 END,
+                   SUM(d.pgsize)
+            FROM dbstat d JOIN sqlite_schema s ON s.name = d.name
+            GROUP BY 1
+        """).fetchall()
+    except sqlite3.OperationalError:
+        return 0, 0, 0
+    sizes = dict(rows)
+    return sizes.get(0, 0), sizes.get(1, 0), sizes.get(2, 0)
+
+
+def compare(standard_path: str, compact_path: str, iterations: int):
+    """Print file size and query latency of a compact build against a standard one"""
+    standard = sqlite3.connect(f"file:{standard_path}?mode=ro", uri=True)
+    compact = sqlite3.connect(f"file:{compact_path}?mode=ro", uri=True)
+    for conn in (standard, compact):
+        register_sql_functions(conn)
+
+    print(f"{'':<34}{'standard':>12}{'compact':>12}{'delta':>9}")
+    storage = list(zip(storage_bytes(standard), storage_bytes(compact)))
+    sizes = [(os.path.getsize(standard_path), os.path.getsize(compact_path))] + storage
+    sizes.insert(3, (storage[0][0] + storage[1][0], storage[0][1] + storage[1][1]))
+    labels = ["file bytes", "  base tables", "  base indexes", "  base storage (tables + indexes)",
+              "  derived tables and search index"]
+    for label, (before, after) in zip(labels, sizes):
+        delta = f"{(after - before) / before:+.0%}" if before else "-"
+        print(f"{label:<34}{before:>12}{after:>12}{delta:>9}")
+    print(f"The compact profile drops the derived tables ({', '.join(DERIVED_TABLES)}) and the search index")
+
+    params = sample_parameters(standard)
+    print("\nCanonical queries (query_audit.py), median µs; compact reads through the views")
+    results = {}
+    for name, conn in (("standard", standard), ("compact", compact)):
+        ran, _ = run_queries(conn, params, iterations)
+        results[name] = {r.query.name: r for r in ran}
+    for name, before in results["standard"].items():
+        after = results["compact"].get(name)
+        if after is None:
+            print(f"  {name:<32}{before.median_us:>12.1f}{'-':>12}{'':>9}  (not in the compact profile)")
+            continue
+        rows = "" if after.rows == before.rows else f"  rows differ: {before.rows} vs {after.rows}"
+        print(f"  {name:<32}{before.median_us:>12.1f}{after.median_us:>12.1f}"
+              f"{after.median_us / before.median_us:>8.2f}x{rows}")
+
+    print("\nNative queries (text keys vs integer keys), median µs")
+    keys = {"standard": native_parameters(standard, params, False), "compact": native_parameters(compact, params, True)}
+    for name, standard_sql, compact_sql, args in NATIVE_QUERIES:
+        before, _ = time_query(standard, standard_sql, args(keys["standard"]), iterations)
+        after, _ = time_query(compact, compact_sql, args(keys["compact"]), iterations)
+        print(f"  {name:<32}{before:>12.1f}{after:>12.1f}{after / before:>8.2f}x")
+
+    standard.close()
+    compact.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a compact-profile exercises.db against a standard build")
+    parser.add_argument('standard', help='Database built with the standard profile')
+    parser.add_argument('compact', help='Database built with --profile compact')
+    parser.add_argument('--iterations', type=int, default=200, help='Timed runs per query (default: 200)')
+    args = parser.parse_args()
+
+    for path in (args.standard, args.compact):
+        if not os.path.exists(path):
+            print(f"Error: {path} not found!")
+            sys.exit(1)
+
+    compare(args.standard, args.compact, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,79 +8,107 @@ Creates a SQLite database in TrainSwift/Resources/ from:
 - exercise_instructions_prod.csv   (instructions joined by exercise_id)
 - exercise_contraindications_prod.csv (injury contraindications)
 - exercise_video_mapping_prod.csv  (Bunny Stream video GUIDs)
-
-Schema: 4 tables (equipment, exercises, exercise_contraindications, exercise_videos)
+- split_templates_prod.csv         (session templates per split)
+
+Schema: 6 tables (equipment, exercise_core, exercise_instructions,
+exercise_contraindications, exercise_videos, split_templates) and an exercises view joining
+exercise_core with its instructions for existing readers. Derived tables
+are rebuilt after every load (derived_tables.py: equipment compatibility
+junction table and bitmasks, full-text search index). build_manifest holds
+the schema version and the SHA-256 of each source CSV.
+
+Loading is bulk and streaming: each CSV is parsed, validated and normalised
+row by row (ingest.py, validation.py) straight into executemany() inside a single
+transaction with build-time PRAGMAs (no journal, no fsync, large cache),
+and indexes are created after the data is in.
+
+With --incremental, only tables whose source CSVs changed since the last
+build (per build_manifest) are diffed against the new rows and patched with
+upserts/deletes on a copy of the existing database. A schema change or a
+missing/unreadable manifest falls back to a full rebuild.
+
+Builds are atomic and reproducible: everything happens in a temp file next to
+exercises.db, which is verified, ANALYZEd and VACUUMed (at --page-size) and
+then renamed over the old file. A crash never leaves a partial database, and
+identical inputs give a byte-identical file (same SQLite version).
+
+With --profile compact, the standard build is converted to integer keys,
+integer-coded lookup columns and WITHOUT ROWID tables behind views with the
+standard names (compact_profile.py). The derived tables and the search
+index are dropped. Compact builds are always full builds.
+
+With --binary-catalog, a memory-mappable binary copy of the equipment,
+exercises and videos is written next to the database (binary_catalog.py);
+without it, a catalog left there by an earlier build is removed.
+
+Every build is timed per phase (PhaseTimer). --timings prints wall time and
+peak memory for each phase; --timings-json writes them for build_benchmark.py.
 
 Usage:
     python create_database_prod.py
+    python create_database_prod.py --incremental
+    python create_database_prod.py --page-size 8192
+    python create_database_prod.py --audit-queries
+    python create_database_prod.py --compress-instructions
+    python create_database_prod.py --profile compact
+    python create_database_prod.py --binary-catalog
+    python create_database_prod.py --timings --trace-memory
+    python create_database_prod.py --source-dir /tmp/synthetic --output /tmp/synthetic/exercises.db
 
 Requirements:
-    - pandas (pip install pandas)
+    - Python 3 standard library only (CSV parsing lives in ingest.py)
 
 Output:
     - TrainSwift/Resources/exercises.db
 """
 
+import argparse
+import contextlib
+import hashlib
+import json
+import shutil
+import collections
 import sqlite3
-import pandas as pd
 import os
 import sys
-
-
-def create_database():
-    """Create SQLite database from CSV source files."""
-
-    # Check required files
-    required_files = [
-        "equipment_prod.csv",
-        "exercise_database_prod.csv",
-        "exercise_instructions_prod.csv",
-        "exercise_contraindications_prod.csv",
-        "exercise_video_mapping_prod.csv",
-    ]
-    for f in required_files:
-        if not os.path.exists(f):
-            print(f"Error: {f} not found!")
-            sys.exit(1)
-
-    # Determine output path
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    if os.path.basename(script_dir) == "database-management":
-        resources_dir = os.path.join(script_dir, "..", "TrainSwift", "Resources")
-    else:
-        resources_dir = os.path.join(script_dir, "TrainSwift", "Resources")
-    final_db_path = os.path.join(resources_dir, "exercises.db")
-
-    os.makedirs(resources_dir, exist_ok=True)
-
-    if os.path.exists(final_db_path):
-        os.remove(final_db_path)
-        print("Removed old database")
-
-    print(f"Creating database at: {final_db_path}")
-    conn = sqlite3.connect(final_db_path)
-    conn.execute("PRAGMA foreign_keys = ON")
-    cursor = conn.cursor()
-
-    # ============================================
-    # CREATE TABLES
-    # ============================================
-
-    print("Creating tables...")
-
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from binary_catalog import catalog_path, export_catalog
+from compact_profile import apply_compact_profile, compact_ddl
+from derived_tables import DERIVED_TABLE_DDL, DERIVED_INDEX_DDL, DERIVED_TABLES, clear_derived_tables, rebuild_derived_tables
+from ingest import (
+    read_header, read_rows, instruction_lookup, register_sql_functions,
+    equipment_rows, exercise_rows, instruction_rows, contraindication_rows, video_rows, template_rows,
+)
+from query_audit import audit_database, facet_mismatches
+from validation import SourceValidator
+
+
+# Bump when the table layout changes; the DDL itself is also hashed into the
+# manifest, so an edit that forgets the bump still forces a full rebuild.
+SCHEMA_VERSION = 14
+
+TABLE_DDL = [
     # Equipment table (NEW in v6)
-    cursor.execute("""
+    """
     CREATE TABLE equipment (
         equipment_id TEXT PRIMARY KEY,
         category TEXT NOT NULL,
         name TEXT NOT NULL,
         image_filename TEXT
     )
-    """)
-
-    # Exercises table (equipment_id_1/id_2 replace text columns)
-    cursor.execute("""
-    CREATE TABLE exercises (
+    """,
+    # Exercise columns that filters and pools read. Kept narrow, so scans
+    # and SELECT * on it never page through instruction text
+    """
+    CREATE TABLE exercise_core (
         exercise_id TEXT PRIMARY KEY,
         canonical_name TEXT NOT NULL,
         display_name TEXT NOT NULL,
@@ -90,241 +118,443 @@ def create_database():
         canonical_rating INTEGER NOT NULL DEFAULT 50 CHECK(canonical_rating BETWEEN 0 AND 100),
         primary_muscle TEXT NOT NULL,
         secondary_muscle TEXT,
-        instructions TEXT,
         is_in_programme INTEGER NOT NULL DEFAULT 1,
         progression_id TEXT,
         regression_id TEXT
     )
-    """)
-
+    """,
+    # Instructions text, one row per exercise that has any (zlib BLOB with
+    # --compress-instructions)
+    """
+    CREATE TABLE exercise_instructions (
+        exercise_id TEXT PRIMARY KEY REFERENCES exercise_core(exercise_id),
+        instructions TEXT NOT NULL
+    )
+    """,
     # Contraindications table
-    cursor.execute("""
+    """
     CREATE TABLE exercise_contraindications (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         canonical_name TEXT NOT NULL,
         injury_type TEXT NOT NULL,
         UNIQUE(canonical_name, injury_type)
     )
-    """)
-
+    """,
     # Exercise videos table
-    cursor.execute("""
+    """
     CREATE TABLE exercise_videos (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
-        exercise_id TEXT NOT NULL UNIQUE REFERENCES exercises(exercise_id),
+        exercise_id TEXT NOT NULL UNIQUE REFERENCES exercise_core(exercise_id),
         supplier_id TEXT,
         filename TEXT NOT NULL,
         bunny_guid TEXT NOT NULL
     )
-    """)
-
-    # ============================================
-    # CREATE INDEXES
-    # ============================================
-
-    print("Creating indexes...")
-
-    cursor.execute("CREATE INDEX idx_equipment_category ON equipment(category)")
-    cursor.execute("CREATE INDEX idx_exercises_canonical ON exercises(canonical_name)")
-    cursor.execute("CREATE INDEX idx_exercises_equip1 ON exercises(equipment_id_1)")
-    cursor.execute("CREATE INDEX idx_exercises_equip2 ON exercises(equipment_id_2)")
-    cursor.execute("CREATE INDEX idx_exercises_complexity ON exercises(complexity_level)")
-    cursor.execute("CREATE INDEX idx_exercises_muscle ON exercises(primary_muscle)")
-    cursor.execute("CREATE INDEX idx_exercises_programme ON exercises(is_in_programme)")
-    cursor.execute("CREATE INDEX idx_exercises_rating ON exercises(canonical_rating)")
-    cursor.execute("CREATE INDEX idx_contraindications_canonical ON exercise_contraindications(canonical_name)")
-    cursor.execute("CREATE INDEX idx_contraindications_injury ON exercise_contraindications(injury_type)")
-    cursor.execute("CREATE INDEX idx_videos_exercise_id ON exercise_videos(exercise_id)")
-    cursor.execute("CREATE INDEX idx_videos_bunny_guid ON exercise_videos(bunny_guid)")
-
-    # ============================================
-    # IMPORT EQUIPMENT
-    # ============================================
-
-    print("Importing equipment...")
-
-    df_equipment = pd.read_csv("equipment_prod.csv")
-
-    # Validate: no duplicate equipment_id
-    dup_ids = df_equipment[df_equipment.duplicated(subset=["equipment_id"], keep=False)]
-    if len(dup_ids) > 0:
-        print(f"Error: Duplicate equipment_id values found:")
-        for _, row in dup_ids.iterrows():
-            print(f"  {row['equipment_id']}: {row['category']}/{row['name']}")
-        sys.exit(1)
-
-    # Validate: no duplicate (category, name) pairs
-    dup_pairs = df_equipment[df_equipment.duplicated(subset=["category", "name"], keep=False)]
-    if len(dup_pairs) > 0:
-        print(f"Error: Duplicate (category, name) pairs found:")
-        for _, row in dup_pairs.iterrows():
-            print(f"  {row['equipment_id']}: {row['category']}/{row['name']}")
-        sys.exit(1)
-
-    equipment_ids = set()
-    for _, row in df_equipment.iterrows():
-        eid = row["equipment_id"].strip()
-        equipment_ids.add(eid)
-        cursor.execute(
-            "INSERT INTO equipment (equipment_id, category, name, image_filename) VALUES (?, ?, ?, ?)",
-            (
-                eid,
-                row["category"].strip(),
-                row["name"].strip(),
-                row["image_filename"].strip() if pd.notna(row["image_filename"]) else None,
-            ),
-        )
-
-    print(f"  {len(equipment_ids)} equipment entries imported")
-
-    # ============================================
-    # IMPORT EXERCISES
-    # ============================================
-
-    print("Importing exercises...")
-
-    df_exercises = pd.read_csv("exercise_database_prod.csv")
-
-    # Join instructions
-    df_instructions = pd.read_csv("exercise_instructions_prod.csv")
-    print(f"  Loaded {len(df_instructions)} instructions")
-
-    if "instructions" in df_exercises.columns:
-        df_exercises = df_exercises.drop(columns=["instructions"])
-
-    df_exercises = df_exercises.merge(
-        df_instructions[["exercise_id", "instructions"]],
-        on="exercise_id",
-        how="left",
+    """,
+    # Session templates: one row per muscle slot of each split's sessions.
+    # variant orders the splits offered for a (days, duration); 0 is the default.
+    # slot is the muscle's position in DynamicProgramGenerator's session order.
+    """
+    CREATE TABLE split_templates (
+        days_per_week INTEGER NOT NULL,
+        duration TEXT NOT NULL,
+        variant INTEGER NOT NULL,
+        session_index INTEGER NOT NULL,
+        slot INTEGER NOT NULL,
+        program TEXT NOT NULL,
+        session_name TEXT NOT NULL,
+        muscle TEXT NOT NULL,
+        exercise_count INTEGER NOT NULL CHECK (exercise_count > 0),
+        PRIMARY KEY (days_per_week, duration, variant, session_index, slot)
+    ) WITHOUT ROWID
+    """,
+    # Build manifest: schema version/fingerprint and source CSV hashes
+    """
+    CREATE TABLE build_manifest (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
     )
+    """,
+]
+
+# Compatibility view with the original exercises columns, in the original
+# order, for existing readers (the app's DBExercise, the simulator). Plain
+# row reads that do not select instructions skip the join, but DISTINCT and
+# aggregate reads still probe exercise_instructions once per row; those
+# belong on exercise_core (docs/database.md)
+EXERCISES_VIEW_DDL = """
+    CREATE VIEW exercises AS
+    SELECT c.exercise_id, c.canonical_name, c.display_name, c.equipment_id_1,
+           c.equipment_id_2, c.complexity_level, c.canonical_rating, c.primary_muscle,
+           c.secondary_muscle, {instructions} AS instructions, c.is_in_programme,
+           c.progression_id, c.regression_id
+    FROM exercise_core c
+    LEFT JOIN exercise_instructions i ON i.exercise_id = c.exercise_id
+"""
 
-    # Report missing instructions
-    missing_instr = df_exercises[df_exercises["instructions"].isna()]
-    if len(missing_instr) > 0:
-        print(f"  Warning: {len(missing_instr)} exercises missing instructions")
-
-    # Normalise complexity_level
-    def normalize_complexity(x):
-        if pd.isna(x):
-            return "All"
-        s = str(x).strip()
-        if s.lower() == "all":
-            return "All"
-        elif s in ("1", "2"):
-            return s
-        else:
-            raise ValueError(f"Invalid complexity_level: '{x}'")
-
-    df_exercises["complexity_level"] = df_exercises["complexity_level"].apply(normalize_complexity)
-
-    # Validate required columns
-    for col in ["canonical_rating", "equipment_id_1"]:
-        if col not in df_exercises.columns:
-            raise ValueError(f"Missing required column: {col}")
-        if df_exercises[col].isnull().any():
-            raise ValueError(f"Column '{col}' contains null values")
-
-    # FK integrity: equipment_id_1 and equipment_id_2 must exist in equipment table
-    print("Validating equipment FK integrity...")
-    fk_errors = []
-    for _, row in df_exercises.iterrows():
-        eid1 = str(row["equipment_id_1"]).strip() if pd.notna(row["equipment_id_1"]) else None
-        eid2 = str(row["equipment_id_2"]).strip() if pd.notna(row["equipment_id_2"]) else None
-
-        if eid1 and eid1 not in equipment_ids:
-            fk_errors.append(f"  {row['exercise_id']}: equipment_id_1={eid1} not in equipment table")
-        if eid2 and eid2 not in equipment_ids:
-            fk_errors.append(f"  {row['exercise_id']}: equipment_id_2={eid2} not in equipment table")
-
-    if fk_errors:
-        print(f"Error: FK integrity failures ({len(fk_errors)}):")
-        for e in fk_errors:
-            print(e)
-        sys.exit(1)
-    else:
-        print("  All equipment FK references valid")
-
-    # Handle nullable columns
-    for col in ["progression_id", "regression_id", "secondary_muscle", "equipment_id_2"]:
-        if col in df_exercises.columns:
-            df_exercises[col] = df_exercises[col].apply(lambda x: None if pd.isna(x) else str(x).strip())
-
-    # Insert exercises
-    for _, row in df_exercises.iterrows():
-        cursor.execute(
-            """INSERT INTO exercises (exercise_id, canonical_name, display_name,
-               equipment_id_1, equipment_id_2, complexity_level, canonical_rating,
-               primary_muscle, secondary_muscle, instructions, is_in_programme,
-               progression_id, regression_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                row["exercise_id"].strip(),
-                row["canonical_name"].strip(),
-                row["display_name"].strip(),
-                str(row["equipment_id_1"]).strip(),
-                row["equipment_id_2"],
-                row["complexity_level"],
-                int(row["canonical_rating"]),
-                row["primary_muscle"].strip(),
-                row["secondary_muscle"],
-                row["instructions"] if pd.notna(row["instructions"]) else None,
-                int(row["is_in_programme"]),
-                row["progression_id"],
-                row["regression_id"],
-            ),
-        )
-
-    print(f"  {len(df_exercises)} exercises imported")
-
-    # ============================================
-    # IMPORT CONTRAINDICATIONS
-    # ============================================
-
-    print("Importing contraindications...")
-
-    df_contra = pd.read_csv("exercise_contraindications_prod.csv")
-    df_contra_valid = df_contra[df_contra["injury_type"].notna()]
-
-    for _, row in df_contra_valid.iterrows():
-        cursor.execute(
-            "INSERT OR IGNORE INTO exercise_contraindications (canonical_name, injury_type) VALUES (?, ?)",
-            (row["canonical_name"].strip(), row["injury_type"].strip()),
-        )
-
-    print(f"  {len(df_contra_valid)} contraindications imported")
-
-    # ============================================
-    # IMPORT VIDEO MAPPINGS
-    # ============================================
-
-    print("Importing video mappings...")
 
-    df_videos = pd.read_csv("exercise_video_mapping_prod.csv")
+def view_ddl(compress_instructions):
+    """Compatibility views; compressed instructions are read back through inflate()"""
+    instructions = "inflate(i.instructions)" if compress_instructions else "i.instructions"
+    return [EXERCISES_VIEW_DDL.format(instructions=instructions)]
+
+
+# Created after the load: one sorted build per index instead of
+# maintaining every index row by row
+INDEX_DDL = [
+    "CREATE INDEX idx_equipment_category ON equipment(category)",
+    "CREATE INDEX idx_exercises_canonical ON exercise_core(canonical_name)",
+    "CREATE INDEX idx_exercises_equip1 ON exercise_core(equipment_id_1)",
+    "CREATE INDEX idx_exercises_equip2 ON exercise_core(equipment_id_2)",
+    "CREATE INDEX idx_exercises_complexity ON exercise_core(complexity_level)",
+    "CREATE INDEX idx_exercises_muscle ON exercise_core(primary_muscle)",
+    "CREATE INDEX idx_exercises_programme ON exercise_core(is_in_programme)",
+    "CREATE INDEX idx_exercises_rating ON exercise_core(canonical_rating)",
+    "CREATE INDEX idx_contraindications_canonical ON exercise_contraindications(canonical_name)",
+    "CREATE INDEX idx_contraindications_injury ON exercise_contraindications(injury_type)",
+    "CREATE INDEX idx_videos_exercise_id ON exercise_videos(exercise_id)",
+    "CREATE INDEX idx_videos_bunny_guid ON exercise_videos(bunny_guid)",
+]
+
+# 4 KB matches the APFS block size and the iOS VM page, so each SQLite page
+# read is exactly one device read
+DEFAULT_PAGE_SIZE = 4096
+
+# Data tables in FK order: (table, key columns, value columns, source CSVs).
+# Upserts run in this order and deletes in reverse, so references always resolve.
+TABLES = [
+    ("equipment", ["equipment_id"], ["category", "name", "image_filename"],
+     ["equipment_prod.csv"]),
+    ("exercise_core", ["exercise_id"], [
+        "canonical_name", "display_name", "equipment_id_1", "equipment_id_2",
+        "complexity_level", "canonical_rating", "primary_muscle", "secondary_muscle",
+        "is_in_programme", "progression_id", "regression_id",
+    ], ["exercise_database_prod.csv"]),
+    ("exercise_instructions", ["exercise_id"], ["instructions"],
+     ["exercise_database_prod.csv", "exercise_instructions_prod.csv"]),
+    ("exercise_contraindications", ["canonical_name", "injury_type"], [],
+     ["exercise_contraindications_prod.csv"]),
+    ("exercise_videos", ["exercise_id"], ["supplier_id", "filename", "bunny_guid"],
+     ["exercise_video_mapping_prod.csv"]),
+    ("split_templates", ["days_per_week", "duration", "variant", "session_index", "slot"],
+     ["program", "session_name", "muscle", "exercise_count"], ["split_templates_prod.csv"]),
+]
+
+
+def apply_build_pragmas(conn):
+    """
+    Build-time PRAGMAs for a throwaway load: no rollback journal, no fsync,
+    64 MB page cache, temp B-trees in memory. Safe only because the load
+    goes to a temp file that is discarded if the build fails.
+    """
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -65536")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA foreign_keys = ON")
 
-    video_count = 0
-    for _, row in df_videos.iterrows():
-        if pd.isna(row.get("exercise_id")) or pd.isna(row.get("filename")) or pd.isna(row.get("bunny_guid")):
-            continue
-        if not str(row["filename"]).strip() or not str(row["bunny_guid"]).strip():
-            continue
 
-        cursor.execute(
-            """INSERT INTO exercise_videos (exercise_id, supplier_id, filename, bunny_guid)
-            VALUES (?, ?, ?, ?)""",
-            (
-                row["exercise_id"].strip(),
-                str(row["supplier_id"]).strip() if pd.notna(row["supplier_id"]) else None,
-                row["filename"].strip(),
-                row["bunny_guid"].strip(),
-            ),
-        )
-        video_count += 1
+def file_sha256(path):
+    """Hex SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def schema_fingerprint(compress_instructions=False, profile="standard"):
+    """SHA-256 over every DDL statement, so any schema edit is detected"""
+    ddl = TABLE_DDL + view_ddl(compress_instructions) + DERIVED_TABLE_DDL + INDEX_DDL + DERIVED_INDEX_DDL
+    if profile == "compact":
+        ddl += compact_ddl(compress_instructions)
+    return hashlib.sha256("\n".join(ddl).encode("utf-8")).hexdigest()
+
+
+def build_manifest(source_hashes, compress_instructions=False, profile="standard"):
+    """Manifest key/value pairs for the current schema and sources"""
+    manifest = {
+        "schema_version": str(SCHEMA_VERSION),
+        "schema_sha256": schema_fingerprint(compress_instructions, profile),
+    }
+    if profile != "standard":
+        manifest["profile"] = profile
+    for source, digest in source_hashes.items():
+        manifest[f"source:{source}"] = digest
+    return manifest
+
+
+def read_manifest(db_path):
+    """Manifest of an existing database, or None if there is none to trust"""
+    if not os.path.exists(db_path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT key, value FROM build_manifest").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return None
+
+
+def write_manifest(cursor, manifest):
+    cursor.execute("DELETE FROM build_manifest")
+    cursor.executemany("INSERT INTO build_manifest (key, value) VALUES (?, ?)", sorted(manifest.items()))
+
+
+# ============================================
+# BUILD TIMINGS
+# ============================================
+
+def peak_rss_bytes():
+    """High-water resident set size of this process so far (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # macOS reports bytes, Linux KiB
+
+
+class PhaseTimer:
+    """
+    Wall time and memory per build phase.
+
+    The ingestion pipelines are lazy, so each import phase includes parsing
+    and validating its CSV. Peak RSS is the process high-water mark when the
+    phase ended, SQLite's page cache included. With trace_memory, tracemalloc
+    also records the peak Python heap within each phase (which slows the
+    Python-heavy phases down).
+    """
+
+    def __init__(self, trace_memory=False):
+        self.phases = []
+        self.trace_memory = trace_memory
+        self.started = time.perf_counter()
+        if trace_memory:
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        self.phases.append({
+            "phase": name,
+            "seconds": time.perf_counter() - start,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "python_peak_bytes": tracemalloc.get_traced_memory()[1] if self.trace_memory else None,
+        })
+
+    def summary(self):
+        """Totals and phases as JSON-ready data; time outside any phase is 'other_seconds'"""
+        total = time.perf_counter() - self.started
+        return {
+            "total_seconds": total,
+            "other_seconds": total - sum(p["seconds"] for p in self.phases),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "phases": self.phases,
+        }
+
+    def print_report(self):
+        summary = self.summary()
+        total = summary["total_seconds"]
+
+        def mb(value):
+            return f"{value / 1e6:.1f} MB" if value is not None else "-"
+
+        print("\n" + "=" * 60)
+        print("BUILD TIMINGS")
+        print("=" * 60)
+        heap = "  Python peak" if self.trace_memory else ""
+        print(f"{'Phase':<34} {'Time':>10} {'Share':>6} {'Peak RSS':>10}{heap}")
+        rows = [(p["phase"], p["seconds"], p["peak_rss_bytes"], p["python_peak_bytes"]) for p in self.phases]
+        rows.append(("(other)", summary["other_seconds"], None, None))
+        for name, seconds, rss, python_peak in rows:
+            line = f"{name:<34} {seconds * 1000:>7.1f} ms {seconds / total:>6.1%} {mb(rss):>10}"
+            print(line + (f" {mb(python_peak):>12}" if self.trace_memory else ""))
+        print(f"{'Total':<34} {total * 1000:>7.1f} ms {'':>6} {mb(summary['peak_rss_bytes']):>10}")
+
+
+# ============================================
+# FULL BUILD
+# ============================================
+
+def full_build(db_path, pipelines, manifest, compress_instructions=False, timer=None):
+    """Bulk-load every table from scratch into db_path (an empty temp file)"""
+    timer = timer or PhaseTimer()
+    # Autocommit mode: the load transaction is managed explicitly below
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    apply_build_pragmas(conn)
+    register_sql_functions(conn)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
 
-    print(f"  {video_count} video mappings imported")
+    print("Creating tables...")
+    with timer.phase("create tables"):
+        for ddl in TABLE_DDL + view_ddl(compress_instructions) + DERIVED_TABLE_DDL:
+            cursor.execute(ddl)
+
+    labels = {
+        "equipment": ("equipment", "equipment entries"),
+        "exercise_core": ("exercises", "exercises"),
+        "exercise_instructions": ("instructions", "instructions"),
+        "exercise_contraindications": ("contraindications", "contraindications"),
+        "exercise_videos": ("video mappings", "video mappings"),
+        "split_templates": ("split templates", "template slots"),
+    }
+    for table, keys, values, _ in TABLES:
+        heading, noun = labels[table]
+        print(f"Importing {heading}...")
+        columns = keys + values
+        verb = "INSERT OR IGNORE" if table == "exercise_contraindications" else "INSERT"
+        with timer.phase(f"import {table}"):
+            cursor.executemany(
+                f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                pipelines[table],
+            )
+        print(f"  {cursor.rowcount} {noun} imported")
+
+    print("Building derived tables...")
+    rebuild_derived_tables(cursor, phase=lambda name: timer.phase(f"derived {name}"))
+
+    write_manifest(cursor, manifest)
 
-    # ============================================
-    # VERIFY
-    # ============================================
+    print("Creating indexes...")
+    with timer.phase("indexes"):
+        for ddl in INDEX_DDL + DERIVED_INDEX_DDL:
+            cursor.execute(ddl)
+
+    with timer.phase("commit"):
+        cursor.execute("COMMIT")
+    return conn
+
+
+# ============================================
+# INCREMENTAL BUILD
+# ============================================
+
+def diff_table(cursor, table, keys, values, rows):
+    """
+    Compare desired rows against the table's current contents.
+
+    Returns (upserts, deletes): rows that are new or changed, and key tuples
+    of rows no longer present in the source.
+    """
+    n_keys = len(keys)
+    current = {
+        row[:n_keys]: row[n_keys:]
+        for row in cursor.execute(f"SELECT {', '.join(keys + values)} FROM {table}")
+    }
+    desired = {row[:n_keys]: row[n_keys:] for row in rows}
+
+    upserts = [key + value for key, value in desired.items() if current.get(key) != value]
+    deletes = [key for key in current if key not in desired]
+    return upserts, deletes
+
+
+def upsert_sql(table, keys, values):
+    columns = keys + values
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    if not values:
+        return sql.replace("INSERT", "INSERT OR IGNORE", 1)
+    updates = ", ".join(f"{col} = excluded.{col}" for col in values)
+    return f"{sql} ON CONFLICT({', '.join(keys)}) DO UPDATE SET {updates}"
+
+
+def incremental_build(db_path, pipelines, manifest, changed_tables, timer=None):
+    """Patch only the changed tables of db_path (a temp copy of the current database)"""
+    timer = timer or PhaseTimer()
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    apply_build_pragmas(conn)
+    register_sql_functions(conn)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+
+    # Every pipeline still runs, in FK order, so unchanged sources are validated too
+    specs = [spec for spec in TABLES if spec[0] in changed_tables]
+    diffs = {}
+    for table, keys, values, _ in TABLES:
+        if table in changed_tables:
+            with timer.phase(f"diff {table}"):
+                diffs[table] = diff_table(cursor, table, keys, values, pipelines[table])
+        else:
+            with timer.phase(f"validate {table}"):
+                collections.deque(pipelines[table], maxlen=0)
+
+    with timer.phase("patch tables"):
+        # The derived tables reference base rows about to be deleted; they
+        # are recomputed from scratch below anyway
+        clear_derived_tables(cursor)
+        for table, keys, values, _ in specs:
+            cursor.executemany(upsert_sql(table, keys, values), diffs[table][0])
+
+        for table, keys, values, _ in reversed(specs):
+            where = " AND ".join(f"{col} = ?" for col in keys)
+            cursor.executemany(f"DELETE FROM {table} WHERE {where}", diffs[table][1])
+
+    for table, _, _, _ in specs:
+        upserts, deletes = diffs[table]
+        print(f"  {table}: {len(upserts)} upserted, {len(deletes)} deleted")
+
+    print("Rebuilding derived tables...")
+    rebuild_derived_tables(cursor, phase=lambda name: timer.phase(f"derived {name}"))
+
+    write_manifest(cursor, manifest)
+    with timer.phase("commit"):
+        cursor.execute("COMMIT")
+    return conn
+
+
+def compact_database(conn, page_size):
+    """
+    ANALYZE for planner statistics, then VACUUM to rewrite the file with no
+    free pages, defragmented B-trees and the requested page size.
+    """
+    conn.execute("ANALYZE")
+    conn.execute(f"PRAGMA page_size = {int(page_size)}")
+    conn.execute("VACUUM")
+
+
+def replace_atomically(tmp_path, final_path):
+    """fsync the finished temp file, rename it over final_path, fsync the directory"""
+    os.chmod(tmp_path, 0o644)  # mkstemp creates 0600
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, final_path)
+    dir_fd = os.open(os.path.dirname(final_path), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def changed_tables_since(old_manifest, manifest):
+    """
+    Tables whose sources changed, or None when a full rebuild is required
+    (no manifest, or a different schema).
+    """
+    if old_manifest is None:
+        print("No build manifest found: full rebuild")
+        return None
+    for key in ("schema_version", "schema_sha256"):
+        if old_manifest.get(key) != manifest[key]:
+            print(f"Schema changed ({key}): full rebuild")
+            return None
+
+    return {
+        table
+        for table, _, _, sources in TABLES
+        if any(old_manifest.get(f"source:{s}") != manifest[f"source:{s}"] for s in sources)
+    }
+
+
+# ============================================
+# VERIFY
+# ============================================
+
+def verify_database(conn):
+    """Print the verification report; exits on FK integrity failures. Returns table counts."""
+    cursor = conn.cursor()
 
     print("\n" + "=" * 60)
     print("DATABASE VERIFICATION")
@@ -350,6 +580,11 @@ def create_database():
     vid_count = cursor.fetchone()[0]
     print(f"Video mappings: {vid_count}")
 
+    cursor.execute("""
+        SELECT COUNT(*) FROM (SELECT DISTINCT days_per_week, duration, variant FROM split_templates)
+    """)
+    print(f"Split templates: {cursor.fetchone()[0]}")
+
     # Equipment by category
     print("\nEquipment by category:")
     cursor.execute("""
@@ -416,23 +651,230 @@ def create_database():
         eq2_name = f" + {row[3]}" if row[3] else ""
         print(f"  [{row[0]}] {row[1]} ({row[2]}{eq2_name})")
 
-    # Commit and close
-    conn.commit()
-    conn.close()
+    return eq_count, ex_count, vid_count, contra_count
+
+
+def create_database(incremental=False, page_size=DEFAULT_PAGE_SIZE, audit_queries=False,
+                    compress_instructions=False, profile="standard", source_dir=".", output=None,
+                    binary_catalog=False, timer=None):
+    """
+    Create (or incrementally update) the SQLite database from CSV source files.
+
+    source_dir: directory holding the source CSVs (e.g. synthetic_catalog.py output)
+    output: database path (default: TrainSwift/Resources/exercises.db)
+    binary_catalog: also write exercises.catalog next to it (binary_catalog.py)
+    timer: PhaseTimer that records each phase (a fresh one by default)
+    """
+    timer = timer or PhaseTimer()
+
+    # Check required files
+    required_files = [
+        "equipment_prod.csv",
+        "exercise_database_prod.csv",
+        "exercise_instructions_prod.csv",
+        "exercise_contraindications_prod.csv",
+        "exercise_video_mapping_prod.csv",
+        "split_templates_prod.csv",
+    ]
+    source = {f: os.path.join(source_dir, f) for f in required_files}
+    for f, path in source.items():
+        if not os.path.exists(path):
+            print(f"Error: {path} not found!")
+            sys.exit(1)
+
+    # Determine output path
+    if output is not None:
+        final_db_path = os.path.abspath(output)
+        resources_dir = os.path.dirname(final_db_path)
+    else:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        if os.path.basename(script_dir) == "database-management":
+            resources_dir = os.path.join(script_dir, "..", "TrainSwift", "Resources")
+        else:
+            resources_dir = os.path.join(script_dir, "TrainSwift", "Resources")
+        final_db_path = os.path.join(resources_dir, "exercises.db")
+
+    os.makedirs(resources_dir, exist_ok=True)
+
+    with timer.phase("hash sources"):
+        manifest = build_manifest({f: file_sha256(path) for f, path in source.items()}, compress_instructions, profile)
+
+    changed_tables = None
+    if incremental and profile == "compact":
+        # The standard tables an incremental build patches are views in a compact build
+        print("Compact profile: full rebuild")
+    elif incremental:
+        changed_tables = changed_tables_since(read_manifest(final_db_path), manifest)
+        if changed_tables is not None and not changed_tables:
+            print(f"Database is up to date: {final_db_path}")
+            return
+
+    # ============================================
+    # INGESTION PIPELINES: parse -> validate -> normalise
+    # (lazy: rows flow straight into the inserts; all sources are
+    # validated even on incremental runs since references cross CSVs)
+    # ============================================
+
+    validator = SourceValidator()
+    if not validator.check_headers({f: read_header(path) for f, path in source.items()}):
+        validator.report.print_report()
+        print("Error: source validation failed (missing columns)")
+        sys.exit(1)
+
+    with timer.phase("load instructions"):
+        instructions = instruction_lookup(validator.instructions(read_rows(source["exercise_instructions_prod.csv"])))
+    print(f"Loaded {len(instructions)} instructions")
+
+    pipelines = {
+        "equipment": equipment_rows(validator.equipment(read_rows(source["equipment_prod.csv"]))),
+        "exercise_core": exercise_rows(validator.exercises(read_rows(source["exercise_database_prod.csv"]))),
+        # Runs after exercise_core (TABLES order), once every accepted exercise is known
+        "exercise_instructions": instruction_rows(instructions, validator.exercise_ids, compress_instructions),
+        "exercise_contraindications": contraindication_rows(
+            validator.contraindications(read_rows(source["exercise_contraindications_prod.csv"]))),
+        "exercise_videos": video_rows(validator.videos(read_rows(source["exercise_video_mapping_prod.csv"]))),
+        "split_templates": template_rows(validator.templates(read_rows(source["split_templates_prod.csv"]))),
+    }
+
+    # Build next to the final file (same filesystem, so the rename is atomic);
+    # the existing database is untouched until the new one is complete
+    fd, tmp_db_path = tempfile.mkstemp(prefix=".exercises.", suffix=".db.tmp", dir=resources_dir)
+    os.close(fd)
+    try:
+        if changed_tables is None:
+            print(f"Creating database at: {tmp_db_path}")
+            conn = full_build(tmp_db_path, pipelines, manifest, compress_instructions, timer)
+        else:
+            print(f"Incremental update: {', '.join(sorted(changed_tables))}")
+            with timer.phase("copy database"):
+                shutil.copyfile(final_db_path, tmp_db_path)
+            conn = incremental_build(tmp_db_path, pipelines, manifest, changed_tables, timer)
+
+        # Rows that failed validation were held back from the inserts; the
+        # cross-file checks can only run now that every source has streamed
+        print("\nValidating sources...")
+        with timer.phase("cross-file validation"):
+            report = validator.finish()
+        report.print_report()
+        if not report.ok:
+            conn.close()
+            print(f"Error: source validation failed ({len(report.errors)} errors)")
+            sys.exit(1)
+
+        print("\nChecking facet tables...")
+        with timer.phase("facet check"):
+            problems = facet_mismatches(conn)
+        for problem in problems:
+            print(f"  {problem}")
+        if problems:
+            conn.close()
+            print("Error: facet_values disagrees with the base tables")
+            sys.exit(1)
+        print("  Every facet matches the app's lookups")
+
+        if profile == "compact":
+            print("\nConverting to the compact profile...")
+            with timer.phase("compact profile"):
+                conn.execute("BEGIN")
+                mismatched = apply_compact_profile(conn.cursor(), compress_instructions)
+                conn.execute("COMMIT")
+            if mismatched:
+                conn.close()
+                print(f"Error: compact views differ from the standard tables: {', '.join(mismatched)}")
+                sys.exit(1)
+            print(f"  Dropped the derived tables ({', '.join(DERIVED_TABLES)}) and the search index")
+
+        with timer.phase("verification queries"):
+            eq_count, ex_count, vid_count, contra_count = verify_database(conn)
+
+        print(f"\nCompacting (ANALYZE, VACUUM, page_size={page_size})...")
+        with timer.phase("analyze + vacuum"):
+            compact_database(conn, page_size)
+
+        if audit_queries:
+            # After ANALYZE, so plans are the ones the app will get
+            print("\nAuditing canonical query plans...")
+            with timer.phase("query audit"):
+                audit = audit_database(conn, iterations=20)
+            audit.print_report()
+            if not audit.ok:
+                conn.close()
+                print("Error: canonical queries regressed to a scan")
+                sys.exit(1)
+
+        conn.close()
+
+        with timer.phase("replace"):
+            replace_atomically(tmp_db_path, final_db_path)
+    finally:
+        if os.path.exists(tmp_db_path):
+            os.remove(tmp_db_path)
+
+    if binary_catalog:
+        # From the finished file, so the catalog records its final SHA-256
+        print("\nExporting binary catalog...")
+        with timer.phase("binary catalog"):
+            path = export_catalog(final_db_path)
+        print(f"  {path} ({os.path.getsize(path)} bytes)")
+    elif os.path.exists(catalog_path(final_db_path)):
+        # Exported from the database just replaced, so it no longer matches
+        os.remove(catalog_path(final_db_path))
+        print(f"\nRemoved stale binary catalog {catalog_path(final_db_path)}")
 
     print("\n" + "=" * 60)
     print("SUCCESS!")
     print("=" * 60)
     print(f"Database: {final_db_path}")
     print(f"Size: {os.path.getsize(final_db_path)} bytes")
+    print(f"SHA-256: {file_sha256(final_db_path)}")
     print(f"Equipment: {eq_count} | Exercises: {ex_count} | Videos: {vid_count} | Contraindications: {contra_count}")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build exercises.db from the production CSVs")
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only re-import tables whose source CSVs changed since the last build '
+                             '(falls back to a full rebuild on schema changes)')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'SQLite page size of the output file (default: {DEFAULT_PAGE_SIZE})')
+    parser.add_argument('--audit-queries', action='store_true',
+                        help="Replay the app's canonical queries (query_audit.py) and fail the build "
+                             "if any regressed to a scan")
+    parser.add_argument('--compress-instructions', action='store_true',
+                        help='Store instructions zlib-compressed. Readers of the exercises view must '
+                             'register the inflate() SQL function (ingest.register_sql_functions)')
+    parser.add_argument('--profile', choices=['standard', 'compact'], default='standard',
+                        help='compact: integer surrogate keys and lookup tables behind compatibility '
+                             'views. DROPS the derived tables (exercise_masks, progression_closure, ...) '
+                             'and the search index; readers of those get nothing (compact_profile.py)')
+    parser.add_argument('--source-dir', default='.',
+                        help='Directory holding the source CSVs (default: the current directory)')
+    parser.add_argument('--output', help='Database to write (default: TrainSwift/Resources/exercises.db)')
+    parser.add_argument('--binary-catalog', action='store_true',
+                        help='Also write a memory-mappable binary catalog next to the database (binary_catalog.py)')
+    parser.add_argument('--timings', action='store_true', help='Print wall time and peak memory per build phase')
+    parser.add_argument('--timings-json', metavar='PATH', help='Write the phase timings to PATH as JSON')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Also record the peak Python heap per phase with tracemalloc (slower)')
+    args = parser.parse_args()
+
+    if args.page_size < 512 or args.page_size > 65536 or args.page_size & (args.page_size - 1):
+        parser.error("--page-size must be a power of two between 512 and 65536")
+
+    timer = PhaseTimer(trace_memory=args.trace_memory)
     try:
-        create_database()
+        create_database(incremental=args.incremental, page_size=args.page_size, audit_queries=args.audit_queries,
+                        compress_instructions=args.compress_instructions, profile=args.profile,
+                        source_dir=args.source_dir, output=args.output, binary_catalog=args.binary_catalog,
+                        timer=timer)
     except Exception as e:
         print(f"\nError: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
+
+    if args.timings:
+        timer.print_report()
+    if args.timings_json:
+        with open(args.timings_json, "w", encoding="utf-8") as f:
+            json.dump(timer.summary(), f, indent=2)
@@ -0,0 +1,413 @@
+"""
+Derived tables for exercises.db
+===============================
+Tables computed from the base tables (equipment, exercise_core, ...) rather than
+loaded from CSV. They are rebuilt from scratch as a post-load stage of every
+build, full or incremental, so they can never drift from the base data.
+
+Adding a derived table: append its DDL to DERIVED_TABLE_DDL (and any
+indexes to DERIVED_INDEX_DDL), its name to DERIVED_TABLES, and a stage
+function taking a cursor to DERIVED_STAGES.
+"""
+
+import contextlib
+from typing import Dict, List, Set
+
+from validation import split_ids
+
+
+DERIVED_TABLE_DDL = [
+    # Bit position of each equipment item in the equipment masks
+    # (equipment_id in sorted order, so bit numbering is reproducible)
+    """
+    CREATE TABLE equipment_bits (
+        equipment_id TEXT PRIMARY KEY REFERENCES equipment(equipment_id),
+        bit INTEGER NOT NULL UNIQUE
+    )
+    """,
+    # One row per (equipment, exercise that needs it). Keyed by equipment
+    # first so "exercises usable with equipment X" is a primary-key search
+    """
+    CREATE TABLE exercise_equipment (
+        equipment_id TEXT NOT NULL REFERENCES equipment(equipment_id),
+        exercise_id TEXT NOT NULL REFERENCES exercise_core(exercise_id),
+        slot INTEGER NOT NULL CHECK(slot IN (1, 2)),
+        PRIMARY KEY (equipment_id, exercise_id)
+    ) WITHOUT ROWID
+    """,
+    # Required equipment per exercise as a bitmask over equipment_bits
+    # (little-endian BLOB, same width for every row) plus the number of
+    # distinct items required, and the injury types its canonical_name is
+    # contraindicated for as an INTEGER bitmask over injury_bits
+    """
+    CREATE TABLE exercise_masks (
+        exercise_id TEXT PRIMARY KEY REFERENCES exercise_core(exercise_id),
+        equipment_mask BLOB NOT NULL,
+        equipment_count INTEGER NOT NULL,
+        injury_mask INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """,
+    # Bit position of each injury type in exercise_masks.injury_mask
+    # (injury_type in sorted order)
+    """
+    CREATE TABLE injury_bits (
+        injury_type TEXT PRIMARY KEY,
+        bit INTEGER NOT NULL UNIQUE CHECK(bit BETWEEN 0 AND 62)
+    )
+    """,
+    # Transitive closure of the progression chains (progression_id and
+    # regression_id edges, easier -> harder). One row per (ancestor,
+    # descendant) with the shortest number of steps between them, including
+    # a depth-0 row for every exercise, and both ends' required-equipment
+    # masks (exercise_masks format) so a ladder and its equipment test are
+    # one indexed read
+    """
+    CREATE TABLE progression_closure (
+        ancestor_id TEXT NOT NULL REFERENCES exercise_core(exercise_id),
+        descendant_id TEXT NOT NULL REFERENCES exercise_core(exercise_id),
+        depth INTEGER NOT NULL CHECK(depth >= 0),
+        ancestor_mask BLOB NOT NULL,
+        descendant_mask BLOB NOT NULL,
+        PRIMARY KEY (ancestor_id, depth, descendant_id)
+    ) WITHOUT ROWID
+    """,
+    # Swap alternatives: for each exercise, the other exercises with its
+    # canonical_name, ranked by canonical_rating (then display_name), with
+    # the columns the app filters alternatives on and the required-equipment
+    # mask, so a lookup for any user is one primary-key range read plus a
+    # mask test (exercise_alternatives.py)
+    """
+    CREATE TABLE exercise_alternatives (
+        exercise_id TEXT NOT NULL REFERENCES exercise_core(exercise_id),
+        rank INTEGER NOT NULL,
+        alternative_id TEXT NOT NULL REFERENCES exercise_core(exercise_id),
+        canonical_rating INTEGER NOT NULL,
+        complexity_level TEXT NOT NULL,
+        is_in_programme INTEGER NOT NULL,
+        same_muscle INTEGER NOT NULL,
+        equipment_mask BLOB NOT NULL,
+        PRIMARY KEY (exercise_id, rank)
+    ) WITHOUT ROWID
+    """,
+    # Precomputed answers to the app's DISTINCT picker lookups
+    # (ExerciseDatabaseManager.fetchAvailable*): every value of each facet
+    # with its count, so a picker is one primary-key range read. scope is
+    # the category for equipment_name and '' otherwise (see FACET_SQL)
+    """
+    CREATE TABLE facet_values (
+        facet TEXT NOT NULL,
+        scope TEXT NOT NULL DEFAULT '',
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL CHECK(count >= 0),
+        PRIMARY KEY (facet, scope, value)
+    ) WITHOUT ROWID
+    """,
+    # Text the search index covers, keyed by exercise_core rowid
+    """
+    CREATE VIEW exercises_fts_content AS
+    SELECT c.rowid AS rowid, c.display_name, c.canonical_name, e.instructions
+    FROM exercise_core c
+    JOIN exercises e ON e.exercise_id = c.exercise_id
+    """,
+    # Full-text index for the exercise library search (exercise_search.py).
+    # External content: the text stays in the base tables and FTS rowids are
+    # exercise_core rowids. Prefix indexes make short search-as-you-type
+    # prefixes (MATCH 'sq*') index lookups
+    """
+    CREATE VIRTUAL TABLE exercises_fts USING fts5(
+        display_name,
+        canonical_name,
+        instructions,
+        content = 'exercises_fts_content',
+        content_rowid = 'rowid',
+        prefix = '2 3',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+]
+
+# The WITHOUT ROWID primary keys cover the compatibility lookups and the
+# harder-than ladder; this covers the easier-than ladder
+DERIVED_INDEX_DDL = [
+    "CREATE INDEX idx_progression_closure_descendant "
+    "ON progression_closure(descendant_id, depth, ancestor_id, ancestor_mask)",
+]
+
+# Cleared before the stages run (dependents first). exercises_fts is an
+# external-content index and is cleared by its own 'rebuild'
+DERIVED_TABLES = ["exercise_alternatives", "progression_closure", "exercise_masks", "exercise_equipment", "equipment_bits",
+                  "injury_bits", "facet_values"]
+
+# injury_mask is a signed 64-bit INTEGER, so bitwise tests work in SQL;
+# bit 63 is the sign bit and stays unused
+MAX_INJURY_TYPES = 63
+
+
+def mask_to_blob(mask: int, width: int) -> bytes:
+    return mask.to_bytes(width, "little")
+
+
+def blob_to_mask(blob: bytes) -> int:
+    return int.from_bytes(blob, "little")
+
+
+def build_equipment_compatibility(cursor):
+    """
+    equipment_bits, exercise_equipment and exercise_masks.
+
+    An exercise is usable with a set of equipment exactly when every item
+    it requires is in the set:
+      - masks:    (equipment_mask & ~user_mask) == 0
+      - junction: COUNT of its rows with equipment_id IN (user set)
+                  equals exercise_masks.equipment_count (primary-key
+                  searches on both tables, see COMPATIBLE_EXERCISES_SQL)
+    """
+    bits: Dict[str, int] = {
+        equipment_id: bit
+        for bit, (equipment_id,) in enumerate(
+            cursor.execute("SELECT equipment_id FROM equipment ORDER BY equipment_id").fetchall()
+        )
+    }
+    cursor.executemany("INSERT INTO equipment_bits (equipment_id, bit) VALUES (?, ?)", bits.items())
+
+    required = cursor.execute(
+        "SELECT exercise_id, equipment_id_1, equipment_id_2 FROM exercise_core ORDER BY exercise_id"
+    ).fetchall()
+
+    # An exercise listing the same item twice needs it once
+    cursor.executemany(
+        "INSERT INTO exercise_equipment (equipment_id, exercise_id, slot) VALUES (?, ?, ?)",
+        (
+            (equipment_id, exercise_id, slot)
+            for exercise_id, eq1, eq2 in required
+            for slot, equipment_id in ((1, eq1), (2, eq2))
+            if equipment_id is not None and not (slot == 2 and eq2 == eq1)
+        ),
+    )
+
+    width = max(1, (len(bits) + 7) // 8)
+    rows = []
+    for exercise_id, eq1, eq2 in required:
+        needed = {eq for eq in (eq1, eq2) if eq is not None}
+        mask = 0
+        for equipment_id in needed:
+            mask |= 1 << bits[equipment_id]
+        rows.append((exercise_id, mask_to_blob(mask, width), len(needed)))
+    cursor.executemany(
+        "INSERT INTO exercise_masks (exercise_id, equipment_mask, equipment_count) VALUES (?, ?, ?)", rows
+    )
+
+
+# "Which exercises can this user do" for a user equipment set of n items
+COMPATIBLE_EXERCISES_SQL = """
+    SELECT x.exercise_id FROM exercise_equipment x
+    WHERE x.equipment_id IN ({placeholders})
+    GROUP BY x.exercise_id
+    HAVING COUNT(*) = (SELECT m.equipment_count FROM exercise_masks m WHERE m.exercise_id = x.exercise_id)
+"""
+
+
+def compatible_exercises_sql(n: int) -> str:
+    return COMPATIBLE_EXERCISES_SQL.format(placeholders=", ".join("?" * n))
+
+
+def build_injury_masks(cursor):
+    """
+    injury_bits, and exercise_masks.injury_mask from the contraindications
+    of each exercise's canonical_name
+    """
+    injury_types = [row[0] for row in cursor.execute(
+        "SELECT DISTINCT injury_type FROM exercise_contraindications ORDER BY injury_type"
+    ).fetchall()]
+    if len(injury_types) > MAX_INJURY_TYPES:
+        raise ValueError(f"{len(injury_types)} injury types; injury_mask holds at most {MAX_INJURY_TYPES}")
+    bits = {injury_type: bit for bit, injury_type in enumerate(injury_types)}
+    cursor.executemany("INSERT INTO injury_bits (injury_type, bit) VALUES (?, ?)", bits.items())
+
+    by_canonical: Dict[str, int] = {}
+    for canonical_name, injury_type in cursor.execute(
+        "SELECT canonical_name, injury_type FROM exercise_contraindications"
+    ).fetchall():
+        by_canonical[canonical_name] = by_canonical.get(canonical_name, 0) | 1 << bits[injury_type]
+
+    cursor.executemany(
+        "UPDATE exercise_masks SET injury_mask = ? WHERE exercise_id IN "
+        "(SELECT exercise_id FROM exercise_core WHERE canonical_name = ?)",
+        ((mask, canonical_name) for canonical_name, mask in sorted(by_canonical.items())),
+    )
+
+
+# "Which of these exercises conflict with any of these injuries": one
+# bitwise test per exercise (n exercise IDs, then m injury types)
+INJURY_CONFLICTS_SQL = """
+    SELECT m.exercise_id FROM exercise_masks m
+    WHERE m.exercise_id IN ({exercise_placeholders})
+    AND m.injury_mask & (SELECT SUM(1 << b.bit) FROM injury_bits b WHERE b.injury_type IN ({injury_placeholders})) != 0
+"""
+
+
+def injury_conflicts_sql(n_exercises: int, n_injuries: int) -> str:
+    return INJURY_CONFLICTS_SQL.format(exercise_placeholders=", ".join("?" * n_exercises),
+                                       injury_placeholders=", ".join("?" * n_injuries))
+
+
+# (scope, value, count) rows of each facet. Counts are programme exercises
+# (by equipment_id_1 for the equipment facets, as the app joins) and
+# contraindication rows for injury_type. equipment_name lists every item,
+# used or not, except the one named after its category (Barbells,
+# Dumbbells, ...), like fetchAvailableEquipmentSpecific
+FACET_SQL = {
+    "programme_canonical_name": """
+        SELECT '', canonical_name, COUNT(*) FROM exercise_core
+        WHERE is_in_programme = 1 GROUP BY canonical_name
+    """,
+    "equipment_category": """
+        SELECT '', eq.category, COUNT(*) FROM exercise_core ex
+        JOIN equipment eq ON eq.equipment_id = ex.equipment_id_1
+        WHERE ex.is_in_programme = 1 GROUP BY eq.category
+    """,
+    "equipment_name": """
+        SELECT eq.category, eq.name, COUNT(ex.exercise_id) FROM equipment eq
+        LEFT JOIN exercise_core ex ON ex.equipment_id_1 = eq.equipment_id AND ex.is_in_programme = 1
+        WHERE eq.name != eq.category
+        GROUP BY eq.category, eq.name
+    """,
+    "primary_muscle": """
+        SELECT '', primary_muscle, COUNT(*) FROM exercise_core
+        WHERE is_in_programme = 1 GROUP BY primary_muscle
+    """,
+    "injury_type": """
+        SELECT '', injury_type, COUNT(*) FROM exercise_contraindications GROUP BY injury_type
+    """,
+}
+
+# Values of one facet (and scope) in the order the app's lookups return them
+FACET_VALUES_SQL = "SELECT value, count FROM facet_values WHERE facet = ? AND scope = ? ORDER BY value"
+
+
+def build_facet_values(cursor):
+    """facet_values, one grouped insert per facet"""
+    for facet, sql in FACET_SQL.items():
+        cursor.execute(f"INSERT INTO facet_values (facet, scope, value, count) SELECT ?, * FROM ({sql})", (facet,))
+
+
+def build_search_index(cursor):
+    """exercises_fts, re-indexed from its content view and merged into a single b-tree"""
+    cursor.execute("INSERT INTO exercises_fts (exercises_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO exercises_fts (exercises_fts) VALUES ('optimize')")
+
+
+def build_progression_closure(cursor):
+    """
+    progression_closure, by a breadth-first walk up from every exercise.
+
+    A.progression_id = B and B.regression_id = A both give the edge A -> B,
+    so a link recorded on only one side (a validation warning) still joins
+    the chain. Validation has already rejected cycles and dangling links.
+    """
+    harder: Dict[str, Set[str]] = {}
+    for exercise_id, progressions, regressions in cursor.execute(
+        "SELECT exercise_id, progression_id, regression_id FROM exercise_core"
+    ).fetchall():
+        harder.setdefault(exercise_id, set()).update(split_ids(progressions))
+        for easier_id in split_ids(regressions):
+            harder.setdefault(easier_id, set()).add(exercise_id)
+
+    masks = dict(cursor.execute("SELECT exercise_id, equipment_mask FROM exercise_masks").fetchall())
+
+    def rows():
+        for ancestor_id in sorted(masks):
+            depths = {ancestor_id: 0}
+            frontier = [ancestor_id]
+            while frontier:
+                step = []
+                for exercise_id in frontier:
+                    for descendant_id in sorted(harder.get(exercise_id, ())):
+                        if descendant_id not in depths:
+                            depths[descendant_id] = depths[exercise_id] + 1
+                            step.append(descendant_id)
+                frontier = step
+            for descendant_id, depth in depths.items():
+                yield ancestor_id, descendant_id, depth, masks[ancestor_id], masks[descendant_id]
+
+    cursor.executemany(
+        "INSERT INTO progression_closure "
+        "(ancestor_id, descendant_id, depth, ancestor_mask, descendant_mask) VALUES (?, ?, ?, ?, ?)",
+        rows(),
+    )
+
+
+def build_exercise_alternatives(cursor):
+    """exercise_alternatives, from the canonical_name groups of exercise_core"""
+    groups: Dict[str, List[tuple]] = {}
+    for row in cursor.execute("""
+        SELECT c.canonical_name, c.exercise_id, c.canonical_rating, c.display_name,
+               c.complexity_level, c.is_in_programme, c.primary_muscle, m.equipment_mask
+        FROM exercise_core c JOIN exercise_masks m ON m.exercise_id = c.exercise_id
+        ORDER BY c.canonical_rating DESC, c.display_name, c.exercise_id
+    """).fetchall():
+        groups.setdefault(row[0], []).append(row[1:])
+
+    def rows():
+        for canonical_name in sorted(groups):
+            group = groups[canonical_name]
+            for exercise_id, _, _, _, _, muscle, _ in group:
+                alternatives = (alt for alt in group if alt[0] != exercise_id)
+                for rank, (alternative_id, rating, _, complexity, in_programme, alt_muscle, mask) \
+                        in enumerate(alternatives, start=1):
+                    yield (exercise_id, rank, alternative_id, rating, complexity, in_programme,
+                           int(alt_muscle == muscle), mask)
+
+    cursor.executemany(
+        "INSERT INTO exercise_alternatives (exercise_id, rank, alternative_id, canonical_rating, "
+        "complexity_level, is_in_programme, same_muscle, equipment_mask) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        rows(),
+    )
+
+
+# Ladder reads: exercises harder / easier than ? (depth 0 is the exercise itself)
+HARDER_SQL = """
+    SELECT descendant_id, depth, descendant_mask FROM progression_closure
+    WHERE ancestor_id = ? AND depth > 0 ORDER BY depth, descendant_id
+"""
+EASIER_SQL = """
+    SELECT ancestor_id, depth, ancestor_mask FROM progression_closure
+    WHERE descendant_id = ? AND depth > 0 ORDER BY depth, ancestor_id
+"""
+
+# Swap alternatives of ?, best first; filtering and the mask test happen in
+# the reader (exercise_alternatives.find_alternatives)
+ALTERNATIVES_SQL = """
+    SELECT alternative_id, complexity_level, is_in_programme, same_muscle, equipment_mask
+    FROM exercise_alternatives WHERE exercise_id = ? ORDER BY rank
+"""
+
+DERIVED_STAGES = [
+    build_equipment_compatibility,
+    build_injury_masks,
+    build_search_index,
+    build_progression_closure,
+    build_exercise_alternatives,
+    build_facet_values,
+]
+
+
+def clear_derived_tables(cursor):
+    """
+    Empty every derived table. They reference exercise_core and equipment,
+    so an incremental build clears them before deleting base rows.
+    """
+    for table in DERIVED_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+
+
+def rebuild_derived_tables(cursor, phase=None):
+    """
+    Compute every derived table from the current base tables into empty
+    derived tables (new, or emptied by clear_derived_tables).
+    phase, if given, wraps each stage: phase(name) returns a context manager
+    (e.g. create_database_prod.PhaseTimer.phase) and name drops "build_".
+    """
+    for stage in DERIVED_STAGES:
+        with phase(stage.__name__.removeprefix("build_")) if phase else contextlib.nullcontext():
+            stage(cursor)
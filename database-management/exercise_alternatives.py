@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Exercise swap alternatives over exercises.db
+============================================
+Reads the exercise_alternatives table that derived_tables.py builds: for
+each exercise, the other exercises with its canonical_name, ranked by
+canonical_rating, each with its required-equipment mask. Alternatives for
+any user are one primary-key range read plus a mask test, instead of the
+fetchExercises query the app re-runs for every swap
+(ExerciseDatabaseManager.fetchAlternatives).
+
+Usage:
+    python exercise_alternatives.py EX001                       # every alternative
+    python exercise_alternatives.py EX001 --equipment EP001,EP010 --max-complexity 1
+    python exercise_alternatives.py --benchmark                 # vs fetchExercises at 1x, 10x, 100x
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from typing import Iterable, List, Optional, Sequence
+
+from derived_tables import ALTERNATIVES_SQL, blob_to_mask, clear_derived_tables, rebuild_derived_tables
+from layout_benchmark import scaled_copy
+
+
+BENCHMARK_SCALES = [1, 10, 100]
+
+
+def allowed_complexities(max_complexity: int) -> Sequence[str]:
+    """complexity_level values fetchExercises accepts for a user's max complexity"""
+    return ("All", "1") if max_complexity == 1 else ("All", "1", "2")
+
+
+def user_equipment_mask(conn: sqlite3.Connection, equipment_ids: Iterable[str]) -> int:
+    """Bitmask over equipment_bits for a user's equipment IDs (unknown IDs are ignored)"""
+    bits = dict(conn.execute("SELECT equipment_id, bit FROM equipment_bits"))
+    mask = 0
+    for equipment_id in equipment_ids:
+        if equipment_id in bits:
+            mask |= 1 << bits[equipment_id]
+    return mask
+
+
+def find_alternatives(conn: sqlite3.Connection, exercise_id: str, user_mask: Optional[int] = None,
+                      max_complexity: int = 2, same_muscle: bool = True, only_programme: bool = True,
+                      exclude: Iterable[str] = ()) -> List[str]:
+    """
+    Alternative exercise IDs for a swap, best canonical_rating first. Applies
+    the same filters as ExerciseRepository.findAlternatives: same primary
+    muscle, in the programme, the user's equipment (user_mask None = no
+    equipment filter) and max complexity.
+    """
+    complexities = allowed_complexities(max_complexity)
+    excluded = set(exclude)
+    alternatives = []
+    for alternative_id, complexity, in_programme, muscle_matches, mask in conn.execute(ALTERNATIVES_SQL,
+                                                                                       (exercise_id,)):
+        if complexity not in complexities or alternative_id in excluded:
+            continue
+        if (only_programme and not in_programme) or (same_muscle and not muscle_matches):
+            continue
+        if user_mask is not None and blob_to_mask(mask) & ~user_mask:
+            continue
+        alternatives.append(alternative_id)
+    return alternatives
+
+
+def fetch_alternatives_sql(n_equipment: int, max_complexity: int) -> str:
+    """The query GRDB generates for fetchAlternatives: canonical + muscle + equipment + complexity"""
+    ids = ", ".join("?" * n_equipment)
+    complexity = " OR ".join(f'("complexity_level" = \'{c}\')' for c in allowed_complexities(max_complexity))
+    return (
+        f'SELECT * FROM "exercises" WHERE ("is_in_programme" = 1) AND ("canonical_name" = ?) '
+        f'AND ("primary_muscle" = ?) '
+        f'AND (("equipment_id_1" IN ({ids})) AND (("equipment_id_2" IS NULL) OR ("equipment_id_2" IN ({ids})))) '
+        f'AND ({complexity})'
+    )
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def run_benchmark(db_path: str, scales: Sequence[int] = BENCHMARK_SCALES, lookups: int = 500):
+    """
+    Median per-lookup latency of find_alternatives against the app's
+    fetchAlternatives query, for random exercises and a typical gym (every
+    item in the three most used equipment categories), max complexity 2.
+    The catalog is scaled with canonical names suffixed per copy, so it
+    has more movement groups of today's size.
+    """
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    print(f"{'Scale':>6} {'Exercises':>10}  {'Precomputed':>12} {'fetchExercises':>15} {'Speed-up':>9}")
+    for scale in scales:
+        conn = scaled_copy(source, scale, suffixed=("exercise_id", "canonical_name"))
+        clear_derived_tables(conn.cursor())
+        rebuild_derived_tables(conn.cursor())
+        conn.execute("ANALYZE")
+
+        categories = [row[0] for row in conn.execute("""
+            SELECT eq.category FROM exercise_core ex
+            JOIN equipment eq ON eq.equipment_id = ex.equipment_id_1
+            GROUP BY eq.category ORDER BY COUNT(*) DESC, eq.category LIMIT 3
+        """)]
+        equipment_ids = [row[0] for row in conn.execute(
+            f"SELECT equipment_id FROM equipment WHERE category IN ({', '.join('?' * len(categories))}) "
+            "ORDER BY equipment_id", categories)]
+        user_mask = user_equipment_mask(conn, equipment_ids)
+        baseline_sql = fetch_alternatives_sql(len(equipment_ids), 2)
+
+        exercises = conn.execute(
+            "SELECT exercise_id, canonical_name, primary_muscle FROM exercise_core ORDER BY exercise_id"
+        ).fetchall()
+        sample = random.Random(0).sample(exercises, min(lookups, len(exercises)))
+
+        precomputed, baseline = [], []
+        for exercise_id, canonical_name, muscle in sample:
+            start = time.perf_counter_ns()
+            fast = find_alternatives(conn, exercise_id, user_mask)
+            precomputed.append(time.perf_counter_ns() - start)
+
+            start = time.perf_counter_ns()
+            rows = conn.execute(baseline_sql, [canonical_name, muscle] + equipment_ids + equipment_ids).fetchall()
+            slow = [row[0] for row in rows if row[0] != exercise_id]
+            baseline.append(time.perf_counter_ns() - start)
+
+            if set(fast) != set(slow):
+                print(f"Warning: {exercise_id} alternatives differ: {sorted(fast)} vs {sorted(slow)}")
+
+        fast_us, slow_us = statistics.median(precomputed) / 1000, statistics.median(baseline) / 1000
+        print(f"{scale:>5}x {len(exercises):>10}  {fast_us:>10.1f}µs {slow_us:>13.1f}µs {slow_us / fast_us:>8.1f}x")
+        conn.close()
+    source.close()
+
+
+def default_db_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "..", "TrainSwift", "Resources", "exercises.db")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up precomputed swap alternatives in exercises.db")
+    parser.add_argument('exercise_id', nargs='?', help='Exercise to find alternatives for')
+    parser.add_argument('--db', default=default_db_path(), help='Database to read')
+    parser.add_argument('--equipment', help="Comma-separated equipment IDs the user has (default: don't filter)")
+    parser.add_argument('--max-complexity', type=int, choices=[1, 2], default=2,
+                        help='1 = beginners (All and 1), 2 = everything (default)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time lookups against the fetchExercises query at 1x, 10x and 100x catalog size')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: {args.db} not found!")
+        sys.exit(1)
+
+    if args.benchmark:
+        run_benchmark(args.db)
+        return
+    if args.exercise_id is None:
+        parser.error("exercise_id is required unless --benchmark is given")
+
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        user_mask = None
+        if args.equipment:
+            user_mask = user_equipment_mask(conn, args.equipment.split(","))
+        alternatives = find_alternatives(conn, args.exercise_id, user_mask, args.max_complexity)
+        names = dict(conn.execute("SELECT exercise_id, display_name FROM exercise_core"))
+    except sqlite3.OperationalError as e:
+        print(f"Error: {e} (rebuild the database with create_database_prod.py)")
+        sys.exit(1)
+    finally:
+        conn.close()
+    for alternative_id in alternatives:
+        print(f"  [{alternative_id}] {names[alternative_id]}")
+    if not alternatives:
+        print("  No alternatives")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Exercise library search over exercises.db
+=========================================
+Full-text search backed by the exercises_fts FTS5 table that
+derived_tables.py builds. It covers display_name, canonical_name and
+instructions. The last word typed is matched as a prefix, so "barbell sq"
+finds "Barbell Back Squat" as the user types.
+
+Exercises whose display or canonical name matches every word come first.
+Within each group, results are ranked by bm25, with name columns weighted
+above the instruction text.
+
+Usage:
+    python exercise_search.py "bench press"            # search TrainSwift/Resources/exercises.db
+    python exercise_search.py "curl" --muscle Biceps
+    python exercise_search.py --benchmark              # FTS vs LIKE at 1x, 10x, 100x catalog size
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from derived_tables import build_search_index
+from layout_benchmark import scaled_copy
+
+
+# bm25 column weights, in exercises_fts column order
+# (display_name, canonical_name, instructions)
+RANK_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Exercises whose names match every word rank first, then bm25.
+# exercises_fts shares rowids with exercise_core; joining on rowid rather
+# than exercise_id keeps the planner driving from the MATCH
+SEARCH_SQL = f"""
+    SELECT e.exercise_id, e.display_name
+    FROM exercises_fts f
+    JOIN exercise_core e ON e.rowid = f.rowid
+    WHERE exercises_fts MATCH ?{{muscle_filter}}
+    ORDER BY f.rowid IN (SELECT rowid FROM exercises_fts WHERE exercises_fts MATCH ?) DESC,
+             bm25(exercises_fts, {", ".join(str(w) for w in RANK_WEIGHTS)}), e.display_name
+    LIMIT ?
+"""
+
+# Substring search without the FTS table
+LIKE_SQL = """
+    SELECT exercise_id, display_name
+    FROM exercises
+    WHERE (display_name LIKE ? OR canonical_name LIKE ? OR instructions LIKE ?){muscle_filter}
+    ORDER BY display_name
+    LIMIT ?
+"""
+
+BENCHMARK_QUERIES = ["bench press", "sq", "dumbbell curl", "shoulder blades", "lat"]
+BENCHMARK_SCALES = [1, 10, 100]
+
+
+def match_expression(text: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text typed by the user.
+
+    Every word must match (implicit AND). Words are quoted so punctuation
+    and FTS operators in the input ("AND", "-", '"') are searched for
+    literally, and the last word gets a prefix match. Returns None when
+    the text contains no searchable words.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_exercises(conn: sqlite3.Connection, text: str, muscle: Optional[str] = None,
+                     limit: int = 20) -> List[Tuple[str, str]]:
+    """(exercise_id, display_name) of the best matches for text, best first"""
+    expression = match_expression(text)
+    if expression is None:
+        return []
+    params: List = [expression]
+    muscle_filter = ""
+    if muscle is not None:
+        muscle_filter = " AND e.primary_muscle = ?"
+        params.append(muscle)
+    params.append(f"{{display_name canonical_name}} : ({expression})")
+    params.append(limit)
+    return conn.execute(SEARCH_SQL.format(muscle_filter=muscle_filter), params).fetchall()
+
+
+def like_search(conn: sqlite3.Connection, text: str, muscle: Optional[str] = None,
+                limit: int = 20) -> List[Tuple[str, str]]:
+    """Substring search with LIKE scans, the baseline for --benchmark"""
+    pattern = f"%{text}%"
+    params: List = [pattern, pattern, pattern]
+    muscle_filter = ""
+    if muscle is not None:
+        muscle_filter = " AND primary_muscle = ?"
+        params.append(muscle)
+    params.append(limit)
+    return conn.execute(LIKE_SQL.format(muscle_filter=muscle_filter), params).fetchall()
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def median_us(search, conn: sqlite3.Connection, text: str, iterations: int) -> float:
+    search(conn, text)  # warm the page cache
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        search(conn, text)
+        samples.append(time.perf_counter_ns() - start)
+    return statistics.median(samples) / 1000
+
+
+def run_benchmark(db_path: str, scales: Sequence[int] = BENCHMARK_SCALES,
+                  queries: Sequence[str] = BENCHMARK_QUERIES, iterations: int = 50):
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    print(f"{'Scale':>6} {'Exercises':>10}  {'Query':<18} {'FTS5':>10} {'LIKE':>10} {'Speed-up':>9}")
+    for scale in scales:
+        conn = scaled_copy(source, scale)
+        build_search_index(conn.cursor())
+        count = conn.execute("SELECT COUNT(*) FROM exercises").fetchone()[0]
+        for text in queries:
+            fts = median_us(search_exercises, conn, text, iterations)
+            like = median_us(like_search, conn, text, iterations)
+            print(f"{scale:>5}x {count:>10}  {text:<18} {fts:>8.1f}µs {like:>8.1f}µs {like / fts:>8.1f}x")
+        conn.close()
+    source.close()
+
+
+def default_db_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "..", "TrainSwift", "Resources", "exercises.db")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the exercise library in exercises.db")
+    parser.add_argument('text', nargs='?', help='Search text')
+    parser.add_argument('--db', default=default_db_path(), help='Database to search')
+    parser.add_argument('--muscle', help='Only exercises with this primary muscle')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum results (default: 20)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time FTS5 against LIKE scans at 1x, 10x and 100x catalog size')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: {args.db} not found!")
+        sys.exit(1)
+
+    if args.benchmark:
+        run_benchmark(args.db)
+        return
+    if args.text is None:
+        parser.error("search text is required unless --benchmark is given")
+
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        results = search_exercises(conn, args.text, muscle=args.muscle, limit=args.limit)
+    except sqlite3.OperationalError as e:
+        print(f"Error: {e} (rebuild the database with create_database_prod.py)")
+        sys.exit(1)
+    finally:
+        conn.close()
+    for exercise_id, display_name in results:
+        print(f"  [{exercise_id}] {display_name}")
+    if not results:
+        print("  No matches")
+
+
+if __name__ == "__main__":
+    main()
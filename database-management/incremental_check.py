@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Incremental build check
+=======================
+Replays source edits through create_database_prod.py --incremental and
+checks that each patched database holds the same rows as a full build of
+the same CSVs. Run it after changing the schema, the derived tables or
+incremental_build().
+
+Starting from a full build of a temp copy of the CSVs, each step edits the
+copy and runs an incremental build over the previous result:
+
+    update  one exercise's display_name and canonical_rating change (upserts)
+    remove  one exercise is removed with its instructions and video rows
+            (deletes under the derived tables' foreign keys)
+
+Every table is compared row for row. The FTS5 shadow tables are left out:
+re-inserted rows can get other rowids than a full build gives them. The
+search index is checked through exercise_search.search_exercises instead.
+
+Usage:
+    python incremental_check.py
+"""
+
+import csv
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+from exercise_search import BENCHMARK_QUERIES, search_exercises
+from ingest import read_rows
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILDER = os.path.join(SCRIPT_DIR, "create_database_prod.py")
+SOURCES = [
+    "equipment_prod.csv", "exercise_database_prod.csv", "exercise_instructions_prod.csv",
+    "exercise_contraindications_prod.csv", "exercise_video_mapping_prod.csv", "split_templates_prod.csv",
+]
+
+
+def build(source_dir: str, output: str, incremental: bool) -> str:
+    """One builder run in a fresh process; returns its output"""
+    result = subprocess.run(
+        [sys.executable, BUILDER, "--source-dir", source_dir, "--output", output]
+        + (["--incremental"] if incremental else []),
+        cwd=SCRIPT_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{'incremental' if incremental else 'full'} build failed:\n"
+                           f"{result.stdout[-2000:]}{result.stderr[-2000:]}")
+    return result.stdout
+
+
+def table_rows(db_path: str) -> Dict[str, List[tuple]]:
+    """Sorted rows of every table except the FTS5 index and its shadow tables, plus search results"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        tables = [name for name, in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE 'exercises_fts%' ORDER BY name")]
+        rows = {table: sorted(conn.execute(f"SELECT * FROM {table}"), key=repr) for table in tables}
+        for text in BENCHMARK_QUERIES:
+            rows[f"search {text!r}"] = search_exercises(conn, text)
+        return rows
+    finally:
+        conn.close()
+
+
+def read_csv(path: str) -> List[List[str]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [record for record in csv.reader(f) if any(record)]
+
+
+def write_csv(path: str, records: List[List[str]]):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(records)
+
+
+def update_exercise(source_dir: str) -> str:
+    """Rename and re-rate the first exercise; returns its id"""
+    path = os.path.join(source_dir, "exercise_database_prod.csv")
+    records = read_csv(path)
+    header = records[0]
+    target = records[1]
+    target[header.index("display_name")] += " (edited)"
+    target[header.index("canonical_rating")] = str(int(target[header.index("canonical_rating")] or 0) + 1)
+    write_csv(path, records)
+    return target[header.index("exercise_id")]
+
+
+def remove_exercise(source_dir: str) -> str:
+    """
+    Remove the last exercise no other exercise progresses or regresses to,
+    with its instructions and video rows; returns its id
+    """
+    exercises = list(read_rows(os.path.join(source_dir, "exercise_database_prod.csv")))
+    linked = {row[col] for row in exercises for col in ("progression_id", "regression_id") if row.get(col)}
+    victim = [row["exercise_id"] for row in exercises if row["exercise_id"] not in linked][-1]
+    for name in ("exercise_database_prod.csv", "exercise_instructions_prod.csv", "exercise_video_mapping_prod.csv"):
+        path = os.path.join(source_dir, name)
+        records = read_csv(path)
+        id_column = records[0].index("exercise_id")
+        write_csv(path, [records[0]] + [r for r in records[1:] if r[id_column] != victim])
+    return victim
+
+
+STEPS = [("update", update_exercise), ("remove", remove_exercise)]
+
+
+def run_check() -> List[str]:
+    """Replay STEPS; returns the differences found (empty when every step matches)"""
+    problems = []
+    with tempfile.TemporaryDirectory(prefix="incremental-check-") as work_dir:
+        source_dir = os.path.join(work_dir, "src")
+        os.makedirs(source_dir)
+        for name in SOURCES:
+            shutil.copy(os.path.join(SCRIPT_DIR, name), source_dir)
+
+        patched = os.path.join(work_dir, "patched", "exercises.db")
+        os.makedirs(os.path.dirname(patched))
+        build(source_dir, patched, incremental=False)
+
+        for step, edit in STEPS:
+            exercise_id = edit(source_dir)
+            output = build(source_dir, patched, incremental=True)
+            if "Incremental update" not in output:
+                problems.append(f"{step}: builder did not run incrementally")
+
+            full = os.path.join(work_dir, step, "exercises.db")
+            os.makedirs(os.path.dirname(full))
+            build(source_dir, full, incremental=False)
+
+            expected, actual = table_rows(full), table_rows(patched)
+            differing = sorted(name for name in expected.keys() | actual.keys()
+                               if expected.get(name) != actual.get(name))
+            print(f"{step} {exercise_id}: {', '.join(differing) or 'matches the full build'}")
+            problems.extend(f"{step}: {name} differs from the full build" for name in differing)
+    return problems
+
+
+def main():
+    try:
+        problems = run_check()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if problems:
+        print("Incremental builds differ from full builds:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("Every incremental build matches its full build")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Streaming CSV ingestion for the database builder
+================================================
+Stdlib-only pipeline stages: parse (read_rows) -> validate
+(validation.SourceValidator) -> normalise (the *_rows generators) -> insert.
+Every stage is a generator, so each CSV is read one row at a time and only
+the instructions lookup is held in memory.
+
+Rows are dicts keyed by header with values stripped and empty cells as None.
+Files are read as utf-8-sig, so a leading BOM (as Excel writes into
+exercise_contraindications_prod.csv) never ends up in the first column name.
+"""
+
+import csv
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+Row = Dict[str, Optional[str]]
+
+# Free text, kept exactly as written
+UNSTRIPPED_COLUMNS = {"instructions"}
+
+
+def read_header(path: str) -> List[str]:
+    """Column names of a CSV file"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [name.strip() for name in next(csv.reader(f), [])]
+
+
+def read_rows(path: str) -> Iterator[Row]:
+    """Stream a CSV file as Row dicts"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        for record in reader:
+            if not any(record):
+                continue  # blank line
+            row: Row = {}
+            for name, value in zip(header, record):
+                if name not in UNSTRIPPED_COLUMNS:
+                    value = value.strip()
+                row[name] = value if value.strip() else None
+            for name in header[len(record):]:
+                row[name] = None  # short row
+            yield row
+
+
+def normalize_complexity(value: Optional[str]) -> str:
+    """'All', '1' or '2'; empty means 'All' (other values are rejected by validation)"""
+    if value is None or value.lower() == "all":
+        return "All"
+    return value
+
+
+# ============================================
+# ROW BUILDERS (validated Rows -> table rows, in TABLES column order)
+# ============================================
+
+def equipment_rows(rows: Iterable[Row]) -> Iterator[Tuple]:
+    for row in rows:
+        yield row["equipment_id"], row["category"], row["name"], row.get("image_filename")
+
+
+def instruction_lookup(rows: Iterable[Row]) -> Dict[str, Optional[str]]:
+    """exercise_id -> instructions text, for the exercises join"""
+    return {row["exercise_id"]: row["instructions"] for row in rows}
+
+
+def exercise_rows(rows: Iterable[Row]) -> Iterator[Tuple]:
+    for row in rows:
+        yield (
+            row["exercise_id"],
+            row["canonical_name"],
+            row["display_name"],
+            row["equipment_id_1"],
+            row.get("equipment_id_2"),
+            normalize_complexity(row.get("complexity_level")),
+            int(row["canonical_rating"]),
+            row["primary_muscle"],
+            row.get("secondary_muscle"),
+            int(row["is_in_programme"]),
+            row.get("progression_id"),
+            row.get("regression_id"),
+        )
+
+
+def instruction_rows(instructions: Dict[str, Optional[str]], exercise_ids: Set[str],
+                     compress: bool = False) -> Iterator[Tuple]:
+    """
+    exercise_instructions rows for the exercises that were loaded. Lazy:
+    exercise_ids is read when the rows are consumed, after the exercises load.
+    """
+    for exercise_id, text in sorted(instructions.items()):
+        if exercise_id not in exercise_ids or text is None:
+            continue
+        yield exercise_id, deflate(text) if compress else text
+
+
+def deflate(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 9)
+
+
+def inflate(blob: Optional[bytes]) -> Optional[str]:
+    return None if blob is None else zlib.decompress(blob).decode("utf-8")
+
+
+def register_sql_functions(conn):
+    """inflate(), which the exercises view uses when instructions are compressed"""
+    conn.create_function("inflate", 1, inflate, deterministic=True)
+
+
+def contraindication_rows(rows: Iterable[Row]) -> Iterator[Tuple]:
+    for row in rows:
+        yield row["canonical_name"], row["injury_type"]
+
+
+def video_rows(rows: Iterable[Row]) -> Iterator[Tuple]:
+    # Skip rows with no filename or guid
+    for row in rows:
+        if row["filename"] is None or row["bunny_guid"] is None:
+            continue
+        yield row["exercise_id"], row.get("supplier_id"), row["filename"], row["bunny_guid"]
+
+
+# split_templates_prod.csv muscle columns -> primary_muscle values, in the
+# order DynamicProgramGenerator lists a session's muscle groups (the slot order)
+TEMPLATE_MUSCLES = {
+    "Chest": "Chest",
+    "Shoulder": "Shoulders",
+    "Back": "Back",
+    "Bicep": "Biceps",
+    "Tricep": "Triceps",
+    "Forearm": "Forearms",
+    "Quad": "Quads",
+    "Hamstring": "Hamstrings",
+    "Glute": "Glutes",
+    "Calf": "Calves",
+    "Core": "Core",
+}
+
+
+def template_rows(rows: Iterable[Row]) -> Iterator[Tuple]:
+    """
+    split_templates rows: one per session muscle with a non-zero count.
+    variant ranks a Program among those for its (Days, Duration) in CSV
+    order (0 = the default split); sessions are numbered in CSV order.
+    """
+    variants: Dict[Tuple[int, str], List[str]] = {}
+    sessions: Dict[Tuple[int, str, str], int] = {}
+    for row in rows:
+        days, duration, program = int(row["Days"]), row["Duration"], row["Program"]
+        programs = variants.setdefault((days, duration), [])
+        if program not in programs:
+            programs.append(program)
+        session_index = sessions.get((days, duration, program), 0)
+        sessions[(days, duration, program)] = session_index + 1
+        for slot, (column, muscle) in enumerate(TEMPLATE_MUSCLES.items()):
+            count = int(row[column] or 0)
+            if count:
+                yield (days, duration, programs.index(program), session_index, slot,
+                       program, row["Split"], muscle, count)
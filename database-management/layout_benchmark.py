@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Exercise table layout benchmark
+===============================
+Times the reads that depend on how exercise rows are laid out, on two
+builds of exercises.db (e.g. before and after a schema change), at 1x, 10x
+and 100x catalog size. All queries go through the exercises name, so they
+run unchanged against the old single table and the exercise_core +
+exercise_instructions layout behind the exercises view.
+
+Each query is timed warm (in-memory copy, pages cached) and cold (on-disk
+copy, new connection per run, so every page is read through the file as
+on app launch or simulator start).
+
+Usage:
+    python layout_benchmark.py BEFORE.db AFTER.db
+    python layout_benchmark.py BEFORE.db AFTER.db --scales 1,10 --iterations 50
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Sequence, Tuple
+
+from ingest import register_sql_functions
+from query_audit import time_query
+
+
+# Per-exercise base tables of either layout, parents first
+EXERCISE_TABLES = ["exercises", "exercise_core", "exercise_instructions"]
+
+LAYOUT_QUERIES: List[Tuple[str, str, Tuple]] = [
+    # DBExercise.fetchAll (ExerciseDatabaseManager.swift)
+    ("fetch_all", "SELECT * FROM exercises", ()),
+    # Simulator catalog load (simulate.load_exercises_from_db)
+    ("simulator_load", """
+        SELECT exercise_id, canonical_name, display_name, equipment_id_1,
+               equipment_id_2, complexity_level, canonical_rating, primary_muscle,
+               secondary_muscle, is_in_programme
+        FROM exercises WHERE is_in_programme = 1
+    """, ()),
+    # Filter on an unindexed column: a full table scan
+    ("scan_unindexed", "SELECT exercise_id FROM exercises WHERE secondary_muscle = ?", ("Triceps",)),
+    # Muscle pool fetch (fetchExercises shape, indexed)
+    ("by_muscle", 'SELECT * FROM "exercises" WHERE ("is_in_programme" = 1) AND ("primary_muscle" = ?)', ("Chest",)),
+]
+
+BENCHMARK_SCALES = [1, 10, 100]
+
+
+def scaled_copy(source: sqlite3.Connection, scale: int,
+                suffixed: Sequence[str] = ("exercise_id",)) -> sqlite3.Connection:
+    """
+    In-memory copy of a database with every exercise row repeated scale
+    times, then re-ANALYZEd. The suffixed columns get a per-copy suffix:
+    by default only exercise_id, so groups such as canonical names grow
+    with the scale; add canonical_name to model more groups of today's size.
+    Derived tables are not rebuilt; callers rebuild the ones they measure.
+    """
+    conn = sqlite3.connect(":memory:")
+    source.backup(conn)
+    register_sql_functions(conn)
+    if scale > 1:
+        tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.execute("PRAGMA foreign_keys = OFF")
+        for table in (t for t in EXERCISE_TABLES if t in tables):
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            copied = ", ".join(f"{c} || '_' || :copy" if c in suffixed else c for c in columns)
+            for copy in range(1, scale):
+                conn.execute(
+                    f"INSERT INTO {table} ({', '.join(columns)}) "
+                    f"SELECT {copied} FROM {table} WHERE exercise_id NOT LIKE '%\\_%' ESCAPE '\\'",
+                    {"copy": copy},
+                )
+        conn.commit()
+    conn.execute("ANALYZE")
+    return conn
+
+
+def time_cold(path: str, sql: str, params: Sequence, iterations: int) -> float:
+    """Median µs to open path and run the query, with an empty SQLite page cache each time"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        register_sql_functions(conn)
+        conn.execute(sql, params).fetchall()
+        conn.close()
+        samples.append(time.perf_counter_ns() - start)
+    return statistics.median(samples) / 1000
+
+
+def run_benchmark(before_path: str, after_path: str, scales: Sequence[int] = BENCHMARK_SCALES,
+                  iterations: int = 20):
+    sources = [sqlite3.connect(f"file:{path}?mode=ro", uri=True) for path in (before_path, after_path)]
+    print(f"{'Scale':>6} {'Rows':>7}  {'Query':<16} {'Warm before':>12} {'after':>11} {'speed-up':>9}"
+          f" {'Cold before':>12} {'after':>11} {'speed-up':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in scales:
+            warm, cold = [], []
+            for side, source in zip(("before", "after"), sources):
+                conn = scaled_copy(source, scale)
+                path = os.path.join(tmp_dir, f"{side}_{scale}x.db")
+                conn.execute("VACUUM INTO ?", (path,))
+                warm.append(conn)
+                cold.append(path)
+
+            for name, sql, params in LAYOUT_QUERIES:
+                (before_us, rows), (after_us, after_rows) = (time_query(c, sql, params, iterations) for c in warm)
+                if rows != after_rows:
+                    print(f"Warning: {name} returns {rows} rows before and {after_rows} after")
+                before_cold, after_cold = (time_cold(p, sql, params, iterations) for p in cold)
+                print(f"{scale:>5}x {rows:>7}  {name:<16} {before_us:>10.1f}µs {after_us:>9.1f}µs "
+                      f"{before_us / after_us:>8.1f}x {before_cold:>10.1f}µs {after_cold:>9.1f}µs "
+                      f"{before_cold / after_cold:>8.1f}x")
+            for conn in warm:
+                conn.close()
+    for source in sources:
+        source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare exercise read latency between two builds of exercises.db")
+    parser.add_argument('before', help='Database built with the old layout')
+    parser.add_argument('after', help='Database built with the new layout')
+    parser.add_argument('--scales', default=",".join(str(s) for s in BENCHMARK_SCALES),
+                        help='Comma-separated catalog multipliers (default: 1,10,100)')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed runs per query (default: 20)')
+    args = parser.parse_args()
+
+    for path in (args.before, args.after):
+        if not os.path.exists(path):
+            print(f"Error: {path} not found!")
+            sys.exit(1)
+
+    run_benchmark(args.before, args.after, [int(s) for s in args.scales.split(",")], args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+"""
+Query-plan audit for exercises.db
+=================================
+Replays the query shapes the app issues (TrainSwift/Services/
+ExerciseDatabaseManager.swift) against a built database. For each one it
+records the EXPLAIN QUERY PLAN and the median run time, and flags queries
+that have regressed to a full scan. It also reports indexes that no
+canonical query uses, or that duplicate the prefix of another index.
+
+With --suggest, candidate composite/covering indexes are tried on an
+in-memory copy of the database. A candidate is only reported if the
+planner actually picks it and the query gets faster.
+
+Usage:
+    python query_audit.py                       # audits TrainSwift/Resources/exercises.db
+    python query_audit.py path/to/exercises.db --suggest
+    python query_audit.py --fail-on-scan        # exit 1 on any scan regression
+
+The builder runs the same audit with create_database_prod.py --audit-queries.
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from derived_tables import (
+    ALTERNATIVES_SQL, EASIER_SQL, FACET_SQL, FACET_VALUES_SQL, HARDER_SQL,
+    compatible_exercises_sql, injury_conflicts_sql,
+)
+from ingest import register_sql_functions
+
+
+@dataclass
+class CanonicalQuery:
+    """One query shape issued by the app"""
+    name: str
+    origin: str                             # Swift call site
+    sql: Callable[[Dict], str]              # SQL for the sample parameters (IN-lists vary in length)
+    params: Callable[[Dict], Sequence]
+    table: str                              # Base table the filter columns belong to
+    equality: List[str] = field(default_factory=list)   # Columns compared with =
+    ranged: List[str] = field(default_factory=list)     # Columns compared with IN / OR chains
+    output: Optional[List[str]] = None      # Selected columns (None = SELECT *)
+    allow_scan: bool = False                # Reads (nearly) the whole table by design
+
+
+def _placeholders(values) -> str:
+    return ", ".join("?" * len(values))
+
+
+def _fetch_exercises_sql(p: Dict, canonical: bool) -> str:
+    # Shape GRDB generates for fetchExercises(filter:)
+    ids = _placeholders(p["equipment_ids"])
+    key = '"canonical_name"' if canonical else '"primary_muscle"'
+    return (
+        f'SELECT * FROM "exercises" WHERE ("is_in_programme" = 1) AND ({key} = ?) '
+        f'AND (("equipment_id_1" IN ({ids})) AND (("equipment_id_2" IS NULL) OR ("equipment_id_2" IN ({ids})))) '
+        f'AND (("complexity_level" = \'All\') OR ("complexity_level" = \'1\'))'
+    )
+
+
+CANONICAL_QUERIES = [
+    CanonicalQuery(
+        name="exercises_by_muscle",
+        origin="fetchExercises(filter:) with primaryMuscle",
+        sql=lambda p: _fetch_exercises_sql(p, canonical=False),
+        params=lambda p: [p["muscle"]] + p["equipment_ids"] * 2,
+        table="exercise_core",
+        equality=["is_in_programme", "primary_muscle"],
+        ranged=["complexity_level", "equipment_id_1"],
+    ),
+    CanonicalQuery(
+        name="exercises_by_canonical",
+        origin="fetchAlternatives(for:filter:)",
+        sql=lambda p: _fetch_exercises_sql(p, canonical=True),
+        params=lambda p: [p["canonical"]] + p["equipment_ids"] * 2,
+        table="exercise_core",
+        equality=["is_in_programme", "canonical_name"],
+        ranged=["complexity_level", "equipment_id_1"],
+    ),
+    CanonicalQuery(
+        name="compatible_exercises",
+        origin="exercise_equipment compatibility lookup (derived_tables.py)",
+        sql=lambda p: compatible_exercises_sql(len(p["equipment_ids"])),
+        params=lambda p: p["equipment_ids"],
+        table="exercise_equipment",
+        ranged=["equipment_id"],
+        output=["exercise_id"],
+    ),
+    CanonicalQuery(
+        name="progression_ladder_harder",
+        origin="progression_closure ladder (derived_tables.py)",
+        sql=lambda p: HARDER_SQL,
+        params=lambda p: [p["chain_start"]],
+        table="progression_closure",
+        equality=["ancestor_id"],
+        output=["descendant_id", "depth", "descendant_mask"],
+    ),
+    CanonicalQuery(
+        name="progression_ladder_easier",
+        origin="progression_closure ladder (derived_tables.py)",
+        sql=lambda p: EASIER_SQL,
+        params=lambda p: [p["chain_end"]],
+        table="progression_closure",
+        equality=["descendant_id"],
+        output=["ancestor_id", "depth", "ancestor_mask"],
+    ),
+    CanonicalQuery(
+        name="exercise_alternatives",
+        origin="exercise_alternatives swap lookup (exercise_alternatives.py)",
+        sql=lambda p: ALTERNATIVES_SQL,
+        params=lambda p: [p["exercise_id"]],
+        table="exercise_alternatives",
+        equality=["exercise_id"],
+        output=["alternative_id", "complexity_level", "is_in_programme", "same_muscle", "equipment_mask"],
+    ),
+    CanonicalQuery(
+        name="exercise_by_id",
+        origin="fetchExercise(byId:)",
+        sql=lambda p: 'SELECT * FROM "exercises" WHERE ("exercise_id" = ?)',
+        params=lambda p: [p["exercise_id"]],
+        table="exercise_core",
+        equality=["exercise_id"],
+    ),
+    CanonicalQuery(
+        name="contraindicated_canonicals",
+        origin="filterContraindicatedExercises",
+        sql=lambda p: (
+            "SELECT DISTINCT canonical_name FROM exercise_contraindications "
+            f"WHERE injury_type IN ({_placeholders(p['injuries'])})"
+        ),
+        params=lambda p: p["injuries"],
+        table="exercise_contraindications",
+        ranged=["injury_type"],
+        output=["canonical_name"],
+        allow_scan=True,  # A few dozen rows; planner may prefer the covering UNIQUE index
+    ),
+    CanonicalQuery(
+        name="injury_conflicts",
+        origin="exercise_masks injury bitmask (derived_tables.py)",
+        sql=lambda p: injury_conflicts_sql(len(p["programme_ids"]), len(p["injuries"])),
+        params=lambda p: p["programme_ids"] + p["injuries"],
+        table="exercise_masks",
+        ranged=["exercise_id"],
+        output=["exercise_id"],
+    ),
+    CanonicalQuery(
+        name="contraindications_for_canonical",
+        origin="fetchContraindications(forCanonicalName:)",
+        sql=lambda p: (
+            "SELECT injury_type FROM exercise_contraindications "
+            "WHERE canonical_name = ? ORDER BY injury_type"
+        ),
+        params=lambda p: [p["contra_canonical"]],
+        table="exercise_contraindications",
+        equality=["canonical_name"],
+        output=["injury_type"],
+    ),
+    CanonicalQuery(
+        name="available_canonical_names",
+        origin="fetchAvailableCanonicalNames",
+        sql=lambda p: (
+            "SELECT DISTINCT canonical_name FROM exercises "
+            "WHERE is_in_programme = 1 ORDER BY canonical_name"
+        ),
+        params=lambda p: [],
+        table="exercise_core",
+        equality=["is_in_programme"],
+        output=["canonical_name"],
+        allow_scan=True,
+    ),
+    CanonicalQuery(
+        name="available_equipment_categories",
+        origin="fetchAvailableEquipmentCategories",
+        sql=lambda p: (
+            "SELECT DISTINCT eq.category FROM equipment eq "
+            "INNER JOIN exercises ex ON ex.equipment_id_1 = eq.equipment_id "
+            "WHERE ex.is_in_programme = 1 ORDER BY eq.category"
+        ),
+        params=lambda p: [],
+        table="equipment",
+        output=["category"],
+        allow_scan=True,
+    ),
+    CanonicalQuery(
+        name="equipment_names_in_category",
+        origin="fetchAvailableEquipmentSpecific(forCategory:)",
+        sql=lambda p: (
+            "SELECT DISTINCT eq.name FROM equipment eq "
+            "WHERE eq.category = ? AND eq.name != ? ORDER BY eq.name"
+        ),
+        params=lambda p: [p["category"], p["category"]],
+        table="equipment",
+        equality=["category"],
+        output=["name"],
+    ),
+    CanonicalQuery(
+        name="available_muscles",
+        origin="fetchAvailableMuscles",
+        sql=lambda p: (
+            "SELECT DISTINCT primary_muscle FROM exercises "
+            "WHERE is_in_programme = 1 ORDER BY primary_muscle"
+        ),
+        params=lambda p: [],
+        table="exercise_core",
+        equality=["is_in_programme"],
+        output=["primary_muscle"],
+        allow_scan=True,
+    ),
+    CanonicalQuery(
+        name="available_injury_types",
+        origin="fetchAvailableInjuryTypes",
+        sql=lambda p: "SELECT DISTINCT injury_type FROM exercise_contraindications ORDER BY injury_type",
+        params=lambda p: [],
+        table="exercise_contraindications",
+        output=["injury_type"],
+        allow_scan=True,
+    ),
+    CanonicalQuery(
+        name="facet_values",
+        origin="facet_values picker read (derived_tables.py)",
+        sql=lambda p: FACET_VALUES_SQL,
+        params=lambda p: ["equipment_name", p["category"]],
+        table="facet_values",
+        equality=["facet", "scope"],
+        output=["value", "count"],
+    ),
+]
+
+# The app's DISTINCT lookup each facet replaces (CANONICAL_QUERIES names)
+FACET_LOOKUPS = {
+    "programme_canonical_name": "available_canonical_names",
+    "equipment_category": "available_equipment_categories",
+    "equipment_name": "equipment_names_in_category",
+    "primary_muscle": "available_muscles",
+    "injury_type": "available_injury_types",
+}
+
+# What each facet's counts add up to
+FACET_TOTALS = {
+    "programme_canonical_name": "SELECT COUNT(*) FROM exercises WHERE is_in_programme = 1",
+    "equipment_category": "SELECT COUNT(*) FROM exercises WHERE is_in_programme = 1",
+    "equipment_name": (
+        "SELECT COUNT(*) FROM exercises ex JOIN equipment eq ON eq.equipment_id = ex.equipment_id_1 "
+        "WHERE ex.is_in_programme = 1 AND eq.name != eq.category"
+    ),
+    "primary_muscle": "SELECT COUNT(*) FROM exercises WHERE is_in_programme = 1",
+    "injury_type": "SELECT COUNT(*) FROM exercise_contraindications",
+}
+
+
+@dataclass
+class QueryResult:
+    query: CanonicalQuery
+    plan: List[str]
+    median_us: float
+    rows: int
+
+    @property
+    def scans(self) -> List[str]:
+        """Plan steps that visit every row of a table or index"""
+        return [step for step in self.plan if step.startswith("SCAN ")]
+
+    @property
+    def regressed(self) -> bool:
+        """Scans where the query is meant to search"""
+        return bool(self.scans) and not self.query.allow_scan
+
+    def indexes_used(self) -> List[str]:
+        used = []
+        for step in self.plan:
+            for marker in ("USING COVERING INDEX ", "USING INDEX "):
+                if marker in step:
+                    used.append(step.split(marker, 1)[1].split(" ", 1)[0])
+                    break
+        return used
+
+
+@dataclass
+class IndexSuggestion:
+    query: str
+    ddl: str
+    before_us: float
+    after_us: float
+    plan: List[str]
+
+
+@dataclass
+class AuditReport:
+    results: List[QueryResult] = field(default_factory=list)
+    unused_indexes: List[str] = field(default_factory=list)
+    redundant_indexes: List[Tuple[str, str]] = field(default_factory=list)   # (index, covered by)
+    suggestions: List[IndexSuggestion] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)    # Queries on tables this database lacks
+
+    @property
+    def regressions(self) -> List[QueryResult]:
+        return [r for r in self.results if r.regressed]
+
+    @property
+    def ok(self) -> bool:
+        return not self.regressions
+
+    def print_report(self):
+        print(f"  {'query':<34}{'median':>10}{'rows':>7}  plan")
+        for r in self.results:
+            flag = "SCAN!" if r.regressed else ("scan" if r.scans else "")
+            print(f"  {r.query.name:<34}{r.median_us:>8.1f}µs{r.rows:>7}  {flag:<6}{' | '.join(r.plan)}")
+        for name in self.skipped:
+            print(f"  {name:<34}{'-':>10}{'-':>7}  skipped (table not in this database)")
+
+        if self.unused_indexes:
+            print(f"\n  Unused by any canonical query ({len(self.unused_indexes)}):")
+            for name in self.unused_indexes:
+                print(f"    {name}")
+        if self.redundant_indexes:
+            print(f"\n  Redundant (prefix of another index) ({len(self.redundant_indexes)}):")
+            for name, covered_by in self.redundant_indexes:
+                print(f"    {name} -> {covered_by}")
+        if self.suggestions:
+            print(f"\n  Suggested indexes ({len(self.suggestions)}):")
+            for s in self.suggestions:
+                print(f"    {s.query}: {s.ddl}")
+                print(f"      {s.before_us:.1f}µs -> {s.after_us:.1f}µs | {' | '.join(s.plan)}")
+
+        if self.regressions:
+            print(f"\n  {len(self.regressions)} canonical queries regressed to a scan: "
+                  f"{', '.join(r.query.name for r in self.regressions)}")
+        else:
+            print("\n  No scan regressions")
+
+
+def sample_parameters(conn: sqlite3.Connection) -> Dict:
+    """Representative parameter values taken from the database itself"""
+    def first(sql):
+        row = conn.execute(sql).fetchone()
+        return row[0] if row else None
+
+    def column(sql):
+        return [row[0] for row in conn.execute(sql)]
+
+    most_used_categories = column("""
+        SELECT eq.category FROM exercises ex
+        JOIN equipment eq ON eq.equipment_id = ex.equipment_id_1
+        GROUP BY eq.category ORDER BY COUNT(*) DESC, eq.category LIMIT 3
+    """)
+    return {
+        "muscle": first("SELECT primary_muscle FROM exercises GROUP BY primary_muscle ORDER BY COUNT(*) DESC, 1 LIMIT 1"),
+        "canonical": first("SELECT canonical_name FROM exercises GROUP BY canonical_name ORDER BY COUNT(*) DESC, 1 LIMIT 1"),
+        "contra_canonical": first(
+            "SELECT canonical_name FROM exercise_contraindications GROUP BY 1 ORDER BY COUNT(*) DESC, 1 LIMIT 1"
+        ),
+        "exercise_id": first("SELECT exercise_id FROM exercises ORDER BY exercise_id LIMIT 1"),
+        # A programme's worth of exercises
+        "programme_ids": column("SELECT exercise_id FROM exercises WHERE is_in_programme = 1 "
+                                "ORDER BY exercise_id LIMIT 24"),
+        # Ends of the longest progression chain
+        "chain_start": first("SELECT exercise_id FROM exercises WHERE regression_id IS NULL "
+                             "AND progression_id IS NOT NULL ORDER BY exercise_id LIMIT 1"),
+        "chain_end": first("SELECT exercise_id FROM exercises WHERE progression_id IS NULL "
+                           "AND regression_id IS NOT NULL ORDER BY exercise_id LIMIT 1"),
+        "category": first("SELECT category FROM equipment GROUP BY category ORDER BY COUNT(*) DESC, 1 LIMIT 1"),
+        # A typical gym: every item in the most used categories
+        "equipment_ids": [
+            row[0] for row in conn.execute(
+                f"SELECT equipment_id FROM equipment WHERE category IN ({_placeholders(most_used_categories)}) "
+                "ORDER BY equipment_id", most_used_categories)
+        ],
+        "injuries": column("""
+            SELECT injury_type FROM exercise_contraindications
+            GROUP BY injury_type ORDER BY COUNT(*) DESC, 1 LIMIT 2
+        """),
+    }
+
+
+def explain(conn: sqlite3.Connection, sql: str, params: Sequence) -> List[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def time_query(conn: sqlite3.Connection, sql: str, params: Sequence, iterations: int) -> Tuple[float, int]:
+    """Median wall time in µs over iterations runs, and the row count"""
+    rows = len(conn.execute(sql, params).fetchall())  # warm the page cache
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        conn.execute(sql, params).fetchall()
+        samples.append(time.perf_counter_ns() - start)
+    return statistics.median(samples) / 1000, rows
+
+
+def run_queries(conn: sqlite3.Connection, params: Dict, iterations: int,
+                queries: List[CanonicalQuery] = CANONICAL_QUERIES) -> Tuple[List[QueryResult], List[str]]:
+    """Results, and the names of queries skipped because a table they read does not exist"""
+    results, skipped = [], []
+    for query in queries:
+        sql, args = query.sql(params), query.params(params)
+        try:
+            median_us, rows = time_query(conn, sql, args, iterations)
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e):
+                raise
+            skipped.append(query.name)  # database built before the table existed
+            continue
+        results.append(QueryResult(query, explain(conn, sql, args), median_us, rows))
+    return results, skipped
+
+
+def facet_mismatches(conn: sqlite3.Connection) -> List[str]:
+    """
+    Differences between facet_values and the base tables: each facet's
+    values against the app's own DISTINCT lookup, and its counts against
+    the row total they split. Empty when every facet agrees.
+    """
+    queries = {query.name: query for query in CANONICAL_QUERIES}
+    categories = [row[0] for row in conn.execute("SELECT DISTINCT category FROM equipment ORDER BY category")]
+    problems = []
+    for facet in FACET_SQL:
+        lookup = queries[FACET_LOOKUPS[facet]]
+        scopes = categories if facet == "equipment_name" else [""]
+        for scope in scopes:
+            params = {"category": scope}
+            expected = [row[0] for row in conn.execute(lookup.sql(params), lookup.params(params))]
+            stored = [value for value, _ in conn.execute(FACET_VALUES_SQL, (facet, scope))]
+            if stored != expected:
+                label = f"{facet}[{scope}]" if scope else facet
+                missing, extra = sorted(set(expected) - set(stored)), sorted(set(stored) - set(expected))
+                problems.append(f"{label}: missing {missing}, unexpected {extra}")
+
+        stray = conn.execute(
+            f"SELECT DISTINCT scope FROM facet_values WHERE facet = ? AND scope NOT IN ({_placeholders(scopes)})",
+            [facet] + scopes,
+        ).fetchall()
+        if stray:
+            problems.append(f"{facet}: scopes not in the base tables {sorted(row[0] for row in stray)}")
+
+        total = conn.execute(FACET_TOTALS[facet]).fetchone()[0]
+        counted = conn.execute("SELECT TOTAL(count) FROM facet_values WHERE facet = ?", (facet,)).fetchone()[0]
+        if counted != total:
+            problems.append(f"{facet}: counts add up to {counted:.0f}, expected {total}")
+    return problems
+
+
+def index_columns(conn: sqlite3.Connection) -> Dict[str, Tuple[str, List[str]]]:
+    """index name -> (table, key columns) for every index on a user table"""
+    indexes = {}
+    for table, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"):
+        for _, name, *_ in conn.execute(f"PRAGMA index_list('{table}')"):
+            columns = [row[2] for row in conn.execute(f"PRAGMA index_info('{name}')")]
+            indexes[name] = (table, columns)
+    return indexes
+
+
+def find_index_issues(conn: sqlite3.Connection, results: List[QueryResult]):
+    """(unused, redundant) explicit indexes; constraint autoindexes are never reported"""
+    indexes = index_columns(conn)
+    used = {name for r in results for name in r.indexes_used()}
+
+    unused = sorted(name for name in indexes if name not in used and not name.startswith("sqlite_autoindex"))
+
+    redundant = []
+    for name, (table, columns) in sorted(indexes.items()):
+        if name.startswith("sqlite_autoindex"):
+            continue
+        for other, (other_table, other_columns) in sorted(indexes.items()):
+            if other != name and other_table == table and len(other_columns) >= len(columns) \
+                    and other_columns[:len(columns)] == columns \
+                    and (len(other_columns) > len(columns) or other.startswith("sqlite_autoindex")):
+                redundant.append((name, other))
+                break
+    return unused, redundant
+
+
+def candidate_indexes(query: CanonicalQuery) -> List[List[str]]:
+    """Composite (filter columns) and covering (filter + output columns) candidates"""
+    filters = query.equality + query.ranged
+    candidates = []
+    if len(filters) > 1:
+        candidates.append(filters)
+    if query.output:
+        covering = filters + [c for c in query.output if c not in filters]
+        if len(covering) > 1:
+            candidates.append(covering)
+    return candidates
+
+
+def without_rowid_keys(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """table -> primary key columns, for every WITHOUT ROWID table"""
+    keys = {}
+    for table, sql in conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'"):
+        if sql and "WITHOUT ROWID" in sql.upper():
+            for _, name, _, origin, _ in conn.execute(f"PRAGMA index_list('{table}')"):
+                if origin == "pk":
+                    keys[table] = [row[2] for row in conn.execute(f"PRAGMA index_info('{name}')")]
+    return keys
+
+
+def covered_by_existing(table: str, columns: List[str], indexes: Dict[str, Tuple[str, List[str]]],
+                        without_rowid: Dict[str, List[str]]) -> bool:
+    """
+    True if an index on table already starts with columns, or table is
+    WITHOUT ROWID and columns start with its primary key (that B-tree
+    holds every column, so such an index adds nothing)
+    """
+    if any(index_table == table and index_cols[:len(columns)] == columns
+           for index_table, index_cols in indexes.values()):
+        return True
+    key = without_rowid.get(table)
+    return key is not None and columns[:len(key)] == key
+
+
+def suggest_indexes(conn: sqlite3.Connection, params: Dict, results: List[QueryResult],
+                    iterations: int, min_gain: float = 0.1) -> List[IndexSuggestion]:
+    """
+    Try each candidate index on an in-memory copy and keep it if the planner
+    uses it and the median time improves by at least min_gain. Both timings
+    come from the same re-ANALYZEd copy, before and after the index is
+    created, since an in-memory copy is faster than the file regardless.
+    Candidates an existing index or WITHOUT ROWID primary key already
+    provides are skipped (covered_by_existing).
+    """
+    suggestions = []
+    tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    indexes, without_rowid = index_columns(conn), without_rowid_keys(conn)
+    for result in results:
+        query = result.query
+        if query.table not in tables:
+            continue  # database built before the table existed
+        sql, args = query.sql(params), query.params(params)
+        for columns in candidate_indexes(query):
+            if covered_by_existing(query.table, columns, indexes, without_rowid):
+                continue
+            name = f"idx_{query.table}_{'_'.join(columns)}"
+            ddl = f"CREATE INDEX {name} ON {query.table}({', '.join(columns)})"
+
+            trial = sqlite3.connect(":memory:")
+            try:
+                conn.backup(trial)
+                register_sql_functions(trial)
+                trial.execute("ANALYZE")
+                before_us, _ = time_query(trial, sql, args, iterations)
+                trial.execute(ddl)
+                trial.execute("ANALYZE")
+                plan = explain(trial, sql, args)
+                if not any(f"INDEX {name}" in step for step in plan):
+                    continue
+                after_us, _ = time_query(trial, sql, args, iterations)
+            finally:
+                trial.close()
+
+            if after_us <= before_us * (1 - min_gain):
+                suggestions.append(IndexSuggestion(query.name, ddl, before_us, after_us, plan))
+    return suggestions
+
+
+def audit_database(conn: sqlite3.Connection, iterations: int = 200, suggest: bool = False) -> AuditReport:
+    """Replay every canonical query against an open database"""
+    params = sample_parameters(conn)
+    results, skipped = run_queries(conn, params, iterations)
+    unused, redundant = find_index_issues(conn, results)
+    report = AuditReport(results, unused, redundant, skipped=skipped)
+    if suggest:
+        report.suggestions = suggest_indexes(conn, params, results, iterations)
+    return report
+
+
+def default_db_path() -> str:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, "..", "TrainSwift", "Resources", "exercises.db")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit query plans of the app's canonical queries")
+    parser.add_argument('db', nargs='?', default=default_db_path(), help='Database to audit')
+    parser.add_argument('--iterations', type=int, default=200, help='Timed runs per query (default: 200)')
+    parser.add_argument('--suggest', action='store_true',
+                        help='Try composite/covering indexes on an in-memory copy and report the ones that help')
+    parser.add_argument('--fail-on-scan', action='store_true',
+                        help='Exit with status 1 if a canonical query regressed to a scan')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: {args.db} not found!")
+        sys.exit(1)
+
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    register_sql_functions(conn)
+    print(f"Auditing {os.path.normpath(args.db)}\n")
+    report = audit_database(conn, iterations=args.iterations, suggest=args.suggest)
+    conn.close()
+    report.print_report()
+
+    if args.fail_on_scan and not report.ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Synthetic exercise catalog for scale testing
+============================================
+Writes a full set of source CSVs (the production file names and columns)
+at a chosen size, for benchmarking the builder, the app's queries and the
+simulator at 10k-100k exercises and hundreds of equipment items.
+
+The real catalog is the template:
+- Equipment keeps every real row (the simulator's auto-include and cable
+  rules name real IDs). Extra items are drawn per category in the real
+  category proportions. Bodyweight stays a single item.
+- Exercises are whole canonical groups resampled with replacement and
+  renamed per copy. Group sizes, primary/secondary muscle, complexity,
+  rating, programme flag and progression chains therefore keep their real
+  joint distribution. Each equipment ID is swapped for a random item of
+  the same category, which preserves the equipment-pair distribution at
+  the category level while spreading usage over the new items.
+- Instructions, video filenames and contraindications come from the
+  source exercise or group. Split templates are copied as they are.
+
+The same seed and sizes always give the same files.
+
+Usage:
+    python synthetic_catalog.py --exercises 10000 --equipment 300 --out /tmp/synthetic
+    python synthetic_catalog.py --exercises 100000 --out /tmp/synthetic --build
+    python create_database_prod.py --source-dir /tmp/synthetic --output /tmp/synthetic/exercises.db
+    (cd ../simulation && python simulate.py --db /tmp/synthetic/exercises.db --runs 1000)
+"""
+
+import argparse
+import csv
+import os
+import random
+import shutil
+import sys
+import uuid
+from typing import Dict, List
+
+from ingest import Row, read_header, read_rows
+from validation import REQUIRED_COLUMNS, split_ids
+
+
+SOURCE_FILES = list(REQUIRED_COLUMNS)
+
+# Category whose single item every user has (pool_builder.BODYWEIGHT_ID)
+BODYWEIGHT_CATEGORY = "Bodyweight"
+
+
+def padded_id(prefix: str, number: int, total: int) -> str:
+    """EX001-style ID, widened when the catalog needs more digits"""
+    return f"{prefix}{number:0{max(3, len(str(total)))}d}"
+
+
+def synthetic_equipment(equipment: List[Row], total: int, rng: random.Random) -> List[Row]:
+    """Every real item, then synthetic items per category until there are total"""
+    weights: Dict[str, int] = {}
+    for row in equipment:
+        if row["category"] != BODYWEIGHT_CATEGORY:
+            weights[row["category"]] = weights.get(row["category"], 0) + 1
+
+    rows = [dict(row) for row in equipment]
+    per_category = dict(weights)
+    for number in range(len(equipment) + 1, total + 1):
+        category = rng.choices(list(weights), list(weights.values()))[0]
+        per_category[category] += 1
+        rows.append({
+            "equipment_id": padded_id("EP", number, total),
+            "category": category,
+            "name": f"{category} {per_category[category]}",
+            "image_filename": f"synthetic-{number}_equipment_max.png",
+        })
+    return rows
+
+
+def synthetic_catalog(source_dir: str, out_dir: str, n_exercises: int, n_equipment: int, seed: int = 0):
+    """Write the synthetic source CSVs to out_dir; returns per-file row counts"""
+    rng = random.Random(seed)
+    read = {name: list(read_rows(os.path.join(source_dir, name))) for name in SOURCE_FILES}
+    headers = {name: read_header(os.path.join(source_dir, name)) for name in SOURCE_FILES}
+
+    real_equipment = read["equipment_prod.csv"]
+    if n_equipment < len(real_equipment):
+        raise ValueError(f"--equipment must be at least the real catalog's {len(real_equipment)} items")
+    equipment = synthetic_equipment(real_equipment, n_equipment, rng)
+    category_of = {row["equipment_id"]: row["category"] for row in real_equipment}
+    by_category: Dict[str, List[str]] = {}
+    for row in equipment:
+        by_category.setdefault(row["category"], []).append(row["equipment_id"])
+
+    groups: Dict[str, List[Row]] = {}
+    for row in read["exercise_database_prod.csv"]:
+        groups.setdefault(row["canonical_name"], []).append(row)
+    group_names = list(groups)
+    instructions = {row["exercise_id"]: row["instructions"] for row in read["exercise_instructions_prod.csv"]}
+    videos = {row["exercise_id"]: row for row in read["exercise_video_mapping_prod.csv"]}
+    injuries: Dict[str, List[str]] = {}
+    for row in read["exercise_contraindications_prod.csv"]:
+        if row["canonical_name"] and row["injury_type"]:
+            injuries.setdefault(row["canonical_name"], []).append(row["injury_type"])
+
+    def remap(equipment_id):
+        return rng.choice(by_category[category_of[equipment_id]]) if equipment_id else None
+
+    exercises, instruction_out, video_out, contra_out = [], [], [], []
+    copy = 0
+    while len(exercises) < n_exercises:
+        copy += 1
+        source_name = rng.choice(group_names)
+        canonical_name = f"{source_name} {copy}"
+        members = groups[source_name][:n_exercises - len(exercises)]
+        new_ids = {row["exercise_id"]: padded_id("EX", len(exercises) + i + 1, n_exercises)
+                   for i, row in enumerate(members)}
+
+        for row in members:
+            new_id = new_ids[row["exercise_id"]]
+            display_name = f"{row['display_name']} {copy}"
+            equipment_id_1 = remap(row["equipment_id_1"])
+            equipment_id_2 = remap(row.get("equipment_id_2"))
+            if equipment_id_2 == equipment_id_1:
+                equipment_id_1, equipment_id_2 = row["equipment_id_1"], row["equipment_id_2"]
+            exercises.append(dict(
+                row,
+                exercise_id=new_id,
+                canonical_name=canonical_name,
+                display_name=display_name,
+                equipment_id_1=equipment_id_1,
+                equipment_id_2=equipment_id_2,
+                # Links leaving a truncated group are dropped on both ends
+                progression_id=",".join(new_ids[t] for t in split_ids(row.get("progression_id")) if t in new_ids),
+                regression_id=",".join(new_ids[t] for t in split_ids(row.get("regression_id")) if t in new_ids),
+            ))
+            if row["exercise_id"] in instructions:
+                instruction_out.append({"exercise_id": new_id, "display_name": display_name,
+                                        "instructions": instructions[row["exercise_id"]]})
+            video = videos.get(row["exercise_id"])
+            if video is not None:
+                video_out.append(dict(video, exercise_id=new_id, display_name=display_name,
+                                      bunny_guid=str(uuid.UUID(int=rng.getrandbits(128), version=4))))
+
+        for injury_type in injuries.get(source_name, ()):
+            contra_out.append({"canonical_name": canonical_name, "injury_type": injury_type})
+
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = {
+        "equipment_prod.csv": equipment,
+        "exercise_database_prod.csv": exercises,
+        "exercise_instructions_prod.csv": instruction_out,
+        "exercise_contraindications_prod.csv": contra_out,
+        "exercise_video_mapping_prod.csv": video_out,
+    }
+    for name, rows in outputs.items():
+        with open(os.path.join(out_dir, name), "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=headers[name], extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+    shutil.copyfile(os.path.join(source_dir, "split_templates_prod.csv"),
+                    os.path.join(out_dir, "split_templates_prod.csv"))
+
+    counts = {name: len(rows) for name, rows in outputs.items()}
+    counts["split_templates_prod.csv"] = len(read["split_templates_prod.csv"])
+    return counts
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Write synthetic source CSVs shaped like the real catalog")
+    parser.add_argument('--exercises', type=int, required=True, help='Number of exercises to generate')
+    parser.add_argument('--equipment', type=int,
+                        help='Number of equipment items (default: the real catalog\'s, which is also the minimum)')
+    parser.add_argument('--out', required=True, help='Directory to write the CSVs to')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default 0)')
+    parser.add_argument('--source-dir', default=script_dir, help='Real CSVs to sample from (default: this directory)')
+    parser.add_argument('--build', action='store_true',
+                        help='Also build OUT/exercises.db from the generated CSVs (create_database_prod.py)')
+    args = parser.parse_args()
+
+    n_equipment = args.equipment
+    if n_equipment is None:
+        n_equipment = len(list(read_rows(os.path.join(args.source_dir, "equipment_prod.csv"))))
+    if args.exercises < 1:
+        parser.error("--exercises must be at least 1")
+
+    try:
+        counts = synthetic_catalog(args.source_dir, args.out, args.exercises, n_equipment, args.seed)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for name, count in counts.items():
+        print(f"  {name}: {count} rows")
+
+    if args.build:
+        from create_database_prod import create_database
+        create_database(source_dir=args.out, output=os.path.join(args.out, "exercises.db"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+"""
+Source validation for the exercise database builder
+===================================================
+A SourceValidator sits in the ingestion pipeline between parsing and insert.
+Each per-source stage checks rows as they stream past, records problems and
+passes on only the rows that are safe to insert; the key sets it collects on
+the way feed the cross-file checks, which run once every source has been
+seen (finish()). All problems end up in one ValidationReport instead of the
+build stopping at the first.
+
+Sources must be streamed in FK order: equipment, instructions, exercises,
+contraindications, videos, templates.
+
+Errors fail the build; warnings are reported but do not.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ingest import TEMPLATE_MUSCLES
+
+
+ERROR = "error"
+WARNING = "warning"
+
+VALID_COMPLEXITY = {"all", "1", "2"}
+
+REQUIRED_COLUMNS = {
+    "equipment_prod.csv": ["equipment_id", "category", "name"],
+    "exercise_database_prod.csv": [
+        "exercise_id", "canonical_name", "display_name", "equipment_id_1",
+        "canonical_rating", "primary_muscle", "is_in_programme",
+    ],
+    "exercise_instructions_prod.csv": ["exercise_id", "instructions"],
+    "exercise_contraindications_prod.csv": ["canonical_name", "injury_type"],
+    "exercise_video_mapping_prod.csv": ["exercise_id", "filename", "bunny_guid"],
+    "split_templates_prod.csv": ["Days", "Program", "Duration", "Split"] + list(TEMPLATE_MUSCLES),
+}
+
+# Per-muscle exercise counts in a template session
+MAX_TEMPLATE_COUNT = 9
+
+Row = Dict[str, Optional[str]]
+
+
+@dataclass
+class ValidationIssue:
+    severity: str   # ERROR or WARNING
+    check: str      # Short check name, e.g. "fk_equipment_id_1"
+    source: str     # CSV the offending row came from
+    key: str        # Offending row key (exercise_id, equipment_id, ...)
+    message: str
+
+
+@dataclass
+class ValidationReport:
+    issues: List[ValidationIssue] = field(default_factory=list)
+
+    def add(self, severity: str, check: str, source: str, keys, message: str):
+        """Record one issue per offending key"""
+        for key in keys:
+            self.issues.append(ValidationIssue(severity, check, source, str(key), message.format(key=key)))
+
+    @property
+    def errors(self) -> List[ValidationIssue]:
+        return [i for i in self.issues if i.severity == ERROR]
+
+    @property
+    def warnings(self) -> List[ValidationIssue]:
+        return [i for i in self.issues if i.severity == WARNING]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def counts_by_check(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for issue in self.issues:
+            counts[issue.check] = counts.get(issue.check, 0) + 1
+        return counts
+
+    def print_report(self, max_per_check: int = 10):
+        """Print issues grouped by check, errors first"""
+        if not self.issues:
+            print("  All source checks passed")
+            return
+
+        for severity in (ERROR, WARNING):
+            by_check: Dict[str, List[ValidationIssue]] = {}
+            for issue in self.issues:
+                if issue.severity == severity:
+                    by_check.setdefault(issue.check, []).append(issue)
+
+            for check, issues in by_check.items():
+                print(f"  {severity.upper()} {check} ({len(issues)}):")
+                for issue in issues[:max_per_check]:
+                    print(f"    [{issue.source}] {issue.message}")
+                if len(issues) > max_per_check:
+                    print(f"    ... and {len(issues) - max_per_check} more")
+
+        print(f"  {len(self.errors)} errors, {len(self.warnings)} warnings")
+
+
+def split_ids(value: Optional[str]) -> List[str]:
+    """Comma-separated ID list -> stripped, non-empty IDs"""
+    if not value:
+        return []
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _is_int_between(value: str, low: int, high: int) -> bool:
+    try:
+        return low <= int(value) <= high
+    except ValueError:
+        return False
+
+
+def find_chain_cycles(edges: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Cycles in a directed graph given as adjacency lists (iterative
+    three-colour DFS, linear in nodes + edges). Each cycle is returned
+    once, as the list of nodes on it.
+    """
+    WHITE, GREY, BLACK = 0, 1, 2
+    colour = {node: WHITE for node in edges}
+    cycles = []
+
+    for root in edges:
+        if colour[root] != WHITE:
+            continue
+        path = [root]
+        stack = [iter(edges[root])]
+        colour[root] = GREY
+
+        while stack:
+            nxt = next(stack[-1], None)
+            if nxt is None:
+                colour[path.pop()] = BLACK
+                stack.pop()
+            elif colour.get(nxt, BLACK) == GREY:
+                cycles.append(path[path.index(nxt):])
+            elif colour.get(nxt, BLACK) == WHITE:
+                colour[nxt] = GREY
+                path.append(nxt)
+                stack.append(iter(edges[nxt]))
+
+    return cycles
+
+
+class SourceValidator:
+    """
+    Streaming validator for the six source CSVs.
+
+    Rows are dicts of stripped strings (None for empty cells), as produced
+    by ingest.read_rows. Each stage is a generator that yields the rows
+    that passed its row-level checks.
+    """
+
+    def __init__(self):
+        self.report = ValidationReport()
+        self.equipment_ids: Set[str] = set()
+        self.exercise_ids: Set[str] = set()
+        # Exercises held back by a row-level error; references to them are
+        # not reported again downstream
+        self.rejected_exercise_ids: Set[str] = set()
+        self.canonical_names: Set[str] = set()
+        self.instruction_ids: Set[str] = set()
+        self.contra_names: Set[str] = set()
+        self.programme_muscles: Set[str] = set()
+        # (Days, Program, Duration) -> session names, checked against Days in finish()
+        self.template_variants: Dict[Tuple[int, str, str], List[str]] = {}
+        self.template_muscles: Set[str] = set()
+        # Chain links as (exercise_id, target) pairs, checked once all exercises are known
+        self.links: Dict[str, List[Tuple[str, str]]] = {"progression_id": [], "regression_id": []}
+
+    def check_headers(self, headers: Dict[str, List[str]]) -> bool:
+        """Required columns for every source (later checks depend on them)"""
+        ok = True
+        for source, columns in REQUIRED_COLUMNS.items():
+            missing = [c for c in columns if c not in headers.get(source, [])]
+            self.report.add(ERROR, "missing_column", source, missing, "Missing required column: {key}")
+            ok = ok and not missing
+        return ok
+
+    def _error(self, check: str, source: str, key, message: str):
+        self.report.add(ERROR, check, source, [key], message)
+
+    # --- Per-source stages ---
+
+    def equipment(self, rows: Iterable[Row]) -> Iterator[Row]:
+        src = "equipment_prod.csv"
+        pairs: Set[Tuple[str, str]] = set()
+        reported_pairs: Set[Tuple[str, str]] = set()
+
+        for row in rows:
+            eid = row["equipment_id"]
+            pair = (row["category"], row["name"])
+            valid = True
+
+            if eid in self.equipment_ids:
+                self._error("duplicate_equipment_id", src, eid, "Duplicate equipment_id {key}")
+                valid = False
+            if pair in pairs:
+                if pair not in reported_pairs:
+                    self._error("duplicate_equipment_name", src, f"{pair[0]}/{pair[1]}",
+                                "Duplicate (category, name) pair {key}")
+                    reported_pairs.add(pair)
+                valid = False
+            for col in ("equipment_id", "category", "name"):
+                if row[col] is None:
+                    self._error(f"null_{col}", src, eid or "<no id>", f"{{key}}: {col} is empty")
+                    valid = False
+
+            if valid:
+                self.equipment_ids.add(eid)
+                pairs.add(pair)
+                yield row
+
+    def instructions(self, rows: Iterable[Row]) -> Iterator[Row]:
+        src = "exercise_instructions_prod.csv"
+        reported: Set[str] = set()
+
+        for row in rows:
+            eid = row["exercise_id"]
+            if eid is None:
+                continue
+            if eid in self.instruction_ids:
+                if eid not in reported:
+                    self.report.add(WARNING, "duplicate_instructions", src, [eid],
+                                    "{key} has more than one instructions row (first one used)")
+                    reported.add(eid)
+                continue
+            self.instruction_ids.add(eid)
+            yield row
+
+    def exercises(self, rows: Iterable[Row]) -> Iterator[Row]:
+        src = "exercise_database_prod.csv"
+        required = REQUIRED_COLUMNS[src]
+
+        for row in rows:
+            eid = row["exercise_id"]
+            valid = True
+
+            for col in required:
+                if row[col] is None:
+                    self._error(f"null_{col}", src, eid or "<no id>", f"{{key}}: {col} is empty")
+                    valid = False
+            if eid is not None and eid in self.exercise_ids:
+                self._error("duplicate_exercise_id", src, eid, "Duplicate exercise_id {key}")
+                valid = False
+
+            complexity = row.get("complexity_level")
+            if complexity is not None and complexity.lower() not in VALID_COMPLEXITY:
+                self._error("invalid_complexity_level", src, eid, "{key}: complexity_level must be All, 1 or 2")
+                valid = False
+
+            rating = row["canonical_rating"]
+            if rating is not None and not _is_int_between(rating, 0, 100):
+                self._error("invalid_canonical_rating", src, eid, "{key}: canonical_rating must be an integer 0-100")
+                valid = False
+
+            flag = row["is_in_programme"]
+            if flag is not None and flag not in ("0", "1"):
+                self._error("invalid_is_in_programme", src, eid, "{key}: is_in_programme must be 0 or 1")
+                valid = False
+
+            for col in ("equipment_id_1", "equipment_id_2"):
+                ref = row.get(col)
+                if ref is not None and ref not in self.equipment_ids:
+                    self._error(f"fk_{col}", src, f"{eid}: {col}={ref}", "{key} not in equipment table")
+                    valid = False
+
+            links = []
+            for col in self.links:
+                for target in split_ids(row.get(col)):
+                    if target == eid:
+                        self._error(f"self_{col}", src, eid, "{key}: " + col + " points to itself")
+                        valid = False
+                    else:
+                        links.append((col, target))
+
+            if valid:
+                self.exercise_ids.add(eid)
+                self.canonical_names.add(row["canonical_name"])
+                if row["is_in_programme"] == "1":
+                    self.programme_muscles.add(row["primary_muscle"])
+                for col, target in links:
+                    self.links[col].append((eid, target))
+                yield row
+            elif eid is not None:
+                self.rejected_exercise_ids.add(eid)
+
+    def contraindications(self, rows: Iterable[Row]) -> Iterator[Row]:
+        src = "exercise_contraindications_prod.csv"
+
+        for line, row in enumerate(rows, start=2):
+            if row["injury_type"] is None:
+                continue
+            if row["canonical_name"] is None:
+                self._error("null_canonical_name", src, f"row {line}", "{key}: canonical_name is empty")
+                continue
+            self.contra_names.add(row["canonical_name"])
+            yield row
+
+    def videos(self, rows: Iterable[Row]) -> Iterator[Row]:
+        src = "exercise_video_mapping_prod.csv"
+        seen: Set[str] = set()
+
+        for row in rows:
+            eid = row["exercise_id"]
+            if eid is None or eid in self.rejected_exercise_ids:
+                continue
+            if eid not in self.exercise_ids:
+                self._error("fk_video_exercise_id", src, eid, "{key} not in exercises")
+                continue
+            if eid in seen:
+                self._error("duplicate_video_exercise_id", src, eid, "{key} has more than one video")
+                continue
+            seen.add(eid)
+            yield row
+
+    def templates(self, rows: Iterable[Row]) -> Iterator[Row]:
+        src = "split_templates_prod.csv"
+
+        for line, row in enumerate(rows, start=2):
+            key = f"row {line}"
+            valid = True
+
+            for col in ("Days", "Program", "Duration", "Split"):
+                if row[col] is None:
+                    self._error(f"null_{col.lower()}", src, key, f"{{key}}: {col} is empty")
+                    valid = False
+            if row["Days"] is not None and not _is_int_between(row["Days"], 1, 7):
+                self._error("invalid_days", src, key, "{key}: Days must be an integer 1-7")
+                valid = False
+
+            muscles = []
+            for col, muscle in TEMPLATE_MUSCLES.items():
+                count = row[col] or "0"
+                if not _is_int_between(count, 0, MAX_TEMPLATE_COUNT):
+                    self._error("invalid_template_count", src, f"{key} {col}",
+                                f"{{key}}: count must be an integer 0-{MAX_TEMPLATE_COUNT}")
+                    valid = False
+                elif int(count):
+                    muscles.append(muscle)
+            if valid and not muscles:
+                self._error("empty_template_session", src, key, "{key}: session has no exercises")
+                valid = False
+
+            if valid:
+                variant = (int(row["Days"]), row["Program"], row["Duration"])
+                self.template_variants.setdefault(variant, []).append(row["Split"])
+                self.template_muscles.update(muscles)
+                yield row
+
+    # --- Cross-file checks ---
+
+    def finish(self) -> ValidationReport:
+        """Checks that need every source to have been streamed; returns the full report"""
+        src = "exercise_database_prod.csv"
+        rejected = self.rejected_exercise_ids
+
+        for col, links in self.links.items():
+            dangling = [f"{eid}: {col}={target}" for eid, target in links
+                        if target not in self.exercise_ids and target not in rejected]
+            self.report.add(ERROR, f"dangling_{col}", src, dangling, "{key} not in exercises")
+
+        # Chains should be doubly linked: A.progression = B  <=>  B.regression = A
+        forward = {link for link in self.links["progression_id"] if link[1] not in rejected}
+        backward = {(lower, upper) for upper, lower in self.links["regression_id"] if lower not in rejected}
+        self.report.add(WARNING, "asymmetric_chain", src,
+                        (f"{lower} -> {upper}" for lower, upper in sorted(forward ^ backward)),
+                        "{key}: progression/regression links do not mirror each other")
+
+        # Cycles in the progression graph (a regression cycle is the same cycle reversed)
+        edges: Dict[str, List[str]] = {eid: [] for eid in sorted(self.exercise_ids)}
+        for lower, upper in self.links["progression_id"]:
+            if lower in edges and upper in edges:
+                edges[lower].append(upper)
+        self.report.add(ERROR, "chain_cycle", src,
+                        (" -> ".join(cycle + [cycle[0]]) for cycle in find_chain_cycles(edges)),
+                        "Progression cycle {key}")
+
+        src = "exercise_instructions_prod.csv"
+        self.report.add(WARNING, "orphan_instructions", src,
+                        sorted(self.instruction_ids - self.exercise_ids - rejected), "{key} not in exercises")
+        self.report.add(WARNING, "missing_instructions", "exercise_database_prod.csv",
+                        sorted(self.exercise_ids - self.instruction_ids), "{key} has no instructions")
+
+        # Contraindications join logically on canonical_name
+        self.report.add(WARNING, "unmatched_contraindication", "exercise_contraindications_prod.csv",
+                        sorted(self.contra_names - self.canonical_names),
+                        "canonical_name '{key}' matches no exercise (injury warnings will never fire)")
+
+        # A split must have one session per training day
+        src = "split_templates_prod.csv"
+        self.report.add(ERROR, "template_session_count", src,
+                        (f"{days}-day {program} ({duration}): {len(sessions)} sessions"
+                         for (days, program, duration), sessions in self.template_variants.items()
+                         if len(sessions) != days),
+                        "{key}, expected one per day")
+        duplicated = [f"{days}-day {program} ({duration}): {name}"
+                      for (days, program, duration), sessions in self.template_variants.items()
+                      for name in sorted(set(sessions)) if sessions.count(name) > 1]
+        self.report.add(WARNING, "duplicate_template_session", src, duplicated,
+                        "{key} appears more than once")
+        self.report.add(WARNING, "template_muscle_without_exercises", src,
+                        sorted(self.template_muscles - self.programme_muscles),
+                        "Templates ask for {key} but no programme exercise trains it")
+
+        return self.report
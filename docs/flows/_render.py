@@ -0,0 +1,56 @@
+"""Shared helpers for the flowchart generators.
+
+render_pdf() pipes DOT source through graphviz. row_counts() reads table
+sizes from the live exercises.db, so the database charts are labelled from
+the current build instead of hard-coded numbers.
+"""
+
+import os, sqlite3, subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(HERE, "..", "..", "TrainSwift", "Resources", "exercises.db")
+
+# Count name -> queries tried in order (older builds have no exercise_core
+# or exercise_instructions tables)
+COUNT_QUERIES = {
+    "equipment": ["SELECT COUNT(*) FROM equipment"],
+    "exercises": ["SELECT COUNT(*) FROM exercise_core", "SELECT COUNT(*) FROM exercises"],
+    "instructions": ["SELECT COUNT(*) FROM exercise_instructions", "SELECT COUNT(instructions) FROM exercises"],
+    "contraindications": ["SELECT COUNT(*) FROM exercise_contraindications"],
+    "videos": ["SELECT COUNT(*) FROM exercise_videos"],
+}
+
+
+def row_counts(db_path: str = DB_PATH) -> dict:
+    """Row count per COUNT_QUERIES name; names that can't be counted (or a missing DB) are left out"""
+    if not os.path.exists(db_path):
+        return {}
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    counts = {}
+    try:
+        for name, queries in COUNT_QUERIES.items():
+            for sql in queries:
+                try:
+                    counts[name] = conn.execute(sql).fetchone()[0]
+                    break
+                except sqlite3.OperationalError:
+                    continue
+    finally:
+        conn.close()
+    return counts
+
+
+def count_labels(counts: dict, fmt: str) -> dict:
+    """Template values '<name>_rows': fmt.format(count), or '' when the count is unknown"""
+    return {f"{name}_rows": fmt.format(counts[name]) if name in counts else "" for name in COUNT_QUERIES}
+
+
+def render_pdf(dot: str, pdf_path: str) -> None:
+    """Render DOT source to pdf_path; the old PDF is only replaced once graphviz succeeds"""
+    tmp_path = pdf_path + ".tmp"
+    try:
+        subprocess.run(["dot", "-Tpdf", "-o", tmp_path], input=dot, text=True, check=True)
+        os.replace(tmp_path, pdf_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """Generate dashboard_navigation_map.pdf — app navigation from ContentView."""
 
-import subprocess, os
+import os
+
+from _render import HERE, render_pdf
+
+PDF_NAME = "dashboard_navigation_map.pdf"
 
 DOT = r"""
 digraph dashboard_nav {
@@ -113,15 +117,8 @@ digraph dashboard_nav {
 """
 
 def main():
-    out_dir = os.path.dirname(os.path.abspath(__file__))
-    dot_path = os.path.join(out_dir, "_tmp_dashboard_nav.dot")
-    pdf_path = os.path.join(out_dir, "dashboard_navigation_map.pdf")
-
-    with open(dot_path, "w") as f:
-        f.write(DOT)
-
-    subprocess.run(["dot", "-Tpdf", dot_path, "-o", pdf_path], check=True)
-    os.remove(dot_path)
+    pdf_path = os.path.join(HERE, PDF_NAME)
+    render_pdf(DOT, pdf_path)
     print(f"Generated {pdf_path}")
 
 
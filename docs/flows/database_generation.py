@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 """Generate database_generation_flowchart.pdf — CSV-to-SQLite pipeline."""
 
-import subprocess, os
+import os
+from string import Template
 
-DOT = r"""
+from _render import HERE, count_labels, render_pdf, row_counts
+
+PDF_NAME = "database_generation_flowchart.pdf"
+
+# CSV nodes show how many rows each file loads into the live database
+ROWS_FORMAT = "\\n({} rows in DB)"
+
+DOT = Template(r"""
 digraph database_generation {
     rankdir=TB;
     graph [fontname="Helvetica", fontsize=11, bgcolor="white", pad=0.5, nodesep=0.4, ranksep=0.5];
@@ -15,11 +23,11 @@ digraph database_generation {
         label="Source CSV Files (database-management/)";
         style=rounded; color="#9C27B0"; fontcolor="#9C27B0";
 
-        csv_equip      [label="equipment_prod.csv\nequipment_id, category,\nname, image_filename\n(61 rows)", fillcolor="#F3E5F5"];
-        csv_exercises   [label="exercise_database_prod.csv\nexercise_id, canonical_name,\ndisplay_name, equipment_id_1,\nequipment_id_2, complexity_level,\ncanonical_rating, primary_muscle,\nsecondary_muscle, progression_id,\nregression_id, is_in_programme\n(230 rows)", fillcolor="#F3E5F5"];
-        csv_instructions[label="exercise_instructions_prod.csv\nexercise_id, display_name,\ninstructions\n(920 rows)", fillcolor="#F3E5F5"];
-        csv_contra      [label="exercise_contraindications_prod.csv\ncanonical_name, injury_type\n(40 rows)", fillcolor="#F3E5F5"];
-        csv_videos      [label="exercise_video_mapping_prod.csv\nexercise_id, display_name,\nsupplier_id, filename, bunny_guid\n(230 rows)", fillcolor="#F3E5F5"];
+        csv_equip      [label="equipment_prod.csv\nequipment_id, category,\nname, image_filename$equipment_rows", fillcolor="#F3E5F5"];
+        csv_exercises   [label="exercise_database_prod.csv\nexercise_id, canonical_name,\ndisplay_name, equipment_id_1,\nequipment_id_2, complexity_level,\ncanonical_rating, primary_muscle,\nsecondary_muscle, progression_id,\nregression_id, is_in_programme$exercises_rows", fillcolor="#F3E5F5"];
+        csv_instructions[label="exercise_instructions_prod.csv\nexercise_id, display_name,\ninstructions$instructions_rows", fillcolor="#F3E5F5"];
+        csv_contra      [label="exercise_contraindications_prod.csv\ncanonical_name, injury_type$contraindications_rows", fillcolor="#F3E5F5"];
+        csv_videos      [label="exercise_video_mapping_prod.csv\nexercise_id, display_name,\nsupplier_id, filename, bunny_guid$videos_rows", fillcolor="#F3E5F5"];
     }
 
     // --- Build script ---
@@ -65,18 +73,16 @@ digraph database_generation {
     open -> cache_eq;
     cache_eq -> cache_vid;
 }
-"""
+""")
 
-def main():
-    out_dir = os.path.dirname(os.path.abspath(__file__))
-    dot_path = os.path.join(out_dir, "_tmp_database_generation.dot")
-    pdf_path = os.path.join(out_dir, "database_generation_flowchart.pdf")
+def dot_source(counts: dict) -> str:
+    """DOT with row counts from row_counts() (labels without counts when it is empty)"""
+    return DOT.substitute(count_labels(counts, ROWS_FORMAT))
 
-    with open(dot_path, "w") as f:
-        f.write(DOT)
 
-    subprocess.run(["dot", "-Tpdf", dot_path, "-o", pdf_path], check=True)
-    os.remove(dot_path)
+def main():
+    pdf_path = os.path.join(HERE, PDF_NAME)
+    render_pdf(dot_source(row_counts()), pdf_path)
     print(f"Generated {pdf_path}")
 
 
@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 """Generate database_schema.pdf — ER diagram for exercises.db (4 tables)."""
 
-import subprocess, os
+import os
+from string import Template
 
-DOT = r"""
+from _render import HERE, count_labels, render_pdf, row_counts
+
+PDF_NAME = "database_schema.pdf"
+
+# Table headers show their row counts in the live database
+ROWS_FORMAT = " ({} rows)"
+
+DOT = Template(r"""
 digraph database_schema {
     rankdir=LR;
     graph [fontname="Helvetica", fontsize=12, bgcolor="white", pad=0.5];
@@ -12,7 +20,7 @@ digraph database_schema {
 
     equipment [label=<
         <TABLE BORDER="1" CELLBORDER="0" CELLSPACING="0" CELLPADDING="6" BGCOLOR="#E8F4FD">
-            <TR><TD COLSPAN="3" BGCOLOR="#2196F3"><FONT COLOR="white"><B>equipment</B></FONT></TD></TR>
+            <TR><TD COLSPAN="3" BGCOLOR="#2196F3"><FONT COLOR="white"><B>equipment</B>$equipment_rows</FONT></TD></TR>
             <TR><TD ALIGN="LEFT"><B>equipment_id</B></TD><TD>TEXT</TD><TD>PK</TD></TR>
             <TR><TD ALIGN="LEFT">category</TD><TD>TEXT</TD><TD>NOT NULL</TD></TR>
             <TR><TD ALIGN="LEFT">name</TD><TD>TEXT</TD><TD>NOT NULL</TD></TR>
@@ -22,7 +30,7 @@ digraph database_schema {
 
     exercises [label=<
         <TABLE BORDER="1" CELLBORDER="0" CELLSPACING="0" CELLPADDING="6" BGCOLOR="#FFF3E0">
-            <TR><TD COLSPAN="3" BGCOLOR="#FF9800"><FONT COLOR="white"><B>exercises</B></FONT></TD></TR>
+            <TR><TD COLSPAN="3" BGCOLOR="#FF9800"><FONT COLOR="white"><B>exercises</B>$exercises_rows</FONT></TD></TR>
             <TR><TD ALIGN="LEFT"><B>exercise_id</B></TD><TD>TEXT</TD><TD>PK</TD></TR>
             <TR><TD ALIGN="LEFT">canonical_name</TD><TD>TEXT</TD><TD>NOT NULL</TD></TR>
             <TR><TD ALIGN="LEFT">display_name</TD><TD>TEXT</TD><TD>NOT NULL</TD></TR>
@@ -41,7 +49,7 @@ digraph database_schema {
 
     exercise_videos [label=<
         <TABLE BORDER="1" CELLBORDER="0" CELLSPACING="0" CELLPADDING="6" BGCOLOR="#E8F5E9">
-            <TR><TD COLSPAN="3" BGCOLOR="#4CAF50"><FONT COLOR="white"><B>exercise_videos</B></FONT></TD></TR>
+            <TR><TD COLSPAN="3" BGCOLOR="#4CAF50"><FONT COLOR="white"><B>exercise_videos</B>$videos_rows</FONT></TD></TR>
             <TR><TD ALIGN="LEFT"><B>id</B></TD><TD>INT</TD><TD>PK AUTO</TD></TR>
             <TR><TD ALIGN="LEFT"><I>exercise_id</I></TD><TD>TEXT</TD><TD>FK UNIQUE NOT NULL</TD></TR>
             <TR><TD ALIGN="LEFT">supplier_id</TD><TD>TEXT</TD><TD></TD></TR>
@@ -52,7 +60,7 @@ digraph database_schema {
 
     exercise_contraindications [label=<
         <TABLE BORDER="1" CELLBORDER="0" CELLSPACING="0" CELLPADDING="6" BGCOLOR="#FCE4EC">
-            <TR><TD COLSPAN="3" BGCOLOR="#E91E63"><FONT COLOR="white"><B>exercise_contraindications</B></FONT></TD></TR>
+            <TR><TD COLSPAN="3" BGCOLOR="#E91E63"><FONT COLOR="white"><B>exercise_contraindications</B>$contraindications_rows</FONT></TD></TR>
             <TR><TD ALIGN="LEFT"><B>id</B></TD><TD>INT</TD><TD>PK AUTO</TD></TR>
             <TR><TD ALIGN="LEFT">canonical_name</TD><TD>TEXT</TD><TD>NOT NULL</TD></TR>
             <TR><TD ALIGN="LEFT">injury_type</TD><TD>TEXT</TD><TD>NOT NULL</TD></TR>
@@ -66,18 +74,16 @@ digraph database_schema {
     exercise_videos -> exercises [label="exercise_id\n(1:1, UNIQUE)", color="#4CAF50"];
     exercise_contraindications -> exercises [label="canonical_name\n(logical join)", style=dotted, color="#E91E63"];
 }
-"""
+""")
 
-def main():
-    out_dir = os.path.dirname(os.path.abspath(__file__))
-    dot_path = os.path.join(out_dir, "_tmp_database_schema.dot")
-    pdf_path = os.path.join(out_dir, "database_schema.pdf")
+def dot_source(counts: dict) -> str:
+    """DOT with row counts from row_counts() (labels without counts when it is empty)"""
+    return DOT.substitute(count_labels(counts, ROWS_FORMAT))
 
-    with open(dot_path, "w") as f:
-        f.write(DOT)
 
-    subprocess.run(["dot", "-Tpdf", dot_path, "-o", pdf_path], check=True)
-    os.remove(dot_path)
+def main():
+    pdf_path = os.path.join(HERE, PDF_NAME)
+    render_pdf(dot_source(row_counts()), pdf_path)
     print(f"Generated {pdf_path}")
 
 
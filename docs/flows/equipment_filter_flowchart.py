@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """Generate equipment_filter_flowchart.pdf — user equipment -> exercise pool."""
 
-import subprocess, os
+import os
+
+from _render import HERE, render_pdf
+
+PDF_NAME = "equipment_filter_flowchart.pdf"
 
 DOT = r"""
 digraph equipment_filter {
@@ -102,15 +106,8 @@ digraph equipment_filter {
 """
 
 def main():
-    out_dir = os.path.dirname(os.path.abspath(__file__))
-    dot_path = os.path.join(out_dir, "_tmp_equipment_filter.dot")
-    pdf_path = os.path.join(out_dir, "equipment_filter_flowchart.pdf")
-
-    with open(dot_path, "w") as f:
-        f.write(DOT)
-
-    subprocess.run(["dot", "-Tpdf", dot_path, "-o", pdf_path], check=True)
-    os.remove(dot_path)
+    pdf_path = os.path.join(HERE, PDF_NAME)
+    render_pdf(DOT, pdf_path)
     print(f"Generated {pdf_path}")
 
 
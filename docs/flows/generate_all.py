@@ -1,39 +1,124 @@
 #!/usr/bin/env python3
 """Regenerate all flowchart PDFs from their Python generators.
 
+Each generator defines PDF_NAME and either DOT or, for the database charts,
+dot_source(counts). Row counts are read from the live exercises.db once and
+shared by every generator. A PDF is only re-rendered when its DOT source
+hashes differently from the one it was last rendered from (recorded in
+.render_cache.json) or the PDF is missing. The remaining renders run in
+a process pool.
+
 Usage:
     python generate_all.py
+    python generate_all.py --jobs 1     # render one at a time, in-process
+    python generate_all.py --force      # re-render everything
 
 Requires: graphviz (brew install graphviz)
 """
 
-import importlib.util, os, sys
+import argparse, concurrent.futures, hashlib, importlib.util, json, os, sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(HERE, ".render_cache.json")
 
+sys.path.insert(0, HERE)
+from _render import render_pdf, row_counts  # noqa: E402
 
-def run_generator(script_path: str) -> None:
+
+def load_generator(script_path: str):
     name = os.path.basename(script_path).removesuffix(".py")
     spec = importlib.util.spec_from_file_location(name, script_path)
     mod = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(mod)
-    mod.main()
+    return mod
+
+
+def dot_sha256(dot: str) -> str:
+    return hashlib.sha256(dot.encode("utf-8")).hexdigest()
+
+
+def read_cache() -> dict:
+    """PDF name -> SHA-256 of the DOT it was rendered from ({} if unreadable)"""
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_cache(cache: dict) -> None:
+    tmp_path = CACHE_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, CACHE_PATH)
 
 
 def main():
-    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Regenerate the flowchart PDFs in docs/flows")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Parallel graphviz renders (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="Re-render every PDF, even if its DOT is unchanged")
+    args = parser.parse_args()
+
     generators = sorted(
         f
-        for f in os.listdir(here)
-        if f.endswith(".py") and f != "generate_all.py"
+        for f in os.listdir(HERE)
+        if f.endswith(".py") and f != "generate_all.py" and not f.startswith("_")
     )
 
-    print(f"Regenerating {len(generators)} flowcharts...\n")
+    counts = row_counts()
+    cache = read_cache()
+    print(f"Regenerating {len(generators)} flowcharts"
+          f" ({', '.join(f'{n} {name}' for name, n in counts.items()) or 'no database row counts'})...\n")
+
+    # DOT is cheap to build in-process; only the graphviz renders are farmed out
+    renders, unchanged, generated, failed = [], [], [], []
     for gen in generators:
         try:
-            run_generator(os.path.join(here, gen))
+            mod = load_generator(os.path.join(HERE, gen))
+            dot = mod.dot_source(counts) if hasattr(mod, "dot_source") else mod.DOT
         except Exception as e:
             print(f"  ERROR in {gen}: {e}", file=sys.stderr)
+            failed.append(gen)
+            continue
+        pdf_path = os.path.join(HERE, mod.PDF_NAME)
+        digest = dot_sha256(dot)
+        if not args.force and cache.get(mod.PDF_NAME) == digest and os.path.exists(pdf_path):
+            unchanged.append(gen)
+            print(f"Unchanged {pdf_path}")
+        else:
+            renders.append((gen, mod.PDF_NAME, dot, digest))
+
+    def finished(gen, pdf_name, digest, error):
+        if error is None:
+            cache[pdf_name] = digest
+            generated.append(gen)
+            print(f"Generated {os.path.join(HERE, pdf_name)}")
+        else:
+            cache.pop(pdf_name, None)
+            print(f"  ERROR in {gen}: {error}", file=sys.stderr)
+            failed.append(gen)
+
+    if args.jobs > 1 and len(renders) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(args.jobs, len(renders))) as pool:
+            futures = {
+                pool.submit(render_pdf, dot, os.path.join(HERE, pdf_name)): (gen, pdf_name, digest)
+                for gen, pdf_name, dot, digest in renders
+            }
+            for future in concurrent.futures.as_completed(futures):
+                finished(*futures[future], future.exception())
+    else:
+        for gen, pdf_name, dot, digest in renders:
+            try:
+                render_pdf(dot, os.path.join(HERE, pdf_name))
+                finished(gen, pdf_name, digest, None)
+            except Exception as e:
+                finished(gen, pdf_name, digest, e)
 
-    print(f"\nDone. {len(generators)} PDFs generated.")
+    write_cache(cache)
+    print(f"\nDone. {len(generated)} PDFs generated, {len(unchanged)} unchanged, {len(failed)} failed.")
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """Generate program_generation_flowchart.pdf — questionnaire -> programme output."""
 
-import subprocess, os
+import os
+
+from _render import HERE, render_pdf
+
+PDF_NAME = "program_generation_flowchart.pdf"
 
 DOT = r"""
 digraph program_generation {
@@ -124,15 +128,8 @@ digraph program_generation {
 """
 
 def main():
-    out_dir = os.path.dirname(os.path.abspath(__file__))
-    dot_path = os.path.join(out_dir, "_tmp_program_generation.dot")
-    pdf_path = os.path.join(out_dir, "program_generation_flowchart.pdf")
-
-    with open(dot_path, "w") as f:
-        f.write(DOT)
-
-    subprocess.run(["dot", "-Tpdf", dot_path, "-o", pdf_path], check=True)
-    os.remove(dot_path)
+    pdf_path = os.path.join(HERE, PDF_NAME)
+    render_pdf(DOT, pdf_path)
     print(f"Generated {pdf_path}")
 
 
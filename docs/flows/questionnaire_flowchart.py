@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """Generate questionnaire_flowchart.pdf — 14-step onboarding questionnaire."""
 
-import subprocess, os
+import os
+
+from _render import HERE, render_pdf
+
+PDF_NAME = "questionnaire_flowchart.pdf"
 
 DOT = r"""
 digraph questionnaire {
@@ -81,15 +85,8 @@ digraph questionnaire {
 """
 
 def main():
-    out_dir = os.path.dirname(os.path.abspath(__file__))
-    dot_path = os.path.join(out_dir, "_tmp_questionnaire.dot")
-    pdf_path = os.path.join(out_dir, "questionnaire_flowchart.pdf")
-
-    with open(dot_path, "w") as f:
-        f.write(DOT)
-
-    subprocess.run(["dot", "-Tpdf", dot_path, "-o", pdf_path], check=True)
-    os.remove(dot_path)
+    pdf_path = os.path.join(HERE, PDF_NAME)
+    render_pdf(DOT, pdf_path)
     print(f"Generated {pdf_path}")
 
 
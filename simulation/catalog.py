@@ -0,0 +1,210 @@
+"""
+catalog.py - Compact, integer-coded exercise catalog for the simulation hot loops
+
+Exercises are loaded once as scoring.Exercise dataclasses and packed into
+slotted CompactExercise records whose string fields are interned integer
+codes. Selection works entirely on the compact records; Exercise views are
+only rebuilt at the output boundary (see Catalog.view).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+from scoring import Exercise
+
+
+class StringTable:
+    """
+    Interns strings to dense integer codes.
+
+    Codes are assigned in sorted order, so comparing codes gives the same
+    ordering as comparing the strings (MCV tie-breaks on display_name rely on this).
+    """
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self, values: Iterable[str]):
+        self.values: List[str] = sorted(set(values))
+        self.codes: Dict[str, int] = {v: i for i, v in enumerate(self.values)}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def code(self, value: str) -> int:
+        return self.codes[value]
+
+    def get(self, value: Optional[str], default: int = -1) -> int:
+        return self.codes.get(value, default)
+
+
+@dataclass(frozen=True, slots=True)
+class CompactExercise:
+    """
+    Integer-coded exercise record used inside the selection loops.
+
+    Field names mirror scoring.Exercise so the scoring functions accept either;
+    string fields hold StringTable codes instead of text.
+    """
+    index: int              # Position in Catalog.exercises
+    exercise_id: int        # Catalog.exercise_ids code
+    canonical_name: int     # Catalog.canonical_names code
+    display_name: int       # Catalog.display_names code
+    primary_muscle: int     # Catalog.muscles code
+    equipment_mask: int     # One bit per Catalog.equipment code (id_1 | id_2)
+    complexity_level: int
+    canonical_rating: int
+    is_compound: bool       # Precomputed: canonical_rating >= 40
+    is_isolation: bool      # Precomputed: canonical_rating < 40
+    is_in_programme: bool
+    injury_mask: int = 0    # One bit per Catalog.injury_types entry it is contraindicated for
+
+
+class Catalog:
+    """
+    Compact view of the exercise catalog.
+
+    Cold columns (secondary muscle, raw equipment IDs) are kept in parallel
+    lists and only read back when Catalog.view rebuilds an Exercise.
+    """
+
+    def __init__(self, exercises: List[Exercise], injury_types: Iterable[str] = (),
+                 injury_masks: Optional[Dict[str, int]] = None):
+        """
+        injury_types / injury_masks: the database's injury_bits names in bit
+        order and exercise_masks.injury_mask per exercise_id (empty for
+        databases built before they existed)
+        """
+        self.injury_types: List[str] = list(injury_types)
+        injury_masks = injury_masks or {}
+        self.exercise_ids = StringTable(e.exercise_id for e in exercises)
+        self.canonical_names = StringTable(e.canonical_name for e in exercises)
+        self.display_names = StringTable(e.display_name for e in exercises)
+        self.muscles = StringTable(
+            [e.primary_muscle for e in exercises] +
+            [e.secondary_muscle for e in exercises if e.secondary_muscle]
+        )
+        self.equipment = StringTable(
+            [e.equipment_id_1 for e in exercises] +
+            [e.equipment_id_2 for e in exercises if e.equipment_id_2]
+        )
+
+        self.exercises: List[CompactExercise] = []
+        self._equipment_codes: List[tuple] = []
+        self._secondary_muscles: List[int] = []
+
+        for index, e in enumerate(exercises):
+            eq1 = self.equipment.code(e.equipment_id_1)
+            eq2 = self.equipment.get(e.equipment_id_2)
+            mask = 1 << eq1
+            if eq2 >= 0:
+                mask |= 1 << eq2
+
+            self.exercises.append(CompactExercise(
+                index=index,
+                exercise_id=self.exercise_ids.code(e.exercise_id),
+                canonical_name=self.canonical_names.code(e.canonical_name),
+                display_name=self.display_names.code(e.display_name),
+                primary_muscle=self.muscles.code(e.primary_muscle),
+                equipment_mask=mask,
+                complexity_level=e.complexity_level,
+                canonical_rating=e.canonical_rating,
+                is_compound=not e.is_isolation,
+                is_isolation=e.is_isolation,
+                is_in_programme=e.is_in_programme,
+                injury_mask=injury_masks.get(e.exercise_id, 0)
+            ))
+            self._equipment_codes.append((eq1, eq2))
+            self._secondary_muscles.append(self.muscles.get(e.secondary_muscle))
+
+        # Per-muscle groups in catalog order (pool building and weighted selection order)
+        self.by_muscle: Dict[int, List[CompactExercise]] = {}
+        for exercise in self.exercises:
+            self.by_muscle.setdefault(exercise.primary_muscle, []).append(exercise)
+
+        # Per-muscle MCV order: canonical_rating descending, display_name ascending.
+        # Fixed per catalog, so mcv_select_indexed never has to sort.
+        self.mcv_order: Dict[int, List[CompactExercise]] = {}
+        for exercise in sorted(self.exercises, key=lambda c: (-c.canonical_rating, c.display_name)):
+            self.mcv_order.setdefault(exercise.primary_muscle, []).append(exercise)
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def equipment_mask(self, equipment_ids: Set[str]) -> int:
+        """Bitmask for a user's equipment set (IDs no exercise uses are ignored)"""
+        mask = 0
+        for eid in equipment_ids:
+            code = self.equipment.get(eid)
+            if code >= 0:
+                mask |= 1 << code
+        return mask
+
+    def name_mask(self, exercises: Iterable[CompactExercise], field: str) -> int:
+        """Bitmask over the codes of one name field (e.g. 'canonical_name') of the given records"""
+        mask = 0
+        for exercise in exercises:
+            mask |= 1 << getattr(exercise, field)
+        return mask
+
+    def injury_names(self, mask: int) -> List[str]:
+        """Injury types whose bits are set in mask"""
+        return [name for bit, name in enumerate(self.injury_types) if mask >> bit & 1]
+
+    def display_name(self, exercise: CompactExercise) -> str:
+        return self.display_names[exercise.display_name]
+
+    def view(self, exercise: CompactExercise) -> Exercise:
+        """Rebuild the Exercise dataclass for a compact record (output boundary only)"""
+        eq1, eq2 = self._equipment_codes[exercise.index]
+        secondary = self._secondary_muscles[exercise.index]
+        return Exercise(
+            exercise_id=self.exercise_ids[exercise.exercise_id],
+            canonical_name=self.canonical_names[exercise.canonical_name],
+            display_name=self.display_names[exercise.display_name],
+            equipment_id_1=self.equipment[eq1],
+            equipment_id_2=self.equipment[eq2] if eq2 >= 0 else None,
+            complexity_level=exercise.complexity_level,
+            canonical_rating=exercise.canonical_rating,
+            primary_muscle=self.muscles[exercise.primary_muscle],
+            secondary_muscle=self.muscles[secondary] if secondary >= 0 else None,
+            is_in_programme=exercise.is_in_programme
+        )
+
+
+class ProgressionLadders:
+    """
+    Progression chains over a Catalog, from the database's progression_closure
+    table: for each exercise, the exercises harder and easier than it, nearest
+    first. Exercises outside the catalog (not in the programme) are dropped.
+    Equipment tests use the catalog's own masks, so user masks come from
+    Catalog.equipment_mask as everywhere else.
+    """
+
+    def __init__(self, catalog: Catalog, closure: Iterable[tuple]):
+        """closure: (ancestor_id, descendant_id, depth) rows, ancestor easier"""
+        by_id = {catalog.exercise_ids[e.exercise_id]: e for e in catalog.exercises}
+        self._harder: Dict[int, List[tuple]] = {}
+        self._easier: Dict[int, List[tuple]] = {}
+        for ancestor_id, descendant_id, depth in sorted(closure, key=lambda row: (row[2], row[0], row[1])):
+            ancestor, descendant = by_id.get(ancestor_id), by_id.get(descendant_id)
+            if depth == 0 or ancestor is None or descendant is None:
+                continue
+            self._harder.setdefault(ancestor.index, []).append((depth, descendant))
+            self._easier.setdefault(descendant.index, []).append((depth, ancestor))
+
+    def __len__(self) -> int:
+        """Number of exercises with at least one harder variant"""
+        return len(self._harder)
+
+    def harder(self, exercise: CompactExercise, user_mask: int) -> List[tuple]:
+        """(steps, exercise) harder than exercise that user_mask allows, nearest first"""
+        return [(depth, e) for depth, e in self._harder.get(exercise.index, ())
+                if e.equipment_mask & ~user_mask == 0]
+
+    def easier(self, exercise: CompactExercise, user_mask: int) -> List[tuple]:
+        """(steps, exercise) easier than exercise that user_mask allows, nearest first"""
+        return [(depth, e) for depth, e in self._easier.get(exercise.index, ())
+                if e.equipment_mask & ~user_mask == 0]
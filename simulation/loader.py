@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+loader.py - Shared, read-only access to exercises.db for the simulator
+
+open_readonly opens the database through a file: URI with mode=ro and
+immutable=1. SQLite then takes no file locks and never looks for a
+journal, so any number of processes can read the same file at once
+without contending. mmap_size lets SQLite read pages straight from the
+OS page cache, which every process shares, instead of copying them into
+a private cache. Immutable is safe because the builder never writes to
+a live database: it renames a finished file over it, and open
+connections keep reading the old inode.
+
+load_catalog_data reads everything the simulator needs (equipment,
+exercises, progression closure, injury masks, split templates) through
+one such connection. Row factories build the typed records directly
+from the rows.
+
+Compact-profile builds and builds older than the derived tables have no
+exercise_masks or progression_closure. The injury masks are then computed
+from exercise_contraindications, which every build has, and the ladders
+are empty. Both cases raise a MissingTableWarning rather than degrading
+quietly.
+
+Usage:
+    python loader.py                                  # load once and print counts
+    python loader.py --benchmark --processes 8        # per-process load time vs one read-write connection per table
+"""
+
+import argparse
+import multiprocessing
+import sqlite3
+import statistics
+import time
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+from scoring import Exercise
+from templates import CSV_PATH, TemplateLibrary, csv_template_rows
+
+
+DEFAULT_DB_PATH = Path(__file__).parent / '..' / 'TrainSwift' / 'Resources' / 'exercises.db'
+
+# Larger than any catalog we build, so the whole file is mapped
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+
+COMPLEXITY_LEVELS = {'all': 0, '1': 1, '2': 2}
+
+
+class MissingTableWarning(UserWarning):
+    """A derived table is missing (compact profile or an older build)"""
+
+
+class EquipmentItem(NamedTuple):
+    equipment_id: str
+    category: str
+    name: str
+
+
+@dataclass(frozen=True)
+class CatalogData:
+    """Everything the simulator reads from the database"""
+    equipment_by_category: Dict[str, List[EquipmentItem]]  # Category -> items, by equipment_id
+    exercises: List[Exercise]                              # Programme exercises only
+    progression_closure: List[Tuple[str, str, int]]        # (ancestor_id, descendant_id, depth)
+    injury_types: List[str]                                # injury_bits names in bit order
+    injury_masks: Dict[str, int]                           # exercise_id -> injury_mask (non-zero only)
+    templates: TemplateLibrary
+
+
+def open_readonly(db_path: str, mmap_size: int = DEFAULT_MMAP_SIZE) -> sqlite3.Connection:
+    """Read-only, immutable, memory-mapped connection (safe to open from many processes)"""
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro&immutable=1"
+    conn = sqlite3.connect(uri, uri=True)
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+    return conn
+
+
+# ============================================
+# ROW FACTORIES
+# ============================================
+
+def equipment_item(cursor: sqlite3.Cursor, row: tuple) -> EquipmentItem:
+    return EquipmentItem(*row)
+
+
+def exercise_record(cursor: sqlite3.Cursor, row: tuple) -> Exercise:
+    """Exercise from a row of EXERCISE_COLUMNS; complexity_level TEXT -> int (unknown = 0)"""
+    return Exercise(
+        exercise_id=row[0],
+        canonical_name=row[1],
+        display_name=row[2],
+        equipment_id_1=row[3],
+        equipment_id_2=row[4] or None,
+        complexity_level=COMPLEXITY_LEVELS.get(str(row[5]).strip().lower(), 0),
+        canonical_rating=row[6],
+        primary_muscle=row[7],
+        secondary_muscle=row[8],
+        is_in_programme=bool(row[9])
+    )
+
+
+EXERCISE_COLUMNS = """
+    exercise_id, canonical_name, display_name, equipment_id_1,
+    equipment_id_2, complexity_level, canonical_rating, primary_muscle,
+    secondary_muscle, is_in_programme
+"""
+
+
+# ============================================
+# FETCHES (one per table, any connection)
+# ============================================
+
+def fetch_equipment(conn: sqlite3.Connection) -> Dict[str, List[EquipmentItem]]:
+    cursor = conn.cursor()
+    cursor.row_factory = equipment_item
+    equipment_by_category: Dict[str, List[EquipmentItem]] = {}
+    for item in cursor.execute("SELECT equipment_id, category, name FROM equipment ORDER BY category, equipment_id"):
+        equipment_by_category.setdefault(item.category, []).append(item)
+    return equipment_by_category
+
+
+def fetch_exercises(conn: sqlite3.Connection) -> List[Exercise]:
+    cursor = conn.cursor()
+    cursor.row_factory = exercise_record
+    return cursor.execute(f"SELECT {EXERCISE_COLUMNS} FROM exercises WHERE is_in_programme = 1").fetchall()
+
+
+def fetch_progression_closure(conn: sqlite3.Connection) -> List[Tuple[str, str, int]]:
+    """Empty, with a MissingTableWarning, for databases without progression_closure"""
+    try:
+        return conn.execute("SELECT ancestor_id, descendant_id, depth FROM progression_closure").fetchall()
+    except sqlite3.OperationalError:
+        warnings.warn("database has no progression_closure (compact profile or an older build): "
+                      "progression ladders are empty", MissingTableWarning, stacklevel=2)
+        return []
+
+
+def fetch_injury_masks(conn: sqlite3.Connection) -> Tuple[List[str], Dict[str, int]]:
+    """
+    injury_bits names in bit order and the non-zero injury_mask per
+    exercise_id. Without those tables they are computed from
+    exercise_contraindications as derived_tables.build_injury_masks does,
+    with a MissingTableWarning.
+    """
+    try:
+        injury_types = [row[0] for row in conn.execute("SELECT injury_type FROM injury_bits ORDER BY bit")]
+        masks = dict(conn.execute("SELECT exercise_id, injury_mask FROM exercise_masks WHERE injury_mask != 0"))
+        return injury_types, masks
+    except sqlite3.OperationalError:
+        warnings.warn("database has no exercise_masks (compact profile or an older build): "
+                      "injury masks computed from exercise_contraindications", MissingTableWarning, stacklevel=2)
+
+    injury_types = [row[0] for row in conn.execute(
+        "SELECT DISTINCT injury_type FROM exercise_contraindications ORDER BY injury_type")]
+    bits = {injury_type: bit for bit, injury_type in enumerate(injury_types)}
+    masks: Dict[str, int] = {}
+    for exercise_id, injury_type in conn.execute("""
+        SELECT e.exercise_id, c.injury_type FROM exercises e
+        JOIN exercise_contraindications c ON c.canonical_name = e.canonical_name
+    """):
+        masks[exercise_id] = masks.get(exercise_id, 0) | 1 << bits[injury_type]
+    return injury_types, masks
+
+
+def fetch_templates(conn: sqlite3.Connection) -> TemplateLibrary:
+    """Every split; parsed from the CSV for databases built before split_templates existed"""
+    try:
+        rows = conn.execute("""
+            SELECT days_per_week, duration, variant, session_index, slot,
+                   program, session_name, muscle, exercise_count
+            FROM split_templates
+        """).fetchall()
+    except sqlite3.OperationalError:
+        return TemplateLibrary(csv_template_rows(CSV_PATH))
+    return TemplateLibrary(rows)
+
+
+def load_catalog_data(db_path: str) -> CatalogData:
+    """Read the whole simulator catalog through one read-only connection"""
+    conn = open_readonly(db_path)
+    try:
+        injury_types, injury_masks = fetch_injury_masks(conn)
+        return CatalogData(
+            equipment_by_category=fetch_equipment(conn),
+            exercises=fetch_exercises(conn),
+            progression_closure=fetch_progression_closure(conn),
+            injury_types=injury_types,
+            injury_masks=injury_masks,
+            templates=fetch_templates(conn)
+        )
+    finally:
+        conn.close()
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def load_per_table(db_path: str) -> None:
+    """The previous access path: a fresh read-write connection for each table"""
+    for fetch in (fetch_equipment, fetch_exercises, fetch_progression_closure, fetch_injury_masks, fetch_templates):
+        conn = sqlite3.connect(db_path)
+        try:
+            fetch(conn)
+        finally:
+            conn.close()
+
+
+def _time_loads(args: Tuple[str, int, multiprocessing.Barrier]) -> Dict[str, List[float]]:
+    """Worker: wait for every process, then time both paths alternately (ms per load)"""
+    db_path, repeats, barrier = args
+    barrier.wait()
+    times: Dict[str, List[float]] = {'per_table': [], 'shared_readonly': []}
+    for _ in range(repeats):
+        for name, load in (('per_table', load_per_table), ('shared_readonly', load_catalog_data)):
+            start = time.perf_counter()
+            load(db_path)
+            times[name].append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def run_benchmark(db_path: str, processes: int, repeats: int):
+    """Median and p95 load time per process, with all processes loading at once"""
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Manager().Barrier(processes)
+    with ctx.Pool(processes) as pool:
+        results = pool.map(_time_loads, [(db_path, repeats, barrier)] * processes)
+
+    print(f"{processes} processes x {repeats} loads each: {db_path}")
+    print(f"  {'Path':<18} {'Median':>9} {'p95':>9}")
+    for name in ('per_table', 'shared_readonly'):
+        samples = sorted(t for result in results for t in result[name])
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f"  {name:<18} {statistics.median(samples):>7.2f}ms {p95:>7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load the simulator catalog from exercises.db')
+    parser.add_argument('--db', default=str(DEFAULT_DB_PATH), help='Database to read')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time concurrent loads per process against one read-write connection per table')
+    parser.add_argument('--processes', type=int, default=4, help='Concurrent processes for --benchmark (default 4)')
+    parser.add_argument('--repeats', type=int, default=20, help='Loads per process for --benchmark (default 20)')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.db, args.processes, args.repeats)
+        return
+
+    start = time.perf_counter()
+    data = load_catalog_data(args.db)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Loaded in {elapsed:.1f}ms: {sum(len(items) for items in data.equipment_by_category.values())} equipment, "
+          f"{len(data.exercises)} exercises, {len(data.progression_closure)} closure rows, "
+          f"{len(data.injury_types)} injury types, {len(data.templates)} split templates")
+
+
+if __name__ == '__main__':
+    main()
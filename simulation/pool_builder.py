@@ -6,6 +6,7 @@ Updated for normalised equipment schema (equipment_id_1/equipment_id_2).
 
 from typing import List, Optional, Dict, Any
 from scoring import Exercise
+from catalog import Catalog, CompactExercise
 
 
 # Auto-include rules (mirroring Swift EquipmentAutoInclude logic):
@@ -89,6 +90,86 @@ def build_user_pool(
     return pool
 
 
+def build_compact_pool(
+    catalog_exercises: List[CompactExercise],
+    primary_muscle: Optional[int],
+    user_equipment_mask: int,
+    max_complexity: int,
+    excluded_exercise_ids: set
+) -> List[CompactExercise]:
+    """
+    build_user_pool over integer-coded catalog records.
+
+    primary_muscle is a Catalog.muscles code, user_equipment_mask comes from
+    Catalog.equipment_mask, and excluded_exercise_ids holds exercise_id codes.
+    The 2-FK equipment rule reduces to one mask test: every required bit
+    must be in the user's mask. The muscle test runs first as it rejects most rows.
+    """
+    pool = []
+    missing_equipment = ~user_equipment_mask
+
+    for exercise in catalog_exercises:
+        if primary_muscle is not None and exercise.primary_muscle != primary_muscle:
+            continue
+        if not exercise.is_in_programme:
+            continue
+        if exercise.equipment_mask & missing_equipment:
+            continue
+        if exercise.complexity_level > max_complexity:
+            continue
+        if exercise.exercise_id in excluded_exercise_ids:
+            continue
+
+        pool.append(exercise)
+
+    return pool
+
+
+class ProgrammePools:
+    """
+    Per-muscle user pools for one programme.
+
+    Each muscle's pool is filtered from Catalog.by_muscle the first time it
+    is asked for, then shrunk as exercises are selected. An exercise only
+    sits in its primary muscle's pool, so removing a selection touches one
+    pool, and pool sizes for validation are O(1). Pools keep catalog order,
+    matching build_compact_pool output for the same exclusions.
+    """
+
+    def __init__(self, catalog: Catalog, user_equipment_mask: int, max_complexity: int):
+        self.catalog = catalog
+        self.user_equipment_mask = user_equipment_mask
+        self.max_complexity = max_complexity
+        self._pools: Dict[int, Dict[int, CompactExercise]] = {}
+
+    def _get(self, muscle_code: int) -> Dict[int, CompactExercise]:
+        pool = self._pools.get(muscle_code)
+        if pool is None:
+            members = build_compact_pool(
+                catalog_exercises=self.catalog.by_muscle.get(muscle_code, []),
+                primary_muscle=None,
+                user_equipment_mask=self.user_equipment_mask,
+                max_complexity=self.max_complexity,
+                excluded_exercise_ids=set()
+            )
+            pool = {e.index: e for e in members}
+            self._pools[muscle_code] = pool
+        return pool
+
+    def pool(self, muscle_code: int) -> List[CompactExercise]:
+        """Remaining pool for a muscle, in catalog order"""
+        return list(self._get(muscle_code).values())
+
+    def count(self, muscle_code: int) -> int:
+        return len(self._get(muscle_code))
+
+    def remove(self, exercise: CompactExercise):
+        """Drop a selected exercise from its muscle's pool"""
+        pool = self._pools.get(exercise.primary_muscle)
+        if pool is not None:
+            pool.pop(exercise.index, None)
+
+
 def get_max_complexity(experience_level: str, complexity_rules: Dict[str, Any]) -> int:
     """Get max complexity from complexity rules dictionary"""
     if experience_level in complexity_rules:
@@ -0,0 +1,172 @@
+"""
+progress.py - Live throughput meter for long simulation runs
+
+Reports instantaneous and average sims/sec, ETA and memory use so a run
+can be sized against a wall-clock budget (e.g. on the job scheduler).
+"""
+
+import os
+import sys
+import time
+from typing import Optional, TextIO
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600}
+
+
+def parse_duration(text: str) -> float:
+    """
+    Parse a wall-clock budget such as '90', '90s', '10m' or '1.5h' into seconds.
+    """
+    value = text.strip().lower()
+    unit = 's'
+    if value and value[-1] in DURATION_UNITS:
+        value, unit = value[:-1], value[-1]
+
+    try:
+        seconds = float(value) * DURATION_UNITS[unit]
+    except ValueError:
+        raise ValueError(f"Invalid duration: '{text}' (expected e.g. 90s, 10m, 1h)")
+
+    if seconds <= 0:
+        raise ValueError(f"Duration must be positive: '{text}'")
+    return seconds
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or peak RSS where current is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_seconds(seconds: float) -> str:
+    """Format seconds as H:MM:SS"""
+    seconds = max(0, int(round(seconds)))
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+class ProgressMeter:
+    """
+    Tracks completed simulations and periodically renders a status line.
+
+    Exactly one of total (run-count mode) or deadline_seconds (time-budget
+    mode) drives the ETA; if both are set the earlier finish wins.
+    """
+
+    def __init__(
+        self,
+        total: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+        interval: float = 1.0,
+        stream: TextIO = sys.stderr,
+        enabled: bool = True
+    ):
+        self.total = total
+        self.deadline_seconds = deadline_seconds
+        self.interval = interval
+        self.stream = stream
+        self.enabled = enabled
+        self.live = enabled and hasattr(stream, 'isatty') and stream.isatty()
+
+        self.start_time = time.perf_counter()
+        self.end_time: Optional[float] = None  # set by finish(), freezing elapsed and the average rate
+        self.completed = 0
+        self._last_render_time = self.start_time
+        self._last_render_count = 0
+        self._instant_rate = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        end = self.end_time if self.end_time is not None else time.perf_counter()
+        return end - self.start_time
+
+    @property
+    def average_rate(self) -> float:
+        elapsed = self.elapsed
+        return self.completed / elapsed if elapsed > 0 else 0.0
+
+    def time_remaining(self) -> Optional[float]:
+        """Seconds left in the budget (time-budget mode only)"""
+        if self.deadline_seconds is None:
+            return None
+        return self.deadline_seconds - self.elapsed
+
+    def should_stop(self) -> bool:
+        """True once the run-count or wall-clock budget is exhausted"""
+        if self.total is not None and self.completed >= self.total:
+            return True
+        remaining = self.time_remaining()
+        return remaining is not None and remaining <= 0
+
+    def eta(self) -> Optional[float]:
+        estimates = []
+        remaining = self.time_remaining()
+        if remaining is not None:
+            estimates.append(remaining)
+        rate = self.average_rate
+        if self.total is not None and rate > 0:
+            estimates.append((self.total - self.completed) / rate)
+        return min(estimates) if estimates else None
+
+    def update(self, completed: int = 1):
+        """Record completed simulations and redraw if the refresh interval has passed"""
+        self.completed += completed
+        now = time.perf_counter()
+        if now - self._last_render_time < self.interval:
+            return
+
+        self._instant_rate = (self.completed - self._last_render_count) / (now - self._last_render_time)
+        self._last_render_time = now
+        self._last_render_count = self.completed
+        self._render()
+
+    def status_line(self) -> str:
+        done = f"{self.completed}/{self.total}" if self.total is not None else str(self.completed)
+        eta = self.eta()
+        rss = current_rss_bytes()
+        parts = [
+            f"{done} sims",
+            f"{self._instant_rate:,.0f}/s now",
+            f"{self.average_rate:,.0f}/s avg",
+            f"elapsed {format_seconds(self.elapsed)}",
+            f"ETA {format_seconds(eta)}" if eta is not None else "ETA --",
+            f"RSS {rss / 1_048_576:.0f} MB" if rss is not None else "RSS --",
+        ]
+        return "  " + " | ".join(parts)
+
+    def _render(self):
+        if not self.enabled:
+            return
+        if self.live:
+            self.stream.write("\r\033[K" + self.status_line())
+        else:
+            self.stream.write(self.status_line() + "\n")
+        self.stream.flush()
+
+    def finish(self):
+        """Stop the clock, draw the final status line and end the live display"""
+        self.end_time = time.perf_counter()
+        span = self.end_time - self._last_render_time
+        if span > 0 and self.completed > self._last_render_count:
+            self._instant_rate = (self.completed - self._last_render_count) / span
+        self._render()
+        if self.enabled and self.live:
+            self.stream.write("\n")
+            self.stream.flush()
@@ -4,11 +4,11 @@ report.py - Summary report generation for simulation results
 Updated for normalised equipment schema (equipment_id_1/equipment_id_2).
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence
 from collections import Counter
 
 
-def generate_summary_report(results: List[Dict[str, Any]]) -> str:
+def generate_summary_report(results: List[Dict[str, Any]], injury_types: Sequence[str] = ()) -> str:
     """
     Generate a summary report from simulation results.
 
@@ -20,6 +20,7 @@ def generate_summary_report(results: List[Dict[str, Any]]) -> str:
             'equipment_list': str,
             'days_per_week': int,
             'session_duration': str,
+            'program': str,
             'goal': str,
             'focus_muscle': str,
             'excluded_muscles': str,
@@ -29,10 +30,14 @@ def generate_summary_report(results: List[Dict[str, Any]]) -> str:
             'total_slots_filled': int,
             'fill_rate_pct': float,
             'sessions_generated': str,
-            'exercises_selected': str
+            'exercises_selected': str,
+            'injury_conflicts': str
         },
         ...
     ]
+
+    injury_types: every injury type the database knows, for the
+    contraindication-hit rates (omitted when empty)
     """
     total = len(results)
     if total == 0:
@@ -109,6 +114,34 @@ def generate_summary_report(results: List[Dict[str, Any]]) -> str:
         for exp, count in exp_failures.most_common():
             lines.append(f"  {exp}: {count} failures")
 
+    # Success rate per split, once a run covers more than one (--all-splits)
+    splits = Counter((r['days_per_week'], r['program']) for r in results if r.get('program'))
+    if len(splits) > len({days for days, _ in splits}):
+        split_successes = Counter((r['days_per_week'], r['program']) for r in results
+                                  if r.get('program') and r['status'] == 'SUCCESS')
+        lines.extend([
+            "",
+            "Success rate by split:"
+        ])
+        for days, program in sorted(splits):
+            runs = splits[(days, program)]
+            successes = split_successes[(days, program)]
+            lines.append(f"  {days}-day {program}: {successes}/{runs} ({successes / runs * 100:.1f}%)")
+
+    if injury_types:
+        # Share of programmes with at least one exercise contraindicated for each injury
+        injury_hits = Counter()
+        for r in results:
+            for injury in r.get('injury_conflicts', '').split(', '):
+                if injury:
+                    injury_hits[injury] += 1
+        lines.extend([
+            "",
+            "Contraindication hits (programmes that would warn a user with the injury):"
+        ])
+        for injury in sorted(injury_types, key=lambda i: (-injury_hits[i], i)):
+            lines.append(f"  {injury}: {injury_hits[injury]} ({injury_hits[injury] / total * 100:.1f}%)")
+
     lines.append("")
     lines.append("=" * 50)
 
@@ -127,6 +160,7 @@ def print_sample_results(results: List[Dict[str, Any]], n: int = 5):
         print(f"  Equipment: {r['equipment_list']}")
         print(f"  Days/week: {r['days_per_week']}")
         print(f"  Duration: {r['session_duration']}")
+        print(f"  Split: {r['program']}")
         print(f"  Status: {r['status']}")
         if r['error_details']:
             print(f"  Error: {r['error_details']}")
@@ -2,6 +2,8 @@
 scoring.py - Exercise scoring logic mirroring Swift implementation
 
 Updated for normalised equipment schema (equipment_id_1/equipment_id_2).
+Selection functions accept either Exercise or catalog.CompactExercise records
+(the simulation hot loops use the compact, integer-coded form).
 """
 
 from dataclasses import dataclass
@@ -34,9 +36,9 @@ class Exercise:
         return self.canonical_rating >= 40
 
 
-@dataclass
+@dataclass(slots=True)
 class ScoredExercise:
-    """Exercise with calculated score"""
+    """Exercise (or CompactExercise) with calculated score"""
     exercise: Exercise
     score: int
     is_compound: bool
@@ -117,6 +119,136 @@ def mcv_select_exercises(
     return selected_exercises, relaxation_used
 
 
+def mcv_select_indexed(
+    ordered_pool: list,
+    count: int,
+    user_equipment_mask: int,
+    max_complexity: int,
+    excluded_exercise_ids: set,
+    excluded_canonical_mask: int = 0,
+    excluded_display_mask: int = 0,
+    allow_display_name_repeats: bool = False
+) -> Tuple[List[ScoredExercise], bool]:
+    """
+    MCV selection over a presorted per-muscle index (Catalog.mcv_order[muscle]).
+
+    Same result as build_compact_pool + mcv_select_exercises, but the pool
+    filters are applied while walking the fixed MCV order and the name
+    exclusions are bitmasks over catalog codes, so no filtering pass or sort
+    is needed: cost is the number of picks plus the rows skipped on the way.
+
+    Returns (selected_exercises, was_relaxed)
+    """
+    missing_equipment = ~user_equipment_mask
+    blocked_canonical = excluded_canonical_mask
+    blocked_display = 0 if allow_display_name_repeats else excluded_display_mask
+
+    selected_exercises = []
+
+    for exercise in ordered_pool:
+        if len(selected_exercises) >= count:
+            break
+
+        # Hard constraint: canonical name unused in session and in this selection
+        if (blocked_canonical >> exercise.canonical_name) & 1:
+            continue
+        # Soft constraint: display name unused across programme unless relaxed
+        if (blocked_display >> exercise.display_name) & 1:
+            continue
+        # User pool filters
+        if exercise.equipment_mask & missing_equipment:
+            continue
+        if exercise.complexity_level > max_complexity:
+            continue
+        if exercise.exercise_id in excluded_exercise_ids:
+            continue
+
+        selected_exercises.append(ScoredExercise(
+            exercise=exercise,
+            score=exercise.canonical_rating,
+            is_compound=exercise.is_compound
+        ))
+        blocked_canonical |= 1 << exercise.canonical_name
+
+    return selected_exercises, bool(allow_display_name_repeats and excluded_display_mask)
+
+
+def mcv_select_batch(
+    ordered_pool: list,
+    requests: List[tuple],
+    allow_display_name_repeats: bool = False
+) -> List[List[ScoredExercise]]:
+    """
+    mcv_select_indexed for many independent requests on one muscle, in a
+    single walk of its presorted index.
+
+    requests: (count, user_equipment_mask, max_complexity, excluded_exercise_ids,
+    excluded_canonical_mask, excluded_display_mask) tuples. Requests that can
+    only differ in equipment no exercise of this muscle uses are the same
+    selection, so each distinct one is walked once and copied to the rest.
+    Each exercise is then read once and tested against every selection still
+    short of its count, and the walk stops as soon as all are full. Returns
+    the selections in request order, each identical to mcv_select_indexed's
+    for the same arguments.
+    """
+    used_equipment = 0
+    for exercise in ordered_pool:
+        used_equipment |= exercise.equipment_mask
+
+    # Distinct selection key -> [picks, count, missing_equipment, max_complexity,
+    # excluded_ids, blocked_canonical, blocked_display]
+    states: dict = {}
+    request_states = []
+    for count, equipment_mask, max_complexity, excluded_ids, canonical_mask, display_mask in requests:
+        display_mask = 0 if allow_display_name_repeats else display_mask
+        missing_equipment = ~equipment_mask & used_equipment
+        key = (count, missing_equipment, max_complexity, canonical_mask, display_mask,
+               frozenset(excluded_ids) if excluded_ids else None)
+        state = states.get(key)
+        if state is None:
+            state = states[key] = [[], count, missing_equipment, max_complexity, excluded_ids,
+                                   canonical_mask, display_mask]
+        request_states.append(state)
+    active = [state for state in states.values() if state[1] > 0]
+
+    for exercise in ordered_pool:
+        if not active:
+            break
+        canonical_bit = 1 << exercise.canonical_name
+        display_bit = 1 << exercise.display_name
+        equipment_mask = exercise.equipment_mask
+        complexity_level = exercise.complexity_level
+        exercise_id = exercise.exercise_id
+
+        filled = False
+        for state in active:
+            # Equipment first: it rejects the most
+            if (equipment_mask & state[2] or complexity_level > state[3] or state[5] & canonical_bit
+                    or state[6] & display_bit or exercise_id in state[4]):
+                continue
+            picks = state[0]
+            picks.append(ScoredExercise(
+                exercise=exercise,
+                score=exercise.canonical_rating,
+                is_compound=exercise.is_compound
+            ))
+            state[5] |= canonical_bit
+            filled = filled or len(picks) >= state[1]
+        if filled:
+            active = [state for state in active if len(state[0]) < state[1]]
+
+    # The first request of each selection takes its list; duplicates get copies
+    results = []
+    taken = set()
+    for state in request_states:
+        picks = state[0]
+        if id(picks) in taken:
+            picks = [ScoredExercise(exercise=s.exercise, score=s.score, is_compound=s.is_compound) for s in picks]
+        taken.add(id(state[0]))
+        results.append(picks)
+    return results
+
+
 def score_and_select_exercises(
     pool: List[Exercise],
     count: int,
@@ -142,7 +274,7 @@ def score_and_select_exercises(
         ScoredExercise(
             exercise=e,
             score=calculate_score(e, experience_level),
-            is_compound=not e.is_isolation
+            is_compound=e.is_compound
         )
         for e in available_pool
     ]
@@ -8,6 +8,8 @@ replacing the constants.json dependency for equipment data.
 
 Usage:
     python simulate.py --runs 1000 --seed 42 --db ./exercises.db --output ./results.csv
+    python simulate.py --duration 10m --progress --seed 42
+    python simulate.py --runs 1000 --all-splits
 """
 
 import argparse
@@ -18,15 +20,19 @@ import os
 import pandas as pd
 import random
 import seaborn as sns
-import sqlite3
+import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple, Set
 
-from scoring import Exercise, score_and_select_exercises, sort_for_display
-from pool_builder import build_user_pool, get_max_complexity, get_complexity_4_rules, apply_auto_includes
+from scoring import Exercise, sort_for_display
+from catalog import Catalog
+from pool_builder import ProgrammePools, get_max_complexity, get_complexity_4_rules, apply_auto_includes
 from validators import validate_programme, SUCCESS
-from templates import get_session_templates
+from templates import TemplateLibrary
+from loader import EquipmentItem, load_catalog_data
 from report import generate_summary_report, print_sample_results
+from strategies import STRATEGIES, SelectionRequest, SelectionStrategy, create_strategy
+from progress import ProgressMeter, parse_duration, current_rss_bytes, format_seconds
 
 
 # Hardcoded constants (not equipment-dependent)
@@ -36,51 +42,21 @@ DURATION_OPTIONS = ['30-45 min', '45-60 min', '60-90 min']
 GOAL_OPTIONS = ['Muscle Growth', 'Strength', 'General Fitness']
 
 
-def load_equipment_from_db(db_path: str) -> Dict[str, List[Dict[str, str]]]:
-    """
-    Load equipment data from the equipment table in the DB.
-
-    Returns dict keyed by category, each value is a list of
-    {'equipment_id': str, 'name': str} dicts.
-    """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT equipment_id, category, name
-        FROM equipment
-        ORDER BY category, equipment_id
-    """)
-
-    equipment_by_category: Dict[str, List[Dict[str, str]]] = {}
-    for row in cursor.fetchall():
-        eid, category, name = row
-        if category not in equipment_by_category:
-            equipment_by_category[category] = []
-        equipment_by_category[category].append({
-            'equipment_id': eid,
-            'name': name
-        })
-
-    conn.close()
-    return equipment_by_category
-
-
-def get_all_equipment_ids(equipment_by_category: Dict[str, List[Dict[str, str]]]) -> List[str]:
+def get_all_equipment_ids(equipment_by_category: Dict[str, List[EquipmentItem]]) -> List[str]:
     """Get flat list of all equipment IDs (excluding Bodyweight and Attachments)."""
     ids = []
     for category, items in equipment_by_category.items():
         if category in ('Bodyweight', 'Attachment'):
             continue  # Bodyweight is auto-included; attachments are selected implicitly
         for item in items:
-            ids.append(item['equipment_id'])
+            ids.append(item.equipment_id)
     return ids
 
 
-def get_attachment_ids(equipment_by_category: Dict[str, List[Dict[str, str]]]) -> List[str]:
+def get_attachment_ids(equipment_by_category: Dict[str, List[EquipmentItem]]) -> List[str]:
     """Get list of attachment equipment IDs."""
     return [
-        item['equipment_id']
+        item.equipment_id
         for item in equipment_by_category.get('Attachment', [])
     ]
 
@@ -185,49 +161,6 @@ def create_analysis_plots(results_df: pd.DataFrame, output_dir: str = "."):
     return failure_pivot, successful_programs
 
 
-def load_exercises_from_db(db_path: str) -> List[Exercise]:
-    """Load all exercises from the SQLite database (normalised equipment schema)."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT exercise_id, canonical_name, display_name, equipment_id_1,
-               equipment_id_2, complexity_level, canonical_rating, primary_muscle,
-               secondary_muscle, is_in_programme
-        FROM exercises
-        WHERE is_in_programme = 1
-    """)
-
-    exercises = []
-    for row in cursor.fetchall():
-        # Convert complexity_level from TEXT to INT
-        complexity_text = str(row[5]).strip()
-        if complexity_text.lower() == "all":
-            complexity_int = 0
-        elif complexity_text == "1":
-            complexity_int = 1
-        elif complexity_text == "2":
-            complexity_int = 2
-        else:
-            complexity_int = 0  # Default fallback
-
-        exercises.append(Exercise(
-            exercise_id=row[0],
-            canonical_name=row[1],
-            display_name=row[2],
-            equipment_id_1=row[3],
-            equipment_id_2=row[4] if row[4] else None,
-            complexity_level=complexity_int,
-            canonical_rating=row[6],
-            primary_muscle=row[7],
-            secondary_muscle=row[8],
-            is_in_programme=bool(row[9])
-        ))
-
-    conn.close()
-    return exercises
-
-
 def get_complexity_rules(experience_level: str) -> Dict[str, Any]:
     """Get experience complexity rules (hardcoded to match Swift ExperienceLevel.complexityRules)"""
     # Mirror Swift ExperienceLevel enum complexity rules exactly
@@ -323,15 +256,37 @@ def generate_random_user_profile(
     }
 
 
+def assign_random_split(user_profile: Dict[str, Any], templates: TemplateLibrary):
+    """
+    Replace the profile's duration with a random split for its training days
+    (--all-splits), so every template the CSV defines gets exercised
+    """
+    split = random.choice(templates.for_days(user_profile['days_per_week']))
+    user_profile['session_duration'] = split.duration
+    user_profile['program'] = split.program
+
+
 def run_simulation(
     simulation_id: int,
     user_profile: Dict[str, Any],
-    all_exercises: List[Exercise]
+    catalog: Catalog,
+    templates: TemplateLibrary,
+    strategy: Optional[SelectionStrategy] = None
 ) -> Dict[str, Any]:
     """
     Run a single programme generation simulation.
+    Selection runs on the catalog's compact records; display names are only
+    resolved when building the result row.
+
+    templates: the database's split templates; the profile's 'program' picks
+    one (absent or None = the default split for its days and duration).
+    strategy: registered selection strategy (see strategies.py); defaults to
+    weighted random. Pass the same instance across runs to accumulate its stats.
     Returns result dictionary with all metrics.
     """
+    if strategy is None:
+        strategy = create_strategy('weighted', catalog)
+
     experience_level = user_profile['experience_level']
     user_equipment_ids = user_profile['user_equipment_ids']
     days_per_week = user_profile['days_per_week']
@@ -343,35 +298,35 @@ def run_simulation(
     max_c4_per_session = complexity_rules['max_complexity_4_per_session']
     c4_must_be_first = complexity_rules['complexity_4_must_be_first']
 
-    # Get session templates
-    templates = get_session_templates(days_per_week, session_duration)
+    user_equipment_mask = catalog.equipment_mask(user_equipment_ids)
+    # Each muscle's pool is built once per programme and shrunk as exercises are used
+    pools = ProgrammePools(catalog, user_equipment_mask, max_complexity)
+
+    split = templates.get(days_per_week, session_duration, user_profile.get('program'))
 
     # Track all used exercise IDs across sessions (no repeats)
     used_exercise_ids = set()
+    # Display names used anywhere in the programme (code bitmask, MCV soft constraint)
+    used_display_mask = 0
 
     # Generate each session
     sessions = []
     all_pool_counts = {}
     all_selected_exercises = []
 
-    for template in templates:
-        session_name = template['name']
-        muscle_groups = template['muscle_groups']
+    for template in split.sessions:
+        session_name = template.name
+        muscle_groups = template.muscle_groups
 
         session_exercises = {}
         pool_counts = {}
+        # Canonical names used in this session (code bitmask, MCV hard constraint)
+        session_canonical_mask = 0
 
         for muscle, count in muscle_groups:
-            # Build pool for this muscle
-            pool = build_user_pool(
-                all_exercises=all_exercises,
-                primary_muscle=muscle,
-                user_equipment_ids=user_equipment_ids,
-                max_complexity=max_complexity,
-                excluded_exercise_ids=used_exercise_ids
-            )
+            muscle_code = catalog.muscles.get(muscle)
 
-            pool_counts[muscle] = len(pool)
+            pool_counts[muscle] = pools.count(muscle_code)
 
             # Determine complexity-4 rules (only for first muscle group in first exercise)
             is_first_slot = len(session_exercises) == 0
@@ -379,15 +334,19 @@ def run_simulation(
             require_c4_first = c4_must_be_first and allow_c4
 
             # Score and select
-            scored = score_and_select_exercises(
-                pool=pool,
+            scored = strategy.run(SelectionRequest(
+                muscle_code=muscle_code,
                 count=count,
+                pool=pools.pool(muscle_code) if strategy.uses_pool else [],
+                user_equipment_mask=user_equipment_mask,
+                max_complexity=max_complexity,
                 experience_level=experience_level,
                 excluded_exercise_ids=used_exercise_ids,
+                excluded_canonical_mask=session_canonical_mask,
+                excluded_display_mask=used_display_mask,
                 allow_complexity_4=allow_c4,
-                require_complexity_4_first=require_c4_first,
-                max_complexity=max_complexity
-            )
+                require_complexity_4_first=require_c4_first
+            ))
 
             # Sort and convert to exercises
             selected = sort_for_display(scored)
@@ -398,6 +357,9 @@ def run_simulation(
             # Mark as used
             for ex in selected:
                 used_exercise_ids.add(ex.exercise_id)
+                pools.remove(ex)
+                session_canonical_mask |= 1 << ex.canonical_name
+                used_display_mask |= 1 << ex.display_name
 
         sessions.append({
             'name': session_name,
@@ -409,6 +371,11 @@ def run_simulation(
     # Validate the programme
     validation = validate_programme(sessions, all_pool_counts)
 
+    # Injury types the programme would warn about (an exercise contraindicated for them)
+    injury_mask = 0
+    for ex in all_selected_exercises:
+        injury_mask |= ex.injury_mask
+
     # Build result
     return {
         'simulation_id': simulation_id,
@@ -417,6 +384,7 @@ def run_simulation(
         'equipment_count': len(user_equipment_ids),
         'days_per_week': days_per_week,
         'session_duration': session_duration,
+        'program': split.program,
         'goal': user_profile['goal'],
         'focus_muscle': user_profile['focus_muscle'] or '',
         'excluded_muscles': ', '.join(user_profile['excluded_muscles']),
@@ -425,11 +393,106 @@ def run_simulation(
         'total_slots_required': validation.total_slots_required,
         'total_slots_filled': validation.total_slots_filled,
         'fill_rate_pct': round(validation.fill_rate_pct, 1),
-        'sessions_generated': ', '.join(t['name'] for t in templates),
-        'exercises_selected': ', '.join(e.display_name for e in all_selected_exercises)
+        'sessions_generated': ', '.join(t.name for t in split.sessions),
+        'exercises_selected': ', '.join(catalog.display_name(e) for e in all_selected_exercises),
+        'injury_conflicts': ', '.join(catalog.injury_names(injury_mask))
     }
 
 
+def independent_requests(
+    profiles: List[Dict[str, Any]],
+    catalog: Catalog,
+    templates: TemplateLibrary,
+    uses_pool: bool
+) -> List[SelectionRequest]:
+    """
+    One request per slot of each profile's first session, as a fresh
+    programme would make them but with no exclusions carried between slots,
+    so they are independent of each other (the batched selection workload).
+    """
+    requests = []
+    for profile in profiles:
+        complexity_rules = get_complexity_rules(profile['experience_level'])
+        max_complexity = complexity_rules['max_complexity']
+        user_equipment_mask = catalog.equipment_mask(profile['user_equipment_ids'])
+        pools = ProgrammePools(catalog, user_equipment_mask, max_complexity)
+        split = templates.get(profile['days_per_week'], profile['session_duration'], profile.get('program'))
+        for slot, (muscle, count) in enumerate(split.sessions[0].muscle_groups):
+            muscle_code = catalog.muscles.get(muscle)
+            allow_c4 = slot == 0 and complexity_rules['max_complexity_4_per_session'] > 0
+            requests.append(SelectionRequest(
+                muscle_code=muscle_code,
+                count=count,
+                pool=pools.pool(muscle_code) if uses_pool else [],
+                user_equipment_mask=user_equipment_mask,
+                max_complexity=max_complexity,
+                experience_level=profile['experience_level'],
+                excluded_exercise_ids=set(),
+                allow_complexity_4=allow_c4,
+                require_complexity_4_first=complexity_rules['complexity_4_must_be_first'] and allow_c4
+            ))
+    return requests
+
+
+def compare_strategies(
+    strategy_names: List[str],
+    profiles: List[Dict[str, Any]],
+    catalog: Catalog,
+    templates: TemplateLibrary
+) -> str:
+    """
+    Run every named strategy over the same user profiles and tabulate
+    outcome quality alongside throughput and selection latency, then time
+    its batched path (run_batch) against one-at-a-time run() calls on the
+    same independent requests.
+    """
+    lines = [
+        "=" * 50,
+        "STRATEGY COMPARISON",
+        "=" * 50,
+        f"Profiles: {len(profiles)}",
+        ""
+    ]
+
+    for name in strategy_names:
+        strategy = create_strategy(name, catalog)
+        start = time.perf_counter()
+        results = [
+            run_simulation(i + 1, profile, catalog, templates, strategy)
+            for i, profile in enumerate(profiles)
+        ]
+        elapsed = time.perf_counter() - start
+
+        success = sum(1 for r in results if r['status'] == SUCCESS)
+        mean_fill = sum(r['fill_rate_pct'] for r in results) / len(results) if results else 0
+        sims_per_sec = len(results) / elapsed if elapsed > 0 else 0
+
+        success_pct = success / len(results) * 100 if results else 0
+
+        lines.append(
+            f"{name}: success {success_pct:.1f}%, mean fill {mean_fill:.1f}%, "
+            f"{sims_per_sec:,.0f} sims/sec"
+        )
+        lines.append("  " + strategy.stats.summary("selection"))
+
+        # Random state is restored so the batch timing doesn't shift later strategies' draws
+        random_state = random.getstate()
+        requests = independent_requests(profiles, catalog, templates, strategy.uses_pool)
+        single, batched = create_strategy(name, catalog), create_strategy(name, catalog)
+        for request in requests:
+            single.run(request)
+        batched.run_batch(requests)
+        random.setstate(random_state)
+        lines.append(
+            f"  batch of {len(requests):,} independent requests: {batched.stats.requests_per_sec:,.0f} req/s "
+            f"(one at a time {single.stats.requests_per_sec:,.0f} req/s)"
+        )
+
+    lines.append("")
+    lines.append("=" * 50)
+    return "\n".join(lines)
+
+
 def write_csv_results(results: List[Dict[str, Any]], output_path: str):
     """Write results to CSV file"""
     if not results:
@@ -437,9 +500,9 @@ def write_csv_results(results: List[Dict[str, Any]], output_path: str):
 
     fieldnames = [
         'simulation_id', 'experience_level', 'equipment_list', 'equipment_count',
-        'days_per_week', 'session_duration', 'goal', 'focus_muscle', 'excluded_muscles',
+        'days_per_week', 'session_duration', 'program', 'goal', 'focus_muscle', 'excluded_muscles',
         'status', 'error_details', 'total_slots_required', 'total_slots_filled',
-        'fill_rate_pct', 'sessions_generated', 'exercises_selected'
+        'fill_rate_pct', 'sessions_generated', 'exercises_selected', 'injury_conflicts'
     ]
 
     with open(output_path, 'w', newline='') as f:
@@ -448,18 +511,56 @@ def write_csv_results(results: List[Dict[str, Any]], output_path: str):
         writer.writerows(results)
 
 
+def duration_arg(text: str) -> float:
+    """argparse type for --duration"""
+    try:
+        return parse_duration(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
 def main():
     parser = argparse.ArgumentParser(description='Monte Carlo simulation for programme generation')
-    parser.add_argument('--runs', type=int, default=100, help='Number of simulations to run')
+    parser.add_argument('--runs', type=int,
+                        help='Number of simulations to run (default 100; caps --duration if both given)')
+    parser.add_argument('--duration', type=duration_arg,
+                        help='Wall-clock budget, e.g. 90s, 10m, 1h: run as many simulations as fit')
+    parser.add_argument('--target-rate', type=float,
+                        help='Required average sims/sec; exit with status 2 if the run falls short')
+    parser.add_argument('--progress', action='store_true',
+                        help='Show live sims/sec, ETA and memory use')
+    parser.add_argument('--progress-interval', type=float, default=1.0,
+                        help='Seconds between progress updates (default 1.0)')
     parser.add_argument('--seed', type=int, help='Random seed for reproducibility')
     parser.add_argument('--db', type=str, default='../TrainSwift/Resources/exercises.db',
                         help='Path to exercises database')
     parser.add_argument('--output', type=str, default='simulation_results.csv',
                         help='Output CSV file path')
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='weighted',
+                        help='Exercise selection strategy (default: weighted)')
+    parser.add_argument('--compare-strategies', type=str, metavar='NAMES',
+                        help="Comma-separated strategies (or 'all') to benchmark over the same "
+                             "profiles instead of a normal run")
+    parser.add_argument('--all-splits', action='store_true',
+                        help='Give each profile a random split from every template for its training '
+                             'days (any duration) instead of the default split for its duration')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
 
     args = parser.parse_args()
 
+    if args.runs is None and args.duration is None:
+        args.runs = 100
+
+    compare_names = None
+    if args.compare_strategies:
+        compare_names = (sorted(STRATEGIES) if args.compare_strategies == 'all'
+                         else [n.strip() for n in args.compare_strategies.split(',') if n.strip()])
+        unknown = [n for n in compare_names if n not in STRATEGIES]
+        if unknown:
+            parser.error(f"unknown strategies: {', '.join(unknown)} (available: {', '.join(sorted(STRATEGIES))})")
+        if args.runs is None:
+            parser.error("--compare-strategies needs --runs")
+
     # Set random seed if provided
     if args.seed is not None:
         random.seed(args.seed)
@@ -476,8 +577,11 @@ def main():
 
     print(f"Loading exercises from: {db_path}")
 
-    # Load equipment data from DB (replaces constants.json dependency)
-    equipment_by_category = load_equipment_from_db(str(db_path))
+    # One read-only connection for everything (loader.py)
+    data = load_catalog_data(str(db_path))
+
+    # Equipment data from the DB (replaces constants.json dependency)
+    equipment_by_category = data.equipment_by_category
     selectable_equipment_ids = get_all_equipment_ids(equipment_by_category)
     attachment_ids = get_attachment_ids(equipment_by_category)
 
@@ -485,26 +589,63 @@ def main():
     print(f"Selectable equipment items: {len(selectable_equipment_ids)}")
     print(f"Attachment items: {len(attachment_ids)}")
 
-    # Load exercises
-    all_exercises = load_exercises_from_db(str(db_path))
+    all_exercises = data.exercises
     available_muscles = get_available_muscles(all_exercises)
+    injury_types, injury_masks = data.injury_types, data.injury_masks
+    catalog = Catalog(all_exercises, injury_types, injury_masks)
+    templates = data.templates
 
     print(f"Loaded {len(all_exercises)} exercises")
+    print(f"Injury types: {len(injury_types)} ({len(injury_masks)} exercises contraindicated)")
+    print(f"Split templates: {len(templates)}")
     print(f"Available muscles: {', '.join(sorted(available_muscles))}")
-    print(f"Running {args.runs} simulations...")
+
+    if compare_names:
+        profiles = [
+            generate_random_user_profile(available_muscles, selectable_equipment_ids, attachment_ids)
+            for _ in range(args.runs)
+        ]
+        if args.all_splits:
+            for profile in profiles:
+                assign_random_split(profile, templates)
+        print(f"Comparing strategies over {len(profiles)} profiles: {', '.join(compare_names)}")
+        print()
+        print(compare_strategies(compare_names, profiles, catalog, templates))
+        return 0
+
+    strategy = create_strategy(args.strategy, catalog)
+    print(f"Selection strategy: {args.strategy}")
+    if args.duration is not None:
+        cap = f" (max {args.runs})" if args.runs is not None else ""
+        print(f"Running simulations for {format_seconds(args.duration)}{cap}...")
+    else:
+        print(f"Running {args.runs} simulations...")
     print()
 
-    # Run simulations
+    # Run simulations until the run count or wall-clock budget is exhausted
+    meter = ProgressMeter(
+        total=args.runs,
+        deadline_seconds=args.duration,
+        interval=args.progress_interval,
+        enabled=args.progress or args.verbose
+    )
     results = []
-    for i in range(args.runs):
+    while not meter.should_stop():
         user_profile = generate_random_user_profile(
             available_muscles, selectable_equipment_ids, attachment_ids
         )
-        result = run_simulation(i + 1, user_profile, all_exercises)
+        if args.all_splits:
+            assign_random_split(user_profile, templates)
+        result = run_simulation(len(results) + 1, user_profile, catalog, templates, strategy)
         results.append(result)
+        meter.update()
+    meter.finish()
 
-        if args.verbose and (i + 1) % 100 == 0:
-            print(f"  Completed {i + 1}/{args.runs}")
+    rss = current_rss_bytes()
+    rss_text = f", RSS {rss / 1_048_576:.0f} MB" if rss is not None else ""
+    print(f"Completed {len(results)} simulations in {meter.elapsed:.1f}s "
+          f"({meter.average_rate:,.1f} sims/sec{rss_text})")
+    print(strategy.stats.summary(f"Selection [{strategy.name}]"))
 
     # Write CSV
     output_path = Path(args.output)
@@ -513,7 +654,7 @@ def main():
 
     # Print summary report
     print()
-    print(generate_summary_report(results))
+    print(generate_summary_report(results, injury_types))
 
     # Print sample results
     if args.verbose:
@@ -525,6 +666,11 @@ def main():
     failure_pivot, successful_programs = create_analysis_plots(results_df, output_dir=".")
     print("✅ Plots saved to current directory")
 
+    if args.target_rate is not None and meter.average_rate < args.target_rate:
+        print(f"\n⚠️  Throughput {meter.average_rate:,.1f} sims/sec is below target "
+              f"{args.target_rate:,.1f} sims/sec")
+        return 2
+
     return 0
 
 
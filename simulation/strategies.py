@@ -0,0 +1,246 @@
+"""
+strategies.py - Pluggable exercise selection strategies
+
+Each strategy turns a SelectionRequest (one muscle slot of one session) into
+scored picks. Strategies are registered by name so simulate.py can select
+them with --strategy and benchmark several over the same profiles with
+--compare-strategies. Every strategy times its own calls and reports
+throughput plus latency percentiles.
+
+run() selects for one request. run_batch() takes many independent requests
+at once (no exclusions carried between them). Strategies with a cheaper
+batched path override select_batch(). MCV walks each muscle's presorted
+index once for all of that muscle's requests.
+
+Adding a strategy:
+
+    @register_strategy
+    class MyStrategy(SelectionStrategy):
+        name = 'my-strategy'
+
+        def select(self, request):
+            ...
+"""
+
+import math
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Type
+
+from catalog import Catalog, CompactExercise
+from scoring import ScoredExercise, score_and_select_exercises, mcv_select_batch, mcv_select_indexed
+
+
+@dataclass(slots=True)
+class SelectionRequest:
+    """Everything a strategy may need to fill one muscle slot"""
+    muscle_code: int                        # Catalog.muscles code
+    count: int
+    pool: List[CompactExercise]             # User pool for this muscle (empty unless strategy.uses_pool)
+    user_equipment_mask: int
+    max_complexity: int
+    experience_level: str
+    excluded_exercise_ids: set              # exercise_id codes used anywhere in the programme
+    excluded_canonical_mask: int = 0        # canonical_name codes used in this session
+    excluded_display_mask: int = 0          # display_name codes used anywhere in the programme
+    allow_complexity_4: bool = False
+    require_complexity_4_first: bool = False
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram (8 buckets per power of two, ~9% resolution).
+
+    Constant memory however long the run, unlike keeping every sample.
+    """
+
+    BUCKETS_PER_OCTAVE = 8
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+
+    def record(self, nanoseconds: int, count: int = 1):
+        bucket = int(math.log2(max(nanoseconds, 1)) * self.BUCKETS_PER_OCTAVE)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += count
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the pct-th percentile, in nanoseconds"""
+        if self.total == 0:
+            return None
+        rank = math.ceil(self.total * pct / 100)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return 2 ** ((bucket + 1) / self.BUCKETS_PER_OCTAVE)
+        return None
+
+
+class StrategyStats:
+    """Per-strategy call counts, total time and latency distribution"""
+
+    def __init__(self):
+        self.requests = 0
+        self.selections = 0
+        self.total_ns = 0
+        self.latency = LatencyHistogram()
+
+    def record(self, elapsed_ns: int, requests: int, selections: int):
+        self.requests += requests
+        self.selections += selections
+        self.total_ns += elapsed_ns
+        self.latency.record(elapsed_ns // max(requests, 1), requests)
+
+    @property
+    def requests_per_sec(self) -> float:
+        return self.requests / (self.total_ns / 1e9) if self.total_ns else 0.0
+
+    def summary(self, name: str) -> str:
+        def us(pct):
+            value = self.latency.percentile(pct)
+            return f"{value / 1000:.1f}µs" if value is not None else "--"
+
+        return (
+            f"{name}: {self.requests:,} requests, {self.selections:,} picks, "
+            f"{self.requests_per_sec:,.0f} req/s | "
+            f"p50 {us(50)}  p90 {us(90)}  p99 {us(99)}"
+        )
+
+
+class SelectionStrategy(ABC):
+    """
+    Base class: subclasses set name and implement select() (and optionally
+    select_batch()).
+
+    uses_pool=False lets callers skip materialising SelectionRequest.pool
+    for strategies that read their own catalog index instead.
+    """
+
+    name: str = ''
+    uses_pool: bool = True
+
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+        self.stats = StrategyStats()
+
+    @abstractmethod
+    def select(self, request: SelectionRequest) -> List[ScoredExercise]:
+        """Picks for one muscle slot"""
+
+    def select_batch(self, requests: List[SelectionRequest]) -> List[List[ScoredExercise]]:
+        """Picks for many independent requests, in order (default: select() each)"""
+        return [self.select(request) for request in requests]
+
+    def run(self, request: SelectionRequest) -> List[ScoredExercise]:
+        """select() with timing"""
+        start = time.perf_counter_ns()
+        picks = self.select(request)
+        self.stats.record(time.perf_counter_ns() - start, 1, len(picks))
+        return picks
+
+    def run_batch(self, requests: List[SelectionRequest]) -> List[List[ScoredExercise]]:
+        """select_batch() with timing; latency is recorded per request (batch time / size)"""
+        start = time.perf_counter_ns()
+        picks = self.select_batch(requests)
+        self.stats.record(time.perf_counter_ns() - start, len(requests), sum(len(p) for p in picks))
+        return picks
+
+
+STRATEGIES: Dict[str, Type[SelectionStrategy]] = {}
+
+
+def register_strategy(cls: Type[SelectionStrategy]) -> Type[SelectionStrategy]:
+    """Class decorator adding a strategy to the registry under cls.name"""
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} must define a name")
+    if cls.name in STRATEGIES:
+        raise ValueError(f"Selection strategy '{cls.name}' is already registered")
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+def create_strategy(name: str, catalog: Catalog) -> SelectionStrategy:
+    """Instantiate a registered strategy by name"""
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown selection strategy '{name}' (available: {', '.join(STRATEGIES)})")
+    return STRATEGIES[name](catalog)
+
+
+@register_strategy
+class WeightedRandomStrategy(SelectionStrategy):
+    """Weighted random selection by canonical_rating (score_and_select_exercises)"""
+
+    name = 'weighted'
+
+    def select(self, request: SelectionRequest) -> List[ScoredExercise]:
+        return score_and_select_exercises(
+            pool=request.pool,
+            count=request.count,
+            experience_level=request.experience_level,
+            excluded_exercise_ids=request.excluded_exercise_ids,
+            allow_complexity_4=request.allow_complexity_4,
+            require_complexity_4_first=request.require_complexity_4_first,
+            max_complexity=request.max_complexity
+        )
+
+
+@register_strategy
+class MCVStrategy(SelectionStrategy):
+    """
+    Deterministic MCV heuristic over Catalog.mcv_order, mirroring Swift
+    ExerciseRepository.selectExercisesWithWarnings (incl. display-name relaxation).
+    """
+
+    name = 'mcv'
+    uses_pool = False
+
+    def select(self, request: SelectionRequest) -> List[ScoredExercise]:
+        mcv_args = (
+            self.catalog.mcv_order.get(request.muscle_code, []),
+            request.count,
+            request.user_equipment_mask,
+            request.max_complexity,
+            request.excluded_exercise_ids,
+            request.excluded_canonical_mask,
+            request.excluded_display_mask
+        )
+        selected, was_relaxed = mcv_select_indexed(*mcv_args)
+
+        # Soft constraint relaxation: allow display-name repeats if short
+        if len(selected) < request.count and not was_relaxed:
+            relaxed, _ = mcv_select_indexed(*mcv_args, allow_display_name_repeats=True)
+            if len(relaxed) > len(selected):
+                selected = relaxed
+
+        return selected
+
+    def select_batch(self, requests: List[SelectionRequest]) -> List[List[ScoredExercise]]:
+        """One walk of each muscle's MCV order for all its requests, then one for any relaxations"""
+        by_muscle: Dict[int, List[int]] = {}
+        for i, request in enumerate(requests):
+            by_muscle.setdefault(request.muscle_code, []).append(i)
+
+        results: List[List[ScoredExercise]] = [[] for _ in requests]
+        for muscle_code, indexes in by_muscle.items():
+            ordered_pool = self.catalog.mcv_order.get(muscle_code, [])
+            args = [
+                (r.count, r.user_equipment_mask, r.max_complexity, r.excluded_exercise_ids,
+                 r.excluded_canonical_mask, r.excluded_display_mask)
+                for r in (requests[i] for i in indexes)
+            ]
+            for i, picks in zip(indexes, mcv_select_batch(ordered_pool, args)):
+                results[i] = picks
+
+            # Soft constraint relaxation, as in select()
+            short = [k for k, i in enumerate(indexes)
+                     if len(results[i]) < requests[i].count and requests[i].excluded_display_mask]
+            if short:
+                relaxed = mcv_select_batch(ordered_pool, [args[k] for k in short], allow_display_name_repeats=True)
+                for k, picks in zip(short, relaxed):
+                    if len(picks) > len(results[indexes[k]]):
+                        results[indexes[k]] = picks
+
+        return results
@@ -1,234 +1,122 @@
 """
-templates.py - Session templates matching Swift DynamicProgramGenerator
+templates.py - Session templates from the split_templates table
+
+The database builder imports split_templates_prod.csv (the source of the
+app's split_templates.json) into exercises.db. Every split variant is read
+once per run (loader.fetch_templates) into frozen records indexed by
+(days_per_week, duration), so a lookup is a single dict access and nothing
+is rebuilt per simulation.
+
+Databases built before the table existed fall back to parsing the CSV.
 """
 
-from typing import List, Tuple, Dict
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 
-# Session template: {'name': str, 'muscle_groups': [(muscle, count), ...]}
-SessionTemplate = Dict[str, any]
+CSV_PATH = Path(__file__).parent / '..' / 'database-management' / 'split_templates_prod.csv'
 
+# split_templates_prod.csv muscle columns -> primary_muscle values, in slot
+# order (mirrors ingest.TEMPLATE_MUSCLES in database-management)
+TEMPLATE_MUSCLES = {
+    'Chest': 'Chest',
+    'Shoulder': 'Shoulders',
+    'Back': 'Back',
+    'Bicep': 'Biceps',
+    'Tricep': 'Triceps',
+    'Forearm': 'Forearms',
+    'Quad': 'Quads',
+    'Hamstring': 'Hamstrings',
+    'Glute': 'Glutes',
+    'Calf': 'Calves',
+    'Core': 'Core',
+}
+
+
+@dataclass(frozen=True, slots=True)
+class SessionTemplate:
+    name: str
+    muscle_groups: Tuple[Tuple[str, int], ...]  # (muscle, count) in slot order
 
-def get_session_templates(days_per_week: int, session_duration: str) -> List[SessionTemplate]:
-    """
-    Get session templates based on days per week and duration.
-    Matches Swift DynamicProgramGenerator logic.
 
-    session_duration: '30-45 min', '45-60 min', '60-90 min'
+@dataclass(frozen=True, slots=True)
+class Split:
+    days_per_week: int
+    duration: str
+    program: str
+    sessions: Tuple[SessionTemplate, ...]
+
+
+class TemplateLibrary:
+    """
+    Every split variant, grouped by (days_per_week, duration). Within a
+    group, splits keep the CSV's order and the first is the default.
     """
-    # Map duration strings to internal keys
-    duration_map = {
-        '30-45 min': 'short',
-        '45-60 min': 'medium',
-        '60-90 min': 'long'
-    }
-    duration = duration_map.get(session_duration, 'medium')
-
-    if days_per_week == 1:
-        return get_1_day_templates(duration)
-    elif days_per_week == 2:
-        return get_2_day_templates(duration)
-    elif days_per_week == 3:
-        return get_3_day_templates(duration)
-    elif days_per_week == 4:
-        return get_4_day_templates(duration)
-    elif days_per_week == 5:
-        return get_5_day_templates(duration)
-    elif days_per_week == 6:
-        return get_6_day_templates(duration)
-    else:
-        return get_3_day_templates(duration)  # Default fallback
-
-
-def get_1_day_templates(duration: str) -> List[SessionTemplate]:
-    """1-day Full Body templates"""
-    if duration == 'short':
-        return [{
-            'name': 'Full Body',
-            'muscle_groups': [
-                ('Chest', 1), ('Shoulders', 1), ('Back', 1),
-                ('Quads', 1), ('Hamstrings', 1), ('Core', 1)
-            ]
-        }]
-    elif duration == 'medium':
-        return [{
-            'name': 'Full Body',
-            'muscle_groups': [
-                ('Chest', 1), ('Shoulders', 1), ('Back', 1),
-                ('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)
-            ]
-        }]
-    else:  # long
-        return [{
-            'name': 'Full Body',
-            'muscle_groups': [
-                ('Chest', 1), ('Shoulders', 1), ('Back', 1),
-                ('Biceps', 1), ('Triceps', 1),
-                ('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)
-            ]
-        }]
-
-
-def get_2_day_templates(duration: str) -> List[SessionTemplate]:
-    """2-day Upper/Lower or Full Body templates"""
-    if duration == 'short':
-        # Upper/Lower split
-        return [
-            {
-                'name': 'Upper',
-                'muscle_groups': [('Chest', 1), ('Shoulders', 1), ('Back', 1)]
-            },
-            {
-                'name': 'Lower',
-                'muscle_groups': [('Quads', 2), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)]
-            }
-        ]
-    else:  # medium or long - Full Body
-        if duration == 'medium':
-            return [
-                {
-                    'name': 'Full Body',
-                    'muscle_groups': [
-                        ('Chest', 1), ('Shoulders', 1), ('Back', 1),
-                        ('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)
-                    ]
-                },
-                {
-                    'name': 'Full Body',
-                    'muscle_groups': [
-                        ('Chest', 1), ('Shoulders', 1), ('Back', 1),
-                        ('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)
-                    ]
-                }
-            ]
-        else:  # long
-            return [
-                {
-                    'name': 'Full Body',
-                    'muscle_groups': [
-                        ('Chest', 1), ('Shoulders', 1), ('Back', 1),
-                        ('Biceps', 1), ('Triceps', 1),
-                        ('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)
-                    ]
-                },
-                {
-                    'name': 'Full Body',
-                    'muscle_groups': [
-                        ('Chest', 1), ('Shoulders', 1), ('Back', 1),
-                        ('Biceps', 1), ('Triceps', 1),
-                        ('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)
-                    ]
-                }
-            ]
-
-
-def get_3_day_templates(duration: str) -> List[SessionTemplate]:
-    """3-day Push/Pull/Legs templates"""
-    if duration == 'short':
-        return [
-            {
-                'name': 'Push',
-                'muscle_groups': [('Chest', 1), ('Shoulders', 2), ('Triceps', 1)]
-            },
-            {
-                'name': 'Pull',
-                'muscle_groups': [('Back', 2), ('Biceps', 2)]
-            },
-            {
-                'name': 'Legs',
-                'muscle_groups': [('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)]
-            }
-        ]
-    elif duration == 'medium':
-        return [
-            {
-                'name': 'Push',
-                'muscle_groups': [('Chest', 2), ('Shoulders', 2), ('Triceps', 1)]
-            },
-            {
-                'name': 'Pull',
-                'muscle_groups': [('Back', 3), ('Biceps', 2)]
-            },
-            {
-                'name': 'Legs',
-                'muscle_groups': [('Quads', 2), ('Hamstrings', 2), ('Glutes', 1), ('Core', 1)]
-            }
-        ]
-    else:  # long
-        return [
-            {
-                'name': 'Push',
-                'muscle_groups': [('Chest', 3), ('Shoulders', 3), ('Triceps', 2)]
-            },
-            {
-                'name': 'Pull',
-                'muscle_groups': [('Back', 3), ('Biceps', 3)]
-            },
-            {
-                'name': 'Legs',
-                'muscle_groups': [('Quads', 2), ('Hamstrings', 2), ('Glutes', 1), ('Core', 1)]
-            }
-        ]
-
-
-def get_4_day_templates(duration: str) -> List[SessionTemplate]:
-    """4-day Upper/Lower split templates"""
-    if duration == 'short':
-        return [
-            {'name': 'Upper', 'muscle_groups': [('Chest', 1), ('Shoulders', 1), ('Back', 1)]},
-            {'name': 'Lower', 'muscle_groups': [('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)]},
-            {'name': 'Upper', 'muscle_groups': [('Chest', 1), ('Shoulders', 1), ('Back', 1)]},
-            {'name': 'Lower', 'muscle_groups': [('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)]}
-        ]
-    elif duration == 'medium':
-        return [
-            {'name': 'Upper', 'muscle_groups': [('Chest', 2), ('Shoulders', 2), ('Back', 2)]},
-            {'name': 'Lower', 'muscle_groups': [('Quads', 2), ('Hamstrings', 2), ('Glutes', 1), ('Core', 1)]},
-            {'name': 'Upper', 'muscle_groups': [('Chest', 2), ('Shoulders', 2), ('Back', 2)]},
-            {'name': 'Lower', 'muscle_groups': [('Quads', 2), ('Hamstrings', 2), ('Glutes', 1), ('Core', 1)]}
-        ]
-    else:  # long
-        return [
-            {'name': 'Upper', 'muscle_groups': [('Chest', 2), ('Shoulders', 2), ('Back', 2), ('Triceps', 1), ('Biceps', 1)]},
-            {'name': 'Lower', 'muscle_groups': [('Quads', 2), ('Hamstrings', 2), ('Glutes', 1), ('Core', 1)]},
-            {'name': 'Upper', 'muscle_groups': [('Chest', 2), ('Shoulders', 2), ('Back', 2), ('Triceps', 1), ('Biceps', 1)]},
-            {'name': 'Lower', 'muscle_groups': [('Quads', 2), ('Hamstrings', 2), ('Glutes', 1), ('Core', 1)]}
-        ]
-
-
-def get_5_day_templates(duration: str) -> List[SessionTemplate]:
-    """5-day Hybrid split (PPL + Upper/Lower)"""
-    if duration == 'short':
-        return [
-            {'name': 'Push', 'muscle_groups': [('Chest', 1), ('Shoulders', 2), ('Triceps', 1)]},
-            {'name': 'Pull', 'muscle_groups': [('Back', 2), ('Biceps', 2)]},
-            {'name': 'Legs', 'muscle_groups': [('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)]},
-            {'name': 'Upper', 'muscle_groups': [('Chest', 1), ('Shoulders', 1), ('Back', 1)]},
-            {'name': 'Lower', 'muscle_groups': [('Quads', 1), ('Hamstrings', 1), ('Glutes', 1), ('Core', 1)]}
-        ]
-    elif duration == 'medium':
-        return [
-            {'name': 'Push', 'muscle_groups': [('Chest', 2), ('Shoulders', 2), ('Triceps', 1)]},
-            {'name': 'Pull', 'muscle_groups': [('Back', 3), ('Biceps', 2)]},
-            {'name': 'Legs', 'muscle_groups': [('Quads', 2), ('Hamstrings', 2), ('Glutes', 1), ('Core', 1)]},
-            {'name': 'Upper', 'muscle_groups': [('Chest', 2), ('Shoulders', 2), ('Back', 2)]},
-            {'name': 'Lower', 'muscle_groups': [('Quads', 2), ('Hamstrings', 2), ('Glutes', 1), ('Core', 1)]}
-        ]
-    else:  # long
-        return [
-            {'name': 'Push', 'muscle_groups': [('Chest', 3), ('Shoulders', 3), ('Triceps', 2)]},
-            {'name': 'Pull', 'muscle_groups': [('Back', 3), ('Biceps', 3)]},
-            {'name': 'Legs', 'muscle_groups': [('Quads', 2), ('Hamstrings', 2), ('Glutes', 1), ('Core', 1)]},
-            {'name': 'Upper', 'muscle_groups': [('Chest', 2), ('Shoulders', 2), ('Back', 2), ('Triceps', 1), ('Biceps', 1)]},
-            {'name': 'Lower', 'muscle_groups': [('Quads', 2), ('Hamstrings', 2), ('Glutes', 1), ('Core', 1)]}
-        ]
-
-
-def get_6_day_templates(duration: str) -> List[SessionTemplate]:
-    """6-day Push/Pull/Legs x2"""
-    base_ppl = get_3_day_templates(duration)
-    # Duplicate the PPL split
-    return base_ppl + [
-        {'name': f"{t['name']} B", 'muscle_groups': t['muscle_groups']}
-        for t in base_ppl
-    ]
+
+    __slots__ = ('splits', '_by_key')
+
+    def __init__(self, rows: Iterable[tuple]):
+        """
+        rows: split_templates rows (days_per_week, duration, variant,
+        session_index, slot, program, session_name, muscle, exercise_count)
+        in any order
+        """
+        programs: Dict[tuple, str] = {}
+        sessions: Dict[tuple, Dict[int, tuple]] = {}
+        for days, duration, variant, index, slot, program, name, muscle, count in rows:
+            key = (days, duration, variant)
+            programs[key] = program
+            session = sessions.setdefault(key, {}).setdefault(index, (name, []))
+            session[1].append((slot, muscle, count))
+
+        self.splits: Tuple[Split, ...] = tuple(
+            Split(key[0], key[1], programs[key], tuple(
+                SessionTemplate(name, tuple((muscle, count) for _, muscle, count in sorted(slots)))
+                for _, (name, slots) in sorted(sessions[key].items())
+            ))
+            for key in sorted(sessions)
+        )
+        self._by_key: Dict[Tuple[int, str], Tuple[Split, ...]] = {}
+        for split in self.splits:
+            key = (split.days_per_week, split.duration)
+            self._by_key[key] = self._by_key.get(key, ()) + (split,)
+
+    def __len__(self) -> int:
+        return len(self.splits)
+
+    def variants(self, days_per_week: int, session_duration: str) -> Tuple[Split, ...]:
+        """Splits offered for a schedule, default first (empty if there are none)"""
+        return self._by_key.get((days_per_week, session_duration), ())
+
+    def for_days(self, days_per_week: int) -> List[Split]:
+        """Every split for a number of training days, across all durations"""
+        return [split for split in self.splits if split.days_per_week == days_per_week]
+
+    def get(self, days_per_week: int, session_duration: str, program: Optional[str] = None) -> Split:
+        """The named split for a schedule, or its default when program is None"""
+        for split in self.variants(days_per_week, session_duration):
+            if program is None or split.program == program:
+                return split
+        raise KeyError(f"No {program or 'split'} template for {days_per_week} days, {session_duration}")
+
+
+def csv_template_rows(path: Path) -> Iterator[tuple]:
+    """split_templates rows parsed straight from the CSV (same layout as the table)"""
+    variants: Dict[Tuple[int, str], List[str]] = {}
+    sessions: Dict[Tuple[int, str, str], int] = {}
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            days, duration, program = int(row['Days']), row['Duration'].strip(), row['Program'].strip()
+            programs = variants.setdefault((days, duration), [])
+            if program not in programs:
+                programs.append(program)
+            session_index = sessions.get((days, duration, program), 0)
+            sessions[(days, duration, program)] = session_index + 1
+            for slot, (column, muscle) in enumerate(TEMPLATE_MUSCLES.items()):
+                count = int(row[column] or 0)
+                if count:
+                    yield (days, duration, programs.index(program), session_index, slot,
+                           program, row['Split'].strip(), muscle, count)
+